@@ -1,10 +1,8 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
 
 from auth import login
+from aquecimento import aquecer_em_segundo_plano
 from components.header import render_header
-from data_loader import load_empenhos  
 
 # ==================================
 # CONFIGURAÇÃO
@@ -15,44 +13,32 @@ st.set_page_config(
     layout="wide"
 )
 
+# Começa a carregar os dados enquanto o login é exibido
+aquecer_em_segundo_plano()
+
 login()
 render_header()
 
+# Importações pesadas só depois do login: a tela de login abre sem
+# carregar pandas/altair
+import altair as alt
+from components.formatacao import formatar_brl, config_moeda
+from components.graficos import dados_grafico
+from data_loader import resumo_visao_geral, versao_dataset
+
 st.title("📊 Painel de Empenhos – Visão Geral")
 
 # ==================================
 # CARREGAR DADOS
 # ==================================
-df = load_empenhos()
+# Resumo Exercício x Entidade pré-calculado por versão dos dados:
+# métricas, filtros e gráfico saem desta tabela pequena
+resumo = resumo_visao_geral(versao_dataset())
 
-if df.empty:
+if resumo.empty:
     st.warning("Nenhum dado carregado.")
     st.stop()
 
-# ==================================
-# TRATAMENTO BÁSICO
-# ==================================
-df["anoEmpenho"] = (
-    df["anoEmpenho"]
-    .astype(str)
-    .str.replace(".0", "", regex=False)
-    .str.strip()
-)
-
-df["nomeEntidade"] = df["nomeEntidade"].fillna("").astype(str).str.strip()
-
-df = df[(df["anoEmpenho"] != "") & (df["anoEmpenho"] != "nan")]
-df = df[df["nomeEntidade"] != ""]
-
-for col in ["valorEmpenhadoBruto", "valorEmpenhadoAnulado", "saldoBaixado"]:
-    df[col] = (
-        df[col]
-        .astype(str)
-        .str.replace(".", "", regex=False)
-        .str.replace(",", ".", regex=False)
-    )
-    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
 # ==================================
 # MÉTRICAS
 # ==================================
@@ -60,15 +46,15 @@ c1, c2, c3 = st.columns(3)
 
 c1.metric(
     "💰 Total Empenhado",
-    f"R$ {df['valorEmpenhadoBruto'].sum():,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    formatar_brl(resumo["valorEmpenhadoBruto"].sum())
 )
 c2.metric(
     "❌ Total Anulado",
-    f"R$ {df['valorEmpenhadoAnulado'].sum():,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    formatar_brl(resumo["valorEmpenhadoAnulado"].sum())
 )
 c3.metric(
     "✅ Total Baixado",
-    f"R$ {df['saldoBaixado'].sum():,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    formatar_brl(resumo["saldoBaixado"].sum())
 )
 
 # ==================================
@@ -76,8 +62,8 @@ c3.metric(
 # ==================================
 st.divider()
 
-anos = sorted(df["anoEmpenho"].unique())
-entidades = sorted(df["nomeEntidade"].unique())
+anos = sorted(resumo["anoEmpenho"].unique())
+entidades = sorted(resumo["nomeEntidade"].unique())
 
 f1, f2 = st.columns(2)
 
@@ -86,24 +72,17 @@ with f1:
 with f2:
     entidade_sel = st.multiselect("🏢 Entidade", entidades, default=entidades)
 
-df = df[df["anoEmpenho"].isin(ano_sel) & df["nomeEntidade"].isin(entidade_sel)]
+resumo = resumo[
+    resumo["anoEmpenho"].isin(ano_sel) & resumo["nomeEntidade"].isin(entidade_sel)
+]
 
 # ==================================
 # PREPARAÇÃO DO GRÁFICO
 # ==================================
-df_graf = (
-    df.groupby("anoEmpenho", as_index=False)
-    .agg({
-        "valorEmpenhadoBruto": "sum",
-        "valorEmpenhadoAnulado": "sum",
-        "saldoBaixado": "sum"
-    })
-)
-
-df_graf["Restos a Pagar"] = (
-    df_graf["valorEmpenhadoBruto"]
-    - df_graf["valorEmpenhadoAnulado"]
-    - df_graf["saldoBaixado"]
+df_graf = dados_grafico(
+    resumo,
+    "anoEmpenho",
+    ["valorEmpenhadoBruto", "valorEmpenhadoAnulado", "saldoBaixado", "Restos a Pagar"]
 )
 
 df_long = df_graf.melt(
@@ -127,15 +106,10 @@ df_long["Tipo"] = df_long["Tipo"].map(mapa_tipos)
 ordem_tipo = ["Anulado", "Restos a Pagar", "Baixado no Exercício"]
 
 # Percentual (APENAS PARA TOOLTIP)
-df_totais = (
-    df_long.groupby("anoEmpenho", as_index=False)["Valor"]
-    .sum()
-    .rename(columns={"Valor": "Total"})
+df_long["Percentual"] = (
+    df_long["Valor"] / df_long.groupby("anoEmpenho")["Valor"].transform("sum")
 )
 
-df_long = df_long.merge(df_totais, on="anoEmpenho")
-df_long["Percentual"] = df_long["Valor"] / df_long["Total"]
-
 # ==================================
 # GRÁFICO
 # ==================================
@@ -192,9 +166,10 @@ tabela = df_graf.rename(columns={
     "saldoBaixado": "Baixado no Exercício"
 })
 
-for col in ["Empenhado", "Anulado", "Baixado no Exercício", "Restos a Pagar"]:
-    tabela[col] = tabela[col].apply(
-        lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+st.dataframe(
+    tabela,
+    use_container_width=True,
+    column_config=config_moeda(
+        ["Empenhado", "Anulado", "Baixado no Exercício", "Restos a Pagar"]
     )
-
-st.dataframe(tabela, use_container_width=True)
+)
@@ -0,0 +1,63 @@
+import sys
+import threading
+
+# Módulo leve (só biblioteca padrão): pode ser importado pelas páginas antes
+# do login sem trazer pandas/altair para o caminho da primeira tela.
+#
+# Aquecimento no início do processo (sem esperar a primeira sessão):
+#     python -m aquecimento [Inicio.py] [opções do streamlit run]
+
+_trava = threading.Lock()
+_thread = None
+
+
+def _importar_e_aquecer():
+    from data_loader import aquecer
+    aquecer()
+
+
+def aquecer_em_segundo_plano():
+    """
+    Dispara ``data_loader.aquecer()`` sem bloquear a página.
+
+    Na primeira chamada do processo a importação de ``data_loader`` (e de
+    pandas) também acontece na thread, enquanto o login é exibido. Depois
+    disso a chamada é direta: só confere a versão dos dados.
+    """
+    global _thread
+
+    carregador = sys.modules.get("data_loader")
+    if carregador is not None and hasattr(carregador, "aquecer"):
+        carregador.aquecer()
+        return
+
+    with _trava:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=_importar_e_aquecer,
+                name="importa-data-loader",
+                daemon=True
+            )
+            _thread.start()
+
+
+def main(argv=None):
+    """
+    Dispara a carga dos dados e sobe o Streamlit no mesmo processo: a base
+    já está sendo lida quando a primeira sessão abre a tela de login.
+    """
+    from streamlit.web import cli
+
+    from data_loader import aquecer
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or not argv[0].endswith(".py"):
+        argv.insert(0, "Inicio.py")
+
+    aquecer()
+    sys.argv = ["streamlit", "run", *argv]
+    return cli.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,6 @@
 import streamlit as st
-import json
-from pathlib import Path
 
-# 📁 Arquivo de usuários agora fica na pasta data
-USERS_FILE = Path("data/usuarios.json")
-
-
-def carregar_usuarios():
-    if USERS_FILE.exists():
-        with open(USERS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-
-def salvar_usuarios(usuarios: dict):
-    USERS_FILE.parent.mkdir(exist_ok=True)  # garante pasta data
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(usuarios, f, indent=2, ensure_ascii=False)
+from cadastro import usuarios_locais
 
 
 def login():
@@ -34,16 +18,16 @@ def login():
     senha = st.text_input("Senha", type="password")
 
     if st.button("Entrar"):
-        usuarios = carregar_usuarios()
+        registro = usuarios_locais().obter(usuario)
 
         if (
-            usuario in usuarios
-            and usuarios[usuario]["senha"] == senha
-            and usuarios[usuario].get("status") == "ativo"
+            registro is not None
+            and registro.get("senha") == senha
+            and registro.get("status") == "ativo"
         ):
             st.session_state.autenticado = True
             st.session_state.usuario = usuario
-            st.session_state.perfil = usuarios[usuario]["perfil"].upper()
+            st.session_state.perfil = registro["perfil"].upper()
             st.rerun()
         else:
             st.error("Usuário, senha inválidos ou acesso não aprovado")
@@ -0,0 +1,359 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# ==========================
+# CADASTROS (usuários e solicitações de acesso)
+# ==========================
+# Um cadastro é um JSON {chave: registro}. O índice fica em memória e só
+# é relido quando a versão da origem muda (arquivo local, SHA no GitHub ou
+# contador no SQLite). Alterações são feitas registro a registro, com
+# concorrência otimista: se outro processo gravou antes, relê e reaplica.
+
+ARQUIVO_USUARIOS = "data/usuarios.json"
+ARQUIVO_SOLICITACOES = "data/solicitacoes.json"
+
+# Tentativas de reaplicar uma alteração após conflito de versão
+TENTATIVAS_CONFLITO = 5
+
+
+class Conflito(Exception):
+    """A origem mudou entre a leitura e a gravação."""
+
+
+def _aplicar(dados: dict, alteracoes: dict) -> dict:
+    """``{chave: funcao(registro_atual) -> novo registro ou None}``; ``None`` remove."""
+    for chave, funcao in alteracoes.items():
+        novo = funcao(dados.get(chave))
+        if novo is None:
+            dados.pop(chave, None)
+        else:
+            dados[chave] = novo
+    return dados
+
+
+def _conteudo_json(dados: dict) -> bytes:
+    # Mesmo formato do github_client.salvar_json
+    return json.dumps(dados, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+# ==========================
+# ORIGENS (backends)
+# ==========================
+# Uma trava por arquivo, compartilhada por todas as instâncias do processo:
+# conferência de versão e troca do arquivo acontecem juntas
+_travas_arquivos = {}
+_trava_travas = threading.Lock()
+
+
+def _trava_arquivo(caminho: Path) -> threading.Lock:
+    with _trava_travas:
+        return _travas_arquivos.setdefault(caminho.resolve(), threading.Lock())
+
+
+class OrigemArquivo:
+    """
+    JSON local (ex.: ``data/usuarios.json`` do deploy). Versão = inode +
+    mtime + tamanho: cada gravação troca o arquivo (inode novo), então
+    duas gravações no mesmo instante ainda têm versões diferentes.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+
+    def versao(self):
+        try:
+            estado = self.caminho.stat()
+        except FileNotFoundError:
+            return None
+        return (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+
+    def ler(self):
+        with _trava_arquivo(self.caminho):
+            versao = self.versao()
+            if versao is None:
+                return {}, None
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                return json.load(f), versao
+
+    def gravar(self, dados: dict, versao, mensagem: str):
+        self.caminho.parent.mkdir(exist_ok=True)  # garante pasta data
+        with _trava_arquivo(self.caminho):
+            if self.versao() != versao:
+                raise Conflito(str(self.caminho))
+            # Temporário com nome único na mesma pasta (replace atômico)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.caminho.parent,
+                prefix=f".{self.caminho.name}.",
+                suffix=".tmp",
+                delete=False
+            ) as f:
+                json.dump(dados, f, indent=2, ensure_ascii=False)
+            try:
+                os.replace(f.name, self.caminho)
+            except OSError:
+                os.unlink(f.name)
+                raise
+            return self.versao()
+
+
+class OrigemGitHub:
+    """JSON no repositório (API de conteúdo). Versão = SHA do arquivo."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def versao(self):
+        # Leitura condicional (ETag): sem mudança é um 304, fora do limite
+        return self.ler()[1]
+
+    def ler(self):
+        import github_client
+        return github_client.ler_json(self.caminho)
+
+    def gravar(self, dados: dict, versao, mensagem: str):
+        import github_client
+        try:
+            # sha "" = o arquivo ainda não pode existir
+            resposta = github_client.salvar_json(
+                self.caminho, dados, mensagem, sha=versao or ""
+            )
+        except github_client.ErroGitHub as e:
+            if e.status in (409, 422):
+                raise Conflito(self.caminho) from e
+            raise
+        return resposta["content"]["sha"]
+
+
+class OrigemSQLite:
+    """
+    Cadastro numa tabela SQLite (um JSON por cadastro). Versão = contador
+    incrementado a cada gravação. Útil como origem local e em testes.
+    """
+
+    def __init__(self, caminho_banco, nome: str):
+        self.caminho_banco = str(caminho_banco)
+        self.nome = nome
+        with self._conectar() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS cadastros "
+                "(nome TEXT PRIMARY KEY, dados TEXT NOT NULL, versao INTEGER NOT NULL)"
+            )
+
+    def _conectar(self):
+        return sqlite3.connect(self.caminho_banco, timeout=10)
+
+    def versao(self):
+        with self._conectar() as con:
+            linha = con.execute(
+                "SELECT versao FROM cadastros WHERE nome = ?", (self.nome,)
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def ler(self):
+        with self._conectar() as con:
+            linha = con.execute(
+                "SELECT dados, versao FROM cadastros WHERE nome = ?", (self.nome,)
+            ).fetchone()
+        if linha is None:
+            return {}, None
+        return json.loads(linha[0]), linha[1]
+
+    def gravar(self, dados: dict, versao, mensagem: str):
+        texto = json.dumps(dados, ensure_ascii=False)
+        with self._conectar() as con:
+            if versao is None:
+                cursor = con.execute(
+                    "INSERT OR IGNORE INTO cadastros (nome, dados, versao) VALUES (?, ?, 1)",
+                    (self.nome, texto)
+                )
+            else:
+                cursor = con.execute(
+                    "UPDATE cadastros SET dados = ?, versao = versao + 1 "
+                    "WHERE nome = ? AND versao = ?",
+                    (texto, self.nome, versao)
+                )
+            if cursor.rowcount == 0:
+                raise Conflito(self.nome)
+        return self.versao()
+
+
+# ==========================
+# CADASTRO (índice em memória + alterações atômicas)
+# ==========================
+class Cadastro:
+    def __init__(self, origem):
+        self.origem = origem
+        self._indice = {}
+        self._versao = None
+        self._carregado = False
+        self._trava = threading.Lock()
+
+    def _atualizar_indice(self, dados: dict, versao):
+        self._indice = {
+            chave: registro for chave, registro in dados.items()
+            if isinstance(registro, dict)
+        }
+        self._versao = versao
+        self._carregado = True
+
+    def todos(self) -> dict:
+        """
+        Registros atuais (cópia rasa). Só relê a origem se a versão mudou;
+        no GitHub a conferência é um GET condicional.
+        """
+        with self._trava:
+            if isinstance(self.origem, OrigemGitHub):
+                # ler() já é condicional: uma requisição para versão + dados
+                dados, versao = self.origem.ler()
+                if not self._carregado or versao != self._versao:
+                    self._atualizar_indice(dados, versao)
+            else:
+                versao = self.origem.versao()
+                if not self._carregado or versao != self._versao:
+                    self._atualizar_indice(*self.origem.ler())
+            return dict(self._indice)
+
+    def obter(self, chave: str):
+        """Registro de ``chave`` (``None`` se não existir)."""
+        return self.todos().get(chave)
+
+    def alterar(self, alteracoes: dict, mensagem: str) -> dict:
+        """
+        Aplica ``{chave: funcao(registro_atual) -> novo registro ou None}``
+        numa única gravação. ``None`` remove a chave.
+
+        Se a origem mudou desde a leitura (outro admin gravou antes), relê
+        e reaplica as funções sobre os dados novos, até
+        ``TENTATIVAS_CONFLITO`` vezes: alterações em registros diferentes
+        não se perdem.
+        """
+        for tentativa in range(TENTATIVAS_CONFLITO):
+            dados, versao = self.origem.ler()
+            _aplicar(dados, alteracoes)
+            try:
+                nova_versao = self.origem.gravar(dados, versao, mensagem)
+            except Conflito:
+                if tentativa == TENTATIVAS_CONFLITO - 1:
+                    raise
+                continue
+            with self._trava:
+                self._atualizar_indice(dados, nova_versao)
+            return dados
+
+    def atualizar(self, chave: str, campos: dict, mensagem: str) -> dict:
+        """Atualiza campos de um registro (cria se não existir)."""
+        return self.alterar({chave: lambda atual: {**(atual or {}), **campos}}, mensagem)
+
+    def remover(self, chave: str, mensagem: str) -> dict:
+        return self.alterar({chave: lambda atual: None}, mensagem)
+
+    def inserir(self, chave: str, registro: dict, mensagem: str) -> bool:
+        """Cria o registro só se a chave ainda não existir. Devolve se criou."""
+        # Refeito a cada tentativa: vale o resultado da gravação que passou
+        criado = {"valor": False}
+
+        def novo(atual):
+            criado["valor"] = atual is None
+            return registro if atual is None else atual
+
+        self.alterar({chave: novo}, mensagem)
+        return criado["valor"]
+
+
+# ==========================
+# VÁRIOS CADASTROS DE UMA VEZ
+# ==========================
+def _em_paralelo(funcao, cadastros) -> list:
+    cadastros = list(cadastros)
+    with ThreadPoolExecutor(max_workers=max(len(cadastros), 1)) as executor:
+        return list(executor.map(funcao, cadastros))
+
+
+def carregar_juntos(*cadastros) -> list:
+    """``todos()`` de cada cadastro, lidos em paralelo."""
+    return _em_paralelo(lambda cadastro: cadastro.todos(), cadastros)
+
+
+def alterar_juntos(lotes: dict, mensagem: str):
+    """
+    Aplica ``{cadastro: alteracoes}`` (mesmo formato de
+    ``Cadastro.alterar``) em vários cadastros do GitHub num único commit
+    (Git Data API): um reimplante só, em vez de um commit por arquivo.
+
+    O commit só passa se nenhum dos arquivos mudou desde a leitura; se
+    mudou, relê tudo e reaplica, até ``TENTATIVAS_CONFLITO`` vezes.
+    Cadastros em outras origens são gravados um a um.
+    """
+    lotes = {cadastro: alteracoes for cadastro, alteracoes in lotes.items() if alteracoes}
+    if not all(isinstance(cadastro.origem, OrigemGitHub) for cadastro in lotes):
+        for cadastro, alteracoes in lotes.items():
+            cadastro.alterar(alteracoes, mensagem)
+        return
+
+    import github_client
+
+    for tentativa in range(TENTATIVAS_CONFLITO):
+        lidos = _em_paralelo(lambda cadastro: cadastro.origem.ler(), lotes)
+
+        arquivos, esperados, novos = {}, {}, {}
+        for (cadastro, alteracoes), (dados, versao) in zip(lotes.items(), lidos):
+            caminho = cadastro.origem.caminho
+            conteudo = _conteudo_json(_aplicar(dados, alteracoes))
+            arquivos[caminho] = conteudo
+            esperados[caminho] = versao
+            # SHA que o Git dará ao novo arquivo (vira a versão do índice)
+            novos[cadastro] = (
+                dados,
+                hashlib.sha1(b"blob %d\0" % len(conteudo) + conteudo).hexdigest()
+            )
+
+        try:
+            github_client.commit_arquivos(arquivos, mensagem, esperados=esperados)
+        except github_client.ErroGitHub as e:
+            if e.status != 409:
+                raise
+            if tentativa == TENTATIVAS_CONFLITO - 1:
+                raise Conflito(", ".join(arquivos)) from e
+            continue
+
+        for cadastro, (dados, versao) in novos.items():
+            with cadastro._trava:
+                cadastro._atualizar_indice(dados, versao)
+        return
+
+
+# ==========================
+# INSTÂNCIAS COMPARTILHADAS
+# ==========================
+_instancias = {}
+_trava_instancias = threading.Lock()
+
+
+def _compartilhado(chave, fabrica) -> Cadastro:
+    with _trava_instancias:
+        if chave not in _instancias:
+            _instancias[chave] = Cadastro(fabrica())
+        return _instancias[chave]
+
+
+def usuarios_locais() -> Cadastro:
+    """Usuários do ``data/usuarios.json`` local (login)."""
+    return _compartilhado(("arquivo", ARQUIVO_USUARIOS), lambda: OrigemArquivo(ARQUIVO_USUARIOS))
+
+
+def usuarios_github() -> Cadastro:
+    """Usuários no repositório (administração)."""
+    return _compartilhado(("github", ARQUIVO_USUARIOS), lambda: OrigemGitHub(ARQUIVO_USUARIOS))
+
+
+def solicitacoes_github() -> Cadastro:
+    """Solicitações de acesso no repositório."""
+    return _compartilhado(("github", ARQUIVO_SOLICITACOES), lambda: OrigemGitHub(ARQUIVO_SOLICITACOES))
@@ -0,0 +1,30 @@
+import pandas as pd
+import streamlit as st
+
+from components.filtros import posicoes_filtradas
+from components.hierarquias import DIMENSOES_CUBO
+from data_loader import funil_execucao, load_empenhos_tratados, somar_estagios
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _estagios_linhas(selecao: tuple, versao: tuple) -> pd.DataFrame:
+    """Estágios por Exercício x Entidade das linhas da seleção (credor, fonte...)."""
+    base = load_empenhos_tratados().iloc[posicoes_filtradas(selecao, versao)]
+    return somar_estagios(base, list(DIMENSOES_CUBO.values()))
+
+
+def estagios_selecao(selecao: tuple, versao: tuple) -> pd.DataFrame:
+    """
+    Estágios da execução por Exercício x Entidade para a seleção (chave
+    de ``chave_selecao``).
+
+    Seleções só de exercício/entidade recortam ``funil_execucao`` (uma
+    tabela por versão dos dados); as demais somam as linhas filtradas uma
+    vez e ficam em cache.
+    """
+    if all(dim in DIMENSOES_CUBO for dim, _ in selecao):
+        tabela = funil_execucao(versao)
+        for dim, valores in selecao:
+            tabela = tabela[tabela[DIMENSOES_CUBO[dim]].isin(valores)]
+        return tabela
+    return _estagios_linhas(selecao, versao)
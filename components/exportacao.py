@@ -0,0 +1,221 @@
+import gzip
+import io
+
+import pandas as pd
+import streamlit as st
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from components.formatacao import formatar_brl_serie
+
+# Linhas formatadas por vez; limita a memória usada na formatação
+TAMANHO_BLOCO = 50_000
+
+# O st.download_button guarda o arquivo inteiro em memória (não há envio
+# em partes), então o tamanho da exportação é limitado pelo número de
+# linhas. No Excel o limite é o da própria planilha (cabeçalho e totais
+# ocupam duas linhas).
+LIMITE_LINHAS_CSV = 1_000_000
+LIMITE_LINHAS_XLSX = 1_048_576 - 2
+
+FORMATO_MOEDA_XLSX = '"R$" #,##0.00'
+
+
+def _conferir_limite(df: pd.DataFrame, limite: int):
+    if len(df) > limite:
+        raise ValueError(f"{_milhar(len(df))} linhas: o limite da exportação é {_milhar(limite)}")
+
+
+def _milhar(n: int) -> str:
+    return f"{n:,}".replace(",", ".")
+
+
+def _acima_do_limite(df: pd.DataFrame, limite: int) -> bool:
+    """Avisa (no lugar do botão) quando a exportação passaria do limite."""
+    if len(df) <= limite:
+        return False
+    st.warning(
+        f"⚠️ {_milhar(len(df))} linhas: acima do limite de {_milhar(limite)} "
+        "para exportação. Refine os filtros para baixar."
+    )
+    return True
+
+
+def gerar_csv(
+    df: pd.DataFrame,
+    colunas: list,
+    colunas_valor: list = (),
+    rotulos: dict | None = None,
+    prefixo_moeda: str = "R$ ",
+    encoding: str = "utf-8",
+    compactar: bool = False
+):
+    """
+    Escreve o CSV (``;``, valores em pt-BR) em blocos de ``TAMANHO_BLOCO``
+    linhas e devolve os bytes (o ``st.download_button`` só aceita bytes,
+    texto ou ``BytesIO``).
+
+    Só um bloco formatado existe por vez, mas o resultado fica inteiro em
+    memória: acima de ``LIMITE_LINHAS_CSV`` linhas levanta ``ValueError``.
+    """
+    _conferir_limite(df, LIMITE_LINHAS_CSV)
+    rotulos = rotulos or {}
+    destino = io.BytesIO()
+    compactado = gzip.GzipFile(fileobj=destino, mode="wb") if compactar else None
+    texto = io.TextIOWrapper(compactado or destino, encoding=encoding, newline="")
+
+    for inicio in range(0, max(len(df), 1), TAMANHO_BLOCO):
+        # Recorta as linhas antes das colunas: só o bloco é copiado
+        bloco = df.iloc[inicio:inicio + TAMANHO_BLOCO][colunas].copy()
+        for col in colunas_valor:
+            bloco[col] = formatar_brl_serie(bloco[col], prefixo=prefixo_moeda)
+        bloco.rename(columns=rotulos).to_csv(
+            texto, index=False, sep=";", header=(inicio == 0)
+        )
+
+    texto.flush()
+    texto.detach()
+    if compactado is not None:
+        compactado.close()
+
+    return destino.getvalue()
+
+
+def gerar_xlsx(
+    df: pd.DataFrame,
+    colunas: list,
+    colunas_valor: list = (),
+    rotulos: dict | None = None,
+    titulo: str = "Consulta"
+):
+    """
+    Gera a planilha com o modo *write-only* do openpyxl: as linhas vão
+    direto para o arquivo, sem montar a pasta de trabalho em memória.
+
+    Valores ficam numéricos com formato de moeda e a última linha traz
+    os totais (fórmulas SOMA) das colunas de valor. O arquivo salvo fica
+    inteiro em memória; acima de ``LIMITE_LINHAS_XLSX`` linhas (o que o
+    Excel abre numa planilha) levanta ``ValueError``.
+    """
+    _conferir_limite(df, LIMITE_LINHAS_XLSX)
+    rotulos = rotulos or {}
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=titulo[:31])
+
+    for i, col in enumerate(colunas, start=1):
+        largura = 18 if col in colunas_valor else 24
+        ws.column_dimensions[get_column_letter(i)].width = largura
+
+    negrito = Font(bold=True)
+
+    def celula(valor, moeda=False, destaque=False):
+        c = WriteOnlyCell(ws, value=valor)
+        if moeda:
+            c.number_format = FORMATO_MOEDA_XLSX
+        if destaque:
+            c.font = negrito
+        return c
+
+    ws.append([celula(rotulos.get(col, col), destaque=True) for col in colunas])
+
+    posicao_valor = {colunas.index(col) for col in colunas_valor}
+    colunas_texto = [col for col in colunas if col not in colunas_valor]
+    celulas_moeda = {i: celula(0.0, moeda=True) for i in posicao_valor}
+
+    for inicio in range(0, len(df), TAMANHO_BLOCO):
+        bloco = df.iloc[inicio:inicio + TAMANHO_BLOCO][colunas]
+        bloco = bloco.astype({col: object for col in colunas_texto})
+        for col in colunas_texto:
+            bloco[col] = bloco[col].where(bloco[col].notna(), None).map(
+                lambda v: ILLEGAL_CHARACTERS_RE.sub("", v) if isinstance(v, str) else v
+            )
+
+        for linha in bloco.itertuples(index=False, name=None):
+            # No modo write-only cada linha é gravada no append, então as
+            # células de moeda podem ser reaproveitadas entre linhas
+            for i, c in celulas_moeda.items():
+                c.value = float(linha[i])
+            ws.append([celulas_moeda.get(i, v) for i, v in enumerate(linha)])
+
+    # Linha de totais
+    ultima = len(df) + 1
+    totais = []
+    for i, col in enumerate(colunas):
+        letra = get_column_letter(i + 1)
+        if i == 0:
+            totais.append(celula("TOTAL", destaque=True))
+        elif i in posicao_valor:
+            totais.append(celula(f"=SUM({letra}2:{letra}{ultima})", moeda=True, destaque=True))
+        else:
+            totais.append(None)
+    ws.append(totais)
+
+    destino = io.BytesIO()
+    wb.save(destino)
+    return destino.getvalue()
+
+
+@st.fragment
+def botao_download_csv(
+    rotulo: str,
+    df: pd.DataFrame,
+    colunas: list,
+    nome_arquivo: str,
+    colunas_valor: list = (),
+    rotulos: dict | None = None,
+    prefixo_moeda: str = "R$ ",
+    encoding: str = "utf-8",
+    chave: str = "csv"
+):
+    """
+    Botão de download com geração sob demanda: o CSV só é montado quando o
+    usuário clica, e não a cada rerun da página. Como fragmento, marcar
+    "Compactar" também não reexecuta a página.
+    """
+    if _acima_do_limite(df, LIMITE_LINHAS_CSV):
+        return
+
+    compactar = st.checkbox("Compactar (gzip)", key=f"{chave}_gzip")
+
+    st.download_button(
+        rotulo,
+        lambda: gerar_csv(
+            df,
+            colunas,
+            colunas_valor,
+            rotulos=rotulos,
+            prefixo_moeda=prefixo_moeda,
+            encoding=encoding,
+            compactar=compactar
+        ),
+        file_name=f"{nome_arquivo}.gz" if compactar else nome_arquivo,
+        mime="application/gzip" if compactar else "text/csv",
+        on_click="ignore",
+        key=chave
+    )
+
+
+def botao_download_xlsx(
+    rotulo: str,
+    df: pd.DataFrame,
+    colunas: list,
+    nome_arquivo: str,
+    colunas_valor: list = (),
+    rotulos: dict | None = None,
+    chave: str = "xlsx"
+):
+    """Botão de download do Excel, também gerado só no clique."""
+    if _acima_do_limite(df, LIMITE_LINHAS_XLSX):
+        return
+
+    st.download_button(
+        rotulo,
+        lambda: gerar_xlsx(df, colunas, colunas_valor, rotulos=rotulos),
+        file_name=nome_arquivo,
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore",
+        key=chave
+    )
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_loader import load_empenhos_tratados, versao_dataset
+
+# Filtros compartilhados entre as páginas: nome no estado/URL -> coluna
+DIMENSOES = {
+    "ano": "anoEmpenho",
+    "entidade": "nomeEntidade",
+    "credor": "credorCanonico",
+    "fonte": "numRecurso",
+    "despesa": "Descrição da despesa",
+}
+
+TODOS = "Todos"
+
+
+# ==========================
+# ESTADO (session_state + URL)
+# ==========================
+def estado_filtros() -> dict:
+    """
+    Seleção atual de cada dimensão (tupla de valores ou ``None`` = todos).
+
+    Vive no ``session_state`` (sobrevive à troca de página) e é lida da URL
+    na primeira página aberta, o que permite compartilhar links.
+    """
+    if "filtros" not in st.session_state:
+        st.session_state["filtros"] = {
+            dim: tuple(st.query_params.get_all(dim)) or None
+            for dim in DIMENSOES
+        }
+    return st.session_state["filtros"]
+
+
+def _publicar(estado: dict):
+    """Espelha o estado na URL (?ano=2025&ano=2026&...)."""
+    for dim, valores in estado.items():
+        if valores:
+            textos = [str(v) for v in valores]
+            if st.query_params.get_all(dim) != textos:
+                st.query_params[dim] = textos
+        elif dim in st.query_params:
+            del st.query_params[dim]
+
+
+def chave_selecao(selecao: dict) -> tuple:
+    """Forma normalizada (ordenada, sem dimensões livres) usada como chave de cache."""
+    return tuple(
+        (dim, tuple(sorted(valores)))
+        for dim, valores in sorted(selecao.items())
+        if valores is not None
+    )
+
+
+# ==========================
+# CACHE DE LINHAS FILTRADAS
+# ==========================
+@st.cache_data(max_entries=256, show_spinner=False)
+def posicoes_filtradas(selecao: tuple, versao: tuple) -> np.ndarray:
+    """
+    Posições (``iloc``) da base que atendem à seleção normalizada.
+
+    Compartilhado entre páginas e sessões: mesma seleção em Credor, Fonte
+    ou Despesa reaproveita a mesma máscara. ``versao`` (``versao_dataset``)
+    descarta as posições quando os dados mudam.
+    """
+    base = load_empenhos_tratados()
+    mascara = np.ones(len(base), dtype=bool)
+    for dim, valores in selecao:
+        mascara &= base[DIMENSOES[dim]].isin(valores).to_numpy()
+    return np.flatnonzero(mascara)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def opcoes_filtro(selecao: tuple, dim: str, versao: tuple) -> list:
+    """Opções de ``dim`` dentro da seleção dos filtros anteriores."""
+    coluna = load_empenhos_tratados()[DIMENSOES[dim]]
+    if selecao:
+        coluna = coluna.iloc[posicoes_filtradas(selecao, versao)]
+    return sorted(coluna.dropna().unique())
+
+
+def linhas_filtradas(selecao: dict) -> pd.DataFrame:
+    """Linhas da base para a seleção (via ``posicoes_filtradas``)."""
+    base = load_empenhos_tratados()
+    chave = chave_selecao(selecao)
+    if not chave:
+        return base
+    return base.iloc[posicoes_filtradas(chave, versao_dataset())]
+
+
+# ==========================
+# WIDGETS
+# ==========================
+def filtro_compartilhado(dim: str, rotulo: str, anteriores: dict, todos: bool = True):
+    """
+    Multiselect de uma dimensão compartilhada.
+
+    ``anteriores`` são as seleções já feitas na página (definem as opções).
+    Com ``todos=True`` a lista começa com "Todos"; senão todas as opções
+    vêm marcadas. Em ambos os casos "tudo selecionado" é guardado como
+    ``None``, para que a chave de cache seja a mesma entre as páginas.
+    Retorna a seleção normalizada (tupla ou ``None``).
+    """
+    estado = estado_filtros()
+    opcoes = opcoes_filtro(chave_selecao(anteriores), dim, versao_dataset())
+    chave = f"filtro_{dim}"
+
+    aplicar_filtro_pendente(chave)
+
+    if chave in st.session_state:
+        atual = list(st.session_state[chave])
+    elif estado.get(dim):
+        # Da URL os valores chegam como texto ("2025"): casa pelo texto da opção
+        por_texto = {str(opcao): opcao for opcao in opcoes}
+        atual = [por_texto.get(str(v), v) for v in estado[dim]]
+    else:
+        # Nada salvo: começa com tudo ("Todos" ou todas as opções marcadas)
+        atual = [TODOS] if todos else list(opcoes)
+
+    validos = [v for v in atual if v in opcoes]
+    if todos:
+        # "Todos" escolhido por último vale sozinho; escolher um valor
+        # depois dele o desmarca
+        if TODOS in atual and atual[-1] == TODOS:
+            validos = []
+        validos = validos or [TODOS]
+    st.session_state[chave] = validos
+
+    valores = st.multiselect(
+        rotulo,
+        ([TODOS] if todos else []) + list(opcoes),
+        key=chave
+    )
+
+    if todos:
+        selecao = None if TODOS in valores else tuple(valores)
+    else:
+        selecao = None if set(valores) == set(opcoes) else tuple(valores)
+
+    estado[dim] = selecao
+    _publicar(estado)
+    return selecao
+
+
+def aplicar_filtro_pendente(chave: str):
+    """
+    Aplica ao widget ``chave`` uma seleção confirmada no gráfico.
+
+    Deve ser chamada antes de criar o widget (o Streamlit não permite
+    alterar o valor de um widget já criado no mesmo rerun).
+    """
+    pendente = st.session_state.pop(f"_pendente_{chave}", None)
+    if pendente is not None:
+        st.session_state[chave] = pendente
+
+
+def confirmar_selecao(opcoes, chave: str, rotulo: str):
+    """
+    Leva aos filtros da página uma seleção feita no gráfico.
+
+    A filtragem cruzada entre os gráficos acontece só no navegador
+    (parâmetros de seleção do Vega-Lite, sem rerun). O formulário abaixo
+    é o único caminho até os filtros do servidor: nada é reexecutado até
+    o usuário confirmar.
+    """
+    with st.form(f"form_{chave}", border=False):
+        escolha = st.pills(
+            f"Clique nas barras para detalhar; para filtrar a página, escolha o {rotulo.lower()}",
+            opcoes,
+            selection_mode="multi",
+            key=f"pills_{chave}"
+        )
+        confirmado = st.form_submit_button(f"🔎 Filtrar {rotulo}")
+
+    if confirmado and escolha:
+        st.session_state[f"_pendente_{chave}"] = sorted(escolha)
+        st.rerun()
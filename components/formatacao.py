@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+_MILHAR = r"\B(?=(\d{3})+(?!\d))"
+
+
+def formatar_brl(valor, prefixo: str = "R$ ") -> str:
+    """Formata um único valor em pt-BR (métricas, textos). Vazio vale 0,00."""
+    # + 0.0 tira o sinal de "-0,00" (ex.: -0,001)
+    valor = 0.0 if pd.isna(valor) else round(float(valor), 2) + 0.0
+    return (
+        f"{prefixo}{valor:,.2f}"
+        .replace(",", "X")
+        .replace(".", ",")
+        .replace("X", ".")
+    )
+
+
+def formatar_brl_serie(serie: pd.Series, prefixo: str = "R$ ") -> pd.Series:
+    """
+    Versão vetorizada de ``formatar_brl`` para colunas inteiras.
+
+    Só deve ser usada quando o texto é realmente necessário (exportação);
+    na tela as colunas ficam numéricas e são formatadas por ``config_moeda``.
+    """
+    valores = pd.to_numeric(serie, errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    escalado = valores * 100
+    centavos = np.rint(escalado)
+
+    # Perto de meio centavo o produto em ponto flutuante pode cair do lado
+    # errado (0.015 * 100 == 1.5, mas 0.015 é 0.01499...): essas linhas
+    # usam round(), que arredonda como ``formatar_brl``
+    empate = np.abs(np.abs(escalado % 1) - 0.5) <= 8 * np.spacing(np.abs(escalado))
+    for i in np.flatnonzero(empate):
+        centavos[i] = round(round(float(valores[i]), 2) * 100)
+
+    centavos = pd.Series(centavos.astype("int64"), index=serie.index)
+    sinal = pd.Series("", index=serie.index).mask(centavos < 0, "-")
+    centavos = centavos.abs()
+
+    inteiro = (centavos // 100).astype(str).str.replace(_MILHAR, ".", regex=True)
+    fracao = (centavos % 100).astype(str).str.zfill(2)
+
+    return prefixo + sinal + inteiro + "," + fracao
+
+
+def config_moeda(colunas, rotulos: dict | None = None) -> dict:
+    """
+    ``column_config`` para exibir colunas numéricas como moeda no
+    ``st.dataframe`` sem convertê-las em texto (a ordenação continua numérica).
+
+    O formato "localized" usa o idioma do navegador (pt-BR: 1.234,56).
+    """
+    rotulos = rotulos or {}
+    return {
+        col: st.column_config.NumberColumn(
+            f"{rotulos.get(col, col)} (R$)",
+            format="localized",
+            step=0.01
+        )
+        for col in colunas
+    }
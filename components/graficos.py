@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Limite de categorias por grupo nos gráficos (tamanho máximo do spec Vega-Lite)
+TOP_N_MAXIMO = 30
+ROTULO_OUTROS = "Outros"
+
+# Nenhum gráfico envia mais linhas que isso ao navegador
+LIMITE_LINHAS_GRAFICO = 5000
+
+
+def dados_grafico(
+    df: pd.DataFrame,
+    grao,
+    valores,
+    limite: int | None = LIMITE_LINHAS_GRAFICO
+) -> pd.DataFrame:
+    """
+    Agrega ``df`` no grão do gráfico (``grao``) somando ``valores``.
+
+    Todos os gráficos das páginas devem receber o resultado desta função:
+    o Vega recebe só as colunas plotadas, já somadas, e nunca mais que
+    ``limite`` linhas (mantidas as de maior valor). ``limite=None`` quando
+    o resultado ainda passa por outra redução (ex.: ``top_n_com_outros``)
+    ou é usado para totais, que não podem sair do recorte (ver
+    ``limitar_grafico``).
+    """
+    grao = [grao] if isinstance(grao, str) else list(grao)
+    valores = [valores] if isinstance(valores, str) else list(valores)
+
+    dados = df.groupby(grao, as_index=False, sort=True)[valores].sum()
+    return limitar_grafico(dados, grao, valores[0], limite)
+
+
+def limitar_grafico(
+    dados: pd.DataFrame,
+    grao,
+    valor: str,
+    limite: int | None = LIMITE_LINHAS_GRAFICO
+) -> pd.DataFrame:
+    """
+    Recorta um agregado de ``dados_grafico(..., limite=None)`` nas
+    ``limite`` linhas de maior ``valor``. Permite somar totais no agregado
+    completo e mandar só o recorte ao gráfico.
+    """
+    if limite is None or len(dados) <= limite:
+        return dados
+    return (
+        dados.nlargest(limite, valor)
+        .sort_values(grao, ignore_index=True)
+    )
+
+
+def top_n_com_outros(
+    df: pd.DataFrame,
+    grupo: str,
+    categoria: str,
+    valor: str,
+    n: int = 10
+) -> pd.DataFrame:
+    """
+    Mantém as ``n`` maiores ``categoria`` de cada ``grupo`` (ex.: ano) e soma
+    o restante em uma linha "Outros".
+
+    Usa seleção parcial (``np.argpartition``) em vez de ordenar o grupo
+    inteiro. O resultado tem no máximo ``grupos x (n + 1)`` linhas.
+    """
+    n = max(1, min(int(n), TOP_N_MAXIMO))
+    partes = []
+
+    for chave, bloco in df.groupby(grupo, sort=True):
+        valores = bloco[valor].to_numpy()
+
+        if len(bloco) <= n:
+            partes.append(bloco[[grupo, categoria, valor]])
+            continue
+
+        idx_top = np.argpartition(-valores, n - 1)[:n]
+        top = bloco.iloc[idx_top][[grupo, categoria, valor]]
+        restante = valores.sum() - valores[idx_top].sum()
+
+        partes.append(top)
+        partes.append(pd.DataFrame({
+            grupo: [chave],
+            categoria: [ROTULO_OUTROS],
+            valor: [restante],
+        }))
+
+    if not partes:
+        return df[[grupo, categoria, valor]].iloc[0:0]
+
+    return pd.concat(partes, ignore_index=True)
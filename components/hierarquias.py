@@ -0,0 +1,217 @@
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from components.filtros import chave_selecao, posicoes_filtradas
+from components.formatacao import config_moeda, formatar_brl
+from components.graficos import TOP_N_MAXIMO
+from data_loader import (
+    DESCRICOES_COLUNAS,
+    DESCRICOES_NIVEIS,
+    HIERARQUIAS,
+    load_empenhos_tratados,
+    versao_dataset,
+)
+
+SEM_ESCOLHA = "—"
+
+# Valores somados no cubo de cada hierarquia
+VALORES_CUBO = ["valorEmpenhadoLiquido", "valorEmpenhadoBruto", "valorEmpenhadoAnulado", "saldoBaixado"]
+
+
+# Filtros que o cubo completo já tem como dimensão (nome do filtro -> coluna)
+DIMENSOES_CUBO = {"ano": "anoEmpenho", "entidade": "nomeEntidade"}
+
+
+# ==========================
+# CUBO E AGREGAÇÕES POR NÍVEL
+# ==========================
+def _somar_cubo(base: pd.DataFrame, hierarquia: str) -> pd.DataFrame:
+    niveis = [coluna for coluna, _ in HIERARQUIAS[hierarquia]]
+    return base.groupby(
+        [*DIMENSOES_CUBO.values(), *niveis], observed=True, as_index=False, sort=True
+    )[VALORES_CUBO].sum()
+
+
+@st.cache_data(max_entries=8, show_spinner="📊 Calculando cubo...")
+def cubo_completo(hierarquia: str, versao: tuple) -> pd.DataFrame:
+    """
+    Somas por Exercício x Entidade x todos os níveis de ``hierarquia`` na
+    base inteira. Calculado uma vez por versão dos dados; seleções só de
+    exercício/entidade são recortes deste cubo.
+    """
+    return _somar_cubo(load_empenhos_tratados(), hierarquia)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cubo_linhas(selecao: tuple, hierarquia: str, versao: tuple) -> pd.DataFrame:
+    """Cubo das linhas da seleção (filtros de credor, fonte, despesa...)."""
+    base = load_empenhos_tratados().iloc[posicoes_filtradas(selecao, versao)]
+    return _somar_cubo(base, hierarquia)
+
+
+def cubo_hierarquia(selecao: tuple, hierarquia: str, versao: tuple) -> pd.DataFrame:
+    """
+    Cubo de ``hierarquia`` para a seleção (chave de ``chave_selecao``).
+
+    Seleções só de exercício/entidade recortam ``cubo_completo`` sem
+    tocar na base; as demais fazem uma passada sobre as linhas filtradas.
+    Cada nível do detalhamento é somado a partir deste cubo.
+    """
+    if all(dim in DIMENSOES_CUBO for dim, _ in selecao):
+        cubo = cubo_completo(hierarquia, versao)
+        for dim, valores in selecao:
+            cubo = cubo[cubo[DIMENSOES_CUBO[dim]].isin(valores)]
+        return cubo
+    return _cubo_linhas(selecao, hierarquia, versao)
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def agregado_nivel(
+    selecao: tuple,
+    hierarquia: str,
+    caminho: tuple,
+    versao: tuple
+) -> pd.DataFrame:
+    """
+    Somas por Exercício x nível ``len(caminho)`` dentro do ramo
+    ``caminho`` (códigos já escolhidos nos níveis acima).
+    """
+    cubo = cubo_hierarquia(selecao, hierarquia, versao)
+    niveis = [coluna for coluna, _ in HIERARQUIAS[hierarquia]]
+
+    for coluna, codigo in zip(niveis, caminho):
+        cubo = cubo[cubo[coluna] == codigo]
+
+    nivel = niveis[len(caminho)]
+    dados = cubo.groupby(
+        ["anoEmpenho", nivel], observed=True, as_index=False, sort=True
+    )[VALORES_CUBO].sum()
+    dados["codigo"] = dados.pop(nivel).astype(str)
+    return dados
+
+
+@st.cache_data(show_spinner=False)
+def descricoes_coluna(coluna: str, versao: tuple) -> dict:
+    """Descrição de cada código de ``coluna`` tirada dos CSVs (``DESCRICOES_COLUNAS``)."""
+    base = load_empenhos_tratados()
+    descricao = DESCRICOES_COLUNAS[coluna]
+    if descricao not in base.columns:
+        return {}
+    return base.groupby(coluna, observed=True)[descricao].first().to_dict()
+
+
+def _rotulo(coluna: str, codigo: str, versao: tuple) -> str:
+    if coluna in DESCRICOES_COLUNAS:
+        descricoes = descricoes_coluna(coluna, versao)
+    else:
+        descricoes = DESCRICOES_NIVEIS.get(coluna, {})
+    descricao = descricoes.get(codigo)
+    return f"{codigo} – {descricao}" if descricao else str(codigo)
+
+
+# ==========================
+# DETALHAMENTO NÍVEL A NÍVEL
+# ==========================
+@st.fragment
+def detalhar_hierarquia(selecao: dict, hierarquia: str, valor: str, chave: str, rotulo_valor: str):
+    """
+    Detalhamento de ``hierarquia`` (ver ``HIERARQUIAS``) para a seleção da
+    página: mostra o nível atual, e escolher um código desce um nível.
+
+    É um ``st.fragment``: descer ou voltar reexecuta só este bloco, e
+    cada nível vem de ``agregado_nivel`` (cache), sem reler a base.
+    """
+    niveis = HIERARQUIAS[hierarquia]
+    versao = versao_dataset()
+    selecao = chave_selecao(selecao)
+
+    estado = f"caminho_{chave}"
+    caminho = tuple(st.session_state.get(estado, ()))[: len(niveis) - 1]
+
+    # ----- trilha (breadcrumb) -----
+    trilha = " › ".join(
+        _rotulo(coluna, codigo, versao) for (coluna, _), codigo in zip(niveis, caminho)
+    )
+    c1, c2 = st.columns([5, 1])
+    with c1:
+        st.caption(f"📍 {trilha or 'Todos os níveis'}")
+    with c2:
+        if caminho:
+            st.button(
+                "⬆️ Voltar",
+                key=f"voltar_{chave}",
+                on_click=_ir_para,
+                args=(estado, caminho[:-1])
+            )
+
+    coluna, titulo = niveis[len(caminho)]
+    dados = agregado_nivel(selecao, hierarquia, caminho, versao)
+
+    if dados.empty:
+        st.info("Nenhum valor neste nível para os filtros selecionados.")
+        return
+
+    dados = dados.assign(
+        rotulo=[_rotulo(coluna, codigo, versao) for codigo in dados["codigo"]]
+    )
+
+    # Maiores códigos do nível (no total dos exercícios)
+    totais = dados.groupby("rotulo", as_index=False)[valor].sum()
+    maiores = totais.nlargest(TOP_N_MAXIMO, valor)["rotulo"]
+    grafico = dados[dados["rotulo"].isin(maiores)]
+
+    barras = (
+        alt.Chart(grafico)
+        .mark_bar()
+        .encode(
+            y=alt.Y("rotulo:N", sort="-x", title=titulo),
+            x=alt.X(f"sum({valor}):Q", title=f"{rotulo_valor} (R$)"),
+            color=alt.Color("anoEmpenho:N", title="Exercício"),
+            tooltip=[
+                alt.Tooltip("rotulo:N", title=titulo),
+                alt.Tooltip("anoEmpenho:N", title="Exercício"),
+                alt.Tooltip(f"{valor}:Q", format=",.2f", title=rotulo_valor)
+            ]
+        )
+        .properties(height=max(160, 28 * len(maiores)))
+    )
+    st.altair_chart(barras, use_container_width=True)
+
+    tabela = dados.pivot_table(
+        index="rotulo", columns="anoEmpenho", values=valor, aggfunc="sum", fill_value=0.0
+    )
+    tabela.columns = [str(c) for c in tabela.columns]
+    tabela["Total"] = tabela.sum(axis=1)
+    tabela = tabela.sort_values("Total", ascending=False)
+    st.dataframe(
+        tabela,
+        column_config=config_moeda(tabela.columns),
+        use_container_width=True
+    )
+    st.caption(f"Total do nível: {formatar_brl(tabela['Total'].sum())}")
+
+    # ----- descer um nível -----
+    if len(caminho) < len(niveis) - 1:
+        codigos = dict(zip(dados["rotulo"], dados["codigo"]))
+        proximo = niveis[len(caminho) + 1][1]
+        chave_escolha = f"descer_{chave}"
+        st.selectbox(
+            f"🔎 Detalhar por {proximo.lower()}",
+            [SEM_ESCOLHA, *codigos],
+            key=chave_escolha,
+            on_change=_descer,
+            args=(estado, chave_escolha, caminho, codigos)
+        )
+
+
+def _ir_para(estado: str, caminho: tuple):
+    st.session_state[estado] = caminho
+
+
+def _descer(estado: str, chave_escolha: str, caminho: tuple, codigos: dict):
+    """Callback do seletor: desce para o código escolhido e limpa o seletor."""
+    escolha = st.session_state[chave_escolha]
+    if escolha in codigos:
+        st.session_state[estado] = (*caminho, codigos[escolha])
+    st.session_state[chave_escolha] = SEM_ESCOLHA
@@ -0,0 +1,107 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components.formatacao import config_moeda, formatar_brl
+
+TAMANHOS_PAGINA = [50, 100, 500, 1000]
+SEM_ORDENACAO = "—"
+
+
+def posicoes_ordenadas(serie: pd.Series, decrescente: bool = False) -> np.ndarray:
+    """
+    Posições (``iloc``) de ``serie`` em ordem, com valores ausentes sempre
+    no fim. Ordenação estável: empates mantêm a ordem original.
+    """
+    ordenada = serie.reset_index(drop=True).sort_values(
+        ascending=not decrescente, kind="stable", na_position="last"
+    )
+    return ordenada.index.to_numpy()
+
+
+@st.fragment
+def tabela_paginada(
+    df: pd.DataFrame,
+    colunas: list,
+    colunas_valor: list = (),
+    rotulos: dict | None = None,
+    totais: dict | None = None,
+    chave: str = "detalhe"
+):
+    """
+    Tabela de detalhamento paginada no servidor.
+
+    É um ``st.fragment``: mudar ordenação ou página reexecuta só a tabela,
+    sem refazer filtros, agrupamentos e gráficos da página.
+
+    Só a página visível é recortada (``iloc``), formatada e enviada ao
+    navegador; a ordenação usa só a coluna escolhida
+    (``posicoes_ordenadas``), sem copiar a tabela inteira.
+
+    ``totais`` ({rótulo: valor}) deve vir das agregações já calculadas
+    pela página, não de uma nova soma sobre o detalhamento.
+    """
+    rotulos = rotulos or {}
+    total_linhas = len(df)
+
+    c1, c2, c3, c4 = st.columns([3, 2, 2, 2])
+
+    with c1:
+        ordenar_por = st.selectbox(
+            "Ordenar por",
+            [SEM_ORDENACAO] + list(colunas),
+            format_func=lambda c: rotulos.get(c, c),
+            key=f"{chave}_ordem"
+        )
+    with c2:
+        decrescente = st.toggle("Decrescente", value=True, key=f"{chave}_desc")
+    with c3:
+        tamanho = st.selectbox(
+            "Linhas por página",
+            TAMANHOS_PAGINA,
+            key=f"{chave}_tamanho"
+        )
+
+    paginas = max(1, math.ceil(total_linhas / tamanho))
+
+    with c4:
+        pagina = st.number_input(
+            f"Página (de {paginas})",
+            min_value=1,
+            max_value=paginas,
+            value=1,
+            step=1,
+            key=f"{chave}_pagina"
+        )
+
+    inicio = (int(pagina) - 1) * tamanho
+    fim = min(inicio + tamanho, total_linhas)
+
+    if ordenar_por == SEM_ORDENACAO:
+        posicoes = np.arange(inicio, fim)
+    else:
+        posicoes = posicoes_ordenadas(df[ordenar_por], decrescente)[inicio:fim]
+
+    # Recorta as linhas antes das colunas: só a janela é copiada
+    janela = df.iloc[posicoes][colunas]
+
+    config = {
+        col: rotulos[col]
+        for col in colunas
+        if col in rotulos and col not in colunas_valor
+    }
+    config.update(config_moeda(colunas_valor, rotulos))
+
+    st.dataframe(
+        janela,
+        use_container_width=True,
+        hide_index=True,
+        column_config=config
+    )
+
+    resumo = f"Linhas {inicio + 1 if total_linhas else 0}–{fim} de {total_linhas:,}".replace(",", ".")
+    for rotulo, valor in (totais or {}).items():
+        resumo += f" · {rotulo}: {formatar_brl(valor)}"
+    st.caption(resumo)
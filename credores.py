@@ -0,0 +1,233 @@
+# credores.py
+"""
+Resolução de credores: agrupa as variações de grafia de ``nomeCredor``
+(acentos, pontuação, sufixos societários, abreviações) e os ``idCredor``
+repetidos em uma entidade canônica.
+
+O índice é construído uma única vez no carregamento dos dados
+(``data_loader.load_empenhos``), de modo que agrupar ou filtrar pelo
+credor canônico nas páginas custa o mesmo que usar ``nomeCredor``.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+# Palavras que não distinguem credores (sufixos societários e preposições)
+PALAVRAS_IGNORADAS = {
+    "LTDA", "ME", "MEI", "EPP", "EIRELI", "SA", "S", "A", "CIA", "SS",
+    "DE", "DA", "DO", "DAS", "DOS", "E",
+}
+
+# Abreviações usuais nos cadastros
+ABREVIACOES = {
+    "MINAS GERAIS": "MG",
+    "SAO PAULO": "SP",
+    "RIO DE JANEIRO": "RJ",
+    "COMPANHIA": "CIA",
+    "ASSOC": "ASSOCIACAO",
+    "FUND": "FUNDACAO",
+}
+
+# Limiares de similaridade entre chaves do mesmo bloco
+LIMIAR_JACCARD = 0.8
+LIMIAR_SEQUENCIA = 0.92
+
+# Blocos maiores que isso não são comparados par a par (mantém custo ~linear)
+LIMITE_BLOCO = 100
+
+_NAO_ALFANUMERICO = re.compile(r"[^A-Z0-9]+")
+
+# Sigla destacada no fim do nome: "... - PRODEMGE", "...-EPAMIG", "... (SERPRO)"
+_SIGLA_FINAL = re.compile(r"[-–(]\s*([A-Z][A-Z0-9]{3,9})\)?\s*$")
+
+# Prefixo das chaves de nomes que só têm sufixos ("LTDA", "S/A ME"): não
+# entram na blocagem e não se juntam entre si
+_SEM_CHAVE = "\0"
+
+
+def _sem_acentos(nome) -> str:
+    texto = unicodedata.normalize("NFKD", str(nome).upper())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def normalizar_nome(nome) -> str:
+    """Chave de comparação: sem acentos, pontuação e sufixos societários."""
+    if nome is None or pd.isna(nome):
+        return ""
+    texto = _NAO_ALFANUMERICO.sub(" ", _sem_acentos(nome)).strip()
+    for longa, curta in ABREVIACOES.items():
+        texto = re.sub(rf"\b{longa}\b", curta, texto)
+    tokens = [t for t in texto.split() if t not in PALAVRAS_IGNORADAS]
+    return " ".join(tokens)
+
+
+def extrair_sigla(nome) -> str | None:
+    """
+    Sigla separada do resto do nome por hífen ou parênteses no fim (ex.:
+    "COMPANHIA DE TECNOLOGIA ... - PRODEMGE"). Palavras comuns no fim do
+    nome ("... INVESTIMENTOS LTDA") não são siglas.
+    """
+    if nome is None or pd.isna(nome):
+        return None
+    achado = _SIGLA_FINAL.search(_sem_acentos(nome).strip())
+    if achado is None or achado.group(1) in PALAVRAS_IGNORADAS:
+        return None
+    return achado.group(1)
+
+
+def _chaves_bloco(chave: str, siglas=()):
+    """Chaves de blocagem: só nomes que compartilham uma delas são comparados."""
+    tokens = chave.split()
+    if not tokens or chave.startswith(_SEM_CHAVE):
+        return []
+    blocos = [f"P:{tokens[0]} {tokens[1][:3] if len(tokens) > 1 else ''}"]
+    # Sigla destacada (ex.: "... - PRODEMGE") costuma identificar a entidade
+    blocos.extend(f"S:{sigla}" for sigla in sorted(siglas))
+    return blocos
+
+
+def _similares(a: str, b: str) -> bool:
+    ta, tb = set(a.split()), set(b.split())
+    # Números diferentes (ex.: "1 TABELIONATO" x "2 TABELIONATO") => credores diferentes
+    if {t for t in ta if t.isdigit()} != {t for t in tb if t.isdigit()}:
+        return False
+    if ta and tb and len(ta & tb) / len(ta | tb) >= LIMIAR_JACCARD:
+        return True
+    if min(len(a), len(b)) / max(len(a), len(b)) < LIMIAR_SEQUENCIA:
+        return False
+    sm = SequenceMatcher(None, a, b)
+    return sm.quick_ratio() >= LIMIAR_SEQUENCIA and sm.ratio() >= LIMIAR_SEQUENCIA
+
+
+class _UniaoBusca:
+    def __init__(self):
+        self.pai = {}
+        # idCredor conhecidos de cada grupo (pela raiz)
+        self.ids = defaultdict(set)
+
+    def achar(self, x):
+        self.pai.setdefault(x, x)
+        while self.pai[x] != x:
+            self.pai[x] = self.pai[self.pai[x]]
+            x = self.pai[x]
+        return x
+
+    def unir(self, a, b):
+        ra, rb = self.achar(a), self.achar(b)
+        if ra != rb:
+            self.pai[rb] = ra
+            self.ids[ra] |= self.ids.pop(rb, set())
+
+    def ids_conflitam(self, a, b) -> bool:
+        """Os dois grupos têm ``idCredor`` e nenhum em comum: são credores diferentes."""
+        ids_a, ids_b = self.ids.get(self.achar(a)), self.ids.get(self.achar(b))
+        return bool(ids_a and ids_b and ids_a.isdisjoint(ids_b))
+
+
+def _unir_compativeis(uf: _UniaoBusca, membros: list, parecidos):
+    """
+    Une cada ``(chave, nome)`` ao primeiro representante já formado com
+    chave ``parecidos`` e sem ``idCredor`` em conflito; senão ele vira
+    representante.
+    """
+    representantes = []
+    for chave, nome in membros:
+        for chave_rep, rep in representantes:
+            if uf.achar(rep) == uf.achar(nome):
+                break
+            if not uf.ids_conflitam(rep, nome) and parecidos(chave, chave_rep):
+                uf.unir(rep, nome)
+                break
+        else:
+            representantes.append((chave, nome))
+
+
+def construir_indice_credores(df: pd.DataFrame) -> pd.Series:
+    """
+    Retorna uma Series ``nomeCredor -> credorCanônico``.
+
+    1. Nomes com o mesmo ``idCredor`` são unidos.
+    2. Nomes com a mesma chave normalizada são unidos, salvo se os grupos
+       têm ``idCredor`` e nenhum em comum.
+    3. Dentro de cada bloco, chaves distintas são comparadas por
+       similaridade (Jaccard de tokens ou ``SequenceMatcher``), com a
+       mesma ressalva dos ``idCredor``.
+    4. O nome canônico é a grafia original mais frequente do grupo.
+
+    Nomes que só têm sufixos ("LTDA", "S/A ME") ficam cada um no seu grupo,
+    salvo pelo ``idCredor``.
+    """
+    if df.empty or "nomeCredor" not in df.columns:
+        return pd.Series(dtype=object)
+
+    base = pd.DataFrame({
+        "nome": df["nomeCredor"].astype(str).str.strip(),
+        "id": (
+            df["idCredor"].astype(str).str.strip()
+            if "idCredor" in df.columns else ""
+        ),
+    })
+    base = base[~base["nome"].isin(["", "nan", "None"])]
+
+    # Frequência de cada grafia (define o nome canônico)
+    freq = base["nome"].value_counts()
+    chave_nome = {
+        nome: normalizar_nome(nome) or f"{_SEM_CHAVE}{nome}" for nome in freq.index
+    }
+
+    siglas_chave = defaultdict(set)
+    for nome, chave in chave_nome.items():
+        sigla = extrair_sigla(nome)
+        if sigla is not None:
+            siglas_chave[chave].add(sigla)
+
+    # Os grupos são de grafias: a mesma chave pode ter credores diferentes
+    # ("JOAO DA SILVA ME" id 1 x "JOAO DA SILVA" id 2)
+    uf = _UniaoBusca()
+    for nome in freq.index:
+        uf.achar(nome)
+
+    pares = base.drop_duplicates()
+    pares = pares[~pares["id"].isin(["", "nan", "None"])]
+    for nome, id_credor in pares.itertuples(index=False, name=None):
+        uf.ids[nome].add(id_credor)
+
+    # 1) mesmo idCredor => mesma entidade
+    for _, nomes in pares.groupby("id")["nome"]:
+        nomes = list(nomes)
+        for outro in nomes[1:]:
+            uf.unir(nomes[0], outro)
+
+    # 2) mesma chave normalizada => mesma entidade, salvo ids em conflito
+    #    (grafias da chave em ordem de frequência)
+    por_chave = defaultdict(list)
+    for nome in freq.index:
+        por_chave[chave_nome[nome]].append(nome)
+    for nomes in por_chave.values():
+        _unir_compativeis(uf, [(None, nome) for nome in nomes], lambda a, b: True)
+
+    # 3) blocagem + similaridade, com uma grafia por grupo de cada chave
+    blocos = defaultdict(list)
+    for chave, nomes in por_chave.items():
+        grafias = {uf.achar(nome): nome for nome in reversed(nomes)}
+        for bloco in _chaves_bloco(chave, siglas_chave[chave]):
+            blocos[bloco].extend((chave, nome) for nome in grafias.values())
+
+    for membros in blocos.values():
+        if len(membros) < 2 or len(membros) > LIMITE_BLOCO:
+            continue
+        _unir_compativeis(uf, sorted(membros), _similares)
+
+    # 4) nome canônico = grafia mais frequente do grupo
+    #    (freq já está em ordem decrescente)
+    canonico_grupo = {}
+    for nome in freq.index:
+        canonico_grupo.setdefault(uf.achar(nome), nome)
+
+    return pd.Series(
+        {nome: canonico_grupo[uf.achar(nome)] for nome in chave_nome},
+        name="credorCanonico",
+    )
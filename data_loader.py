@@ -1,54 +1,324 @@
 # data_loader.py
+import tempfile
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import streamlit as st
 
-@st.cache_data(show_spinner="📂 Carregando empenhos...")
-def load_empenhos():
+from credores import construir_indice_credores
+
+# Colunas de valor usadas pelas páginas de consulta
+COLUNAS_VALOR = ["valorEmpenhadoBruto", "valorEmpenhadoAnulado", "saldoBaixado"]
+
+# Demais estágios da execução (liquidação, pagamento, retenções, restos a
+# pagar e saldos). Opcionais no CSV: ausentes viram 0, exceto
+# ``saldoPagar``, que é derivado (empenhado líquido - baixado)
+COLUNAS_ESTAGIOS = [
+    "valorLiquidadoBruto",
+    "valorLiquidadoAnulado",
+    "valorBaixadoBruto",
+    "valorBaixadoAnulado",
+    "valorRetidoBruto",
+    "valorRetidoAnulado",
+    "valorPagoRestosPagarProcessados",
+    "valorPagoRestosPagarNaoProcessados",
+    "valorPagoAnuladoRestosPagarProcessados",
+    "valorPagoAnuladoRestosPagarNaoProcessados",
+    "saldoAnulado",
+    "saldoPagar",
+]
+
+# Funil da execução: coluna calculada em ``calcular_estagios`` -> rótulo
+ESTAGIOS = {
+    "empenhado": "Empenhado",
+    "liquidado": "Liquidado",
+    "pago": "Pago",
+    "aPagar": "A Pagar",
+}
+
+PASTA_DADOS = Path("data")
+
+ENCODINGS = ["utf-8", "utf-8-sig", "latin1"]
+
+# Sem estas colunas o arquivo é recusado no upload
+COLUNAS_OBRIGATORIAS = [
+    "anoEmpenho",
+    "nomeEntidade",
+    "idCredor",
+    "nomeCredor",
+    "numRecurso",
+    "especificacao",
+    "Descrição da despesa",
+    *COLUNAS_VALOR,
+]
+
+# Formatos aceitos por ano, do preferido para o último recurso
+EXTENSOES = [".parquet", ".csv.gz", ".csv"]
+
+# ==========================
+# CLASSIFICAÇÕES HIERÁRQUICAS
+# ==========================
+# Níveis (do mais geral ao mais detalhado) de cada classificação:
+# [(coluna, rótulo)]. As colunas são derivadas dos códigos em
+# ``decompor_classificacoes``; cada nível traz o código acumulado
+# ("3.3.90") para ser único dentro da hierarquia.
+HIERARQUIAS = {
+    "natureza": [
+        ("natCategoria", "Categoria Econômica"),
+        ("natGrupo", "Grupo de Natureza"),
+        ("natModalidade", "Modalidade de Aplicação"),
+        ("natElemento", "Elemento de Despesa"),
+        ("natSubelemento", "Subelemento"),
+    ],
+    "fonte": [
+        ("fonteExercicio", "Exercício da Fonte"),
+        ("fonteGrupo", "Grupo da Fonte"),
+        ("fonteCodigo", "Fonte"),
+        ("numRecurso", "Fonte Detalhada"),
+    ],
+    "funcional": [
+        ("codFuncao", "Função"),
+        ("codSubfuncao", "Subfunção"),
+        ("codPrograma", "Programa"),
+        ("codAcao", "Ação"),
+    ],
+}
+
+NAO_INFORMADO = "Não informado"
+
+# "33901404000000" -> 3 | 3 | 90 | 14 | 04 (numNaturezaEmp traz o subelemento)
+_NATUREZA = r"\d{14}"
+# "1.500.000.0000" -> exercício 1 | grupo 5 | fonte 500 | detalhamento
+_RECURSO = r"\d\.\d{3}\.\d{3}\.\d{4}"
+
+# Funcional-programática: "4" | "122" | "11" | "2.181" -> 04 | 122 | 0011 | 2.181
+_FUNCAO = r"\d{1,2}"
+_SUBFUNCAO = r"\d{1,3}"
+_PROGRAMA = r"\d{1,4}"
+_ACAO = r"\d\.\d{3}"
+
+# coluna derivada -> (coluna de origem, formato válido, fatiamento do código)
+_NIVEIS_CODIGO = {
+    "natCategoria": ("numNaturezaDesp", _NATUREZA, lambda c: c.str[0]),
+    "natGrupo": ("numNaturezaDesp", _NATUREZA, lambda c: c.str[0] + "." + c.str[1]),
+    "natModalidade": (
+        "numNaturezaDesp", _NATUREZA,
+        lambda c: c.str[0] + "." + c.str[1] + "." + c.str[2:4]
+    ),
+    "natElemento": (
+        "numNaturezaDesp", _NATUREZA,
+        lambda c: c.str[0] + "." + c.str[1] + "." + c.str[2:4] + "." + c.str[4:6]
+    ),
+    "natSubelemento": (
+        "numNaturezaEmp", _NATUREZA,
+        lambda c: (
+            c.str[0] + "." + c.str[1] + "." + c.str[2:4] + "." + c.str[4:6] + "." + c.str[6:8]
+        )
+    ),
+    "fonteExercicio": ("numRecurso", _RECURSO, lambda c: c.str[0]),
+    "fonteGrupo": ("numRecurso", _RECURSO, lambda c: c.str[0] + "." + c.str[2]),
+    "fonteCodigo": ("numRecurso", _RECURSO, lambda c: c.str[:5]),
+    "codFuncao": ("numFuncao", _FUNCAO, lambda c: c.str.zfill(2)),
+    "codSubfuncao": ("numSubfuncao", _SUBFUNCAO, lambda c: c.str.zfill(3)),
+    "codPrograma": ("numPrograma", _PROGRAMA, lambda c: c.str.zfill(4)),
+    "codAcao": ("numAcao", _ACAO, lambda c: c),
+}
+
+# Descrições dos níveis mais gerais (Portaria Interministerial 163/2001
+# e classificação de fontes da STN); os demais mostram só o código
+DESCRICOES_NIVEIS = {
+    "natCategoria": {
+        "3": "Despesas Correntes",
+        "4": "Despesas de Capital",
+    },
+    "natGrupo": {
+        "3.1": "Pessoal e Encargos Sociais",
+        "3.2": "Juros e Encargos da Dívida",
+        "3.3": "Outras Despesas Correntes",
+        "4.4": "Investimentos",
+        "4.5": "Inversões Financeiras",
+        "4.6": "Amortização da Dívida",
+    },
+    "fonteExercicio": {
+        "1": "Recursos do Exercício Corrente",
+        "2": "Recursos de Exercícios Anteriores",
+    },
+    # Portaria MOG 42/1999
+    "codFuncao": {
+        "01": "Legislativa",
+        "02": "Judiciária",
+        "03": "Essencial à Justiça",
+        "04": "Administração",
+        "05": "Defesa Nacional",
+        "06": "Segurança Pública",
+        "07": "Relações Exteriores",
+        "08": "Assistência Social",
+        "09": "Previdência Social",
+        "10": "Saúde",
+        "11": "Trabalho",
+        "12": "Educação",
+        "13": "Cultura",
+        "14": "Direitos da Cidadania",
+        "15": "Urbanismo",
+        "16": "Habitação",
+        "17": "Saneamento",
+        "18": "Gestão Ambiental",
+        "19": "Ciência e Tecnologia",
+        "20": "Agricultura",
+        "21": "Organização Agrária",
+        "22": "Indústria",
+        "23": "Comércio e Serviços",
+        "24": "Comunicações",
+        "25": "Energia",
+        "26": "Transporte",
+        "27": "Desporto e Lazer",
+        "28": "Encargos Especiais",
+        "99": "Reserva de Contingência",
+    },
+    "codSubfuncao": {
+        "031": "Ação Legislativa",
+        "122": "Administração Geral",
+        "123": "Administração Financeira",
+        "126": "Tecnologia da Informação",
+        "131": "Comunicação Social",
+        "181": "Policiamento",
+        "182": "Defesa Civil",
+        "241": "Assistência ao Idoso",
+        "242": "Assistência ao Portador de Deficiência",
+        "243": "Assistência à Criança e ao Adolescente",
+        "244": "Assistência Comunitária",
+        "271": "Previdência Básica",
+        "272": "Previdência do Regime Estatutário",
+        "301": "Atenção Básica",
+        "302": "Assistência Hospitalar e Ambulatorial",
+        "303": "Suporte Profilático e Terapêutico",
+        "304": "Vigilância Sanitária",
+        "305": "Vigilância Epidemiológica",
+        "306": "Alimentação e Nutrição",
+        "361": "Ensino Fundamental",
+        "362": "Ensino Médio",
+        "365": "Educação Infantil",
+        "366": "Educação de Jovens e Adultos",
+        "367": "Educação Especial",
+        "392": "Difusão Cultural",
+        "451": "Infraestrutura Urbana",
+        "452": "Serviços Urbanos",
+        "482": "Habitação Urbana",
+        "512": "Saneamento Básico Urbano",
+        "541": "Preservação e Conservação Ambiental",
+        "606": "Extensão Rural",
+        "782": "Transporte Rodoviário",
+        "812": "Desporto Comunitário",
+        "813": "Lazer",
+        "841": "Refinanciamento da Dívida Interna",
+        "843": "Serviço da Dívida Interna",
+        "846": "Outros Encargos Especiais",
+    },
+}
+
+# Níveis cuja descrição vem de uma coluna dos próprios CSVs
+DESCRICOES_COLUNAS = {
+    "natElemento": "Descrição da natureza",
+    "codAcao": "Descrição da despesa",
+}
+
+
+def _base(nome: str) -> str:
+    """'2024_empenhos.csv.gz' -> '2024_empenhos'."""
+    return nome.split(".", 1)[0]
+
+
+def nome_particao(nome: str) -> str:
+    """Nome da partição Parquet correspondente a um CSV ('2024_empenhos.parquet')."""
+    return _base(nome) + ".parquet"
+
+
+def arquivos_empenhos() -> list:
     """
-    Carrega todos os arquivos CSV de empenhos da pasta 'data', 
-    tentando diferentes encodings para evitar problemas de acentuação.
+    Um arquivo de empenhos por ano em ``data/``: a partição Parquet
+    (gerada no upload) se existir; senão o CSV compactado; senão o CSV.
     """
-    arquivos = sorted(Path("data").glob("*_empenhos.csv"))
+    escolhido = {}
+    for extensao in reversed(EXTENSOES):
+        for arq in PASTA_DADOS.glob(f"*_empenhos{extensao}"):
+            escolhido[_base(arq.name)] = arq
+    return [escolhido[base] for base in sorted(escolhido)]
 
-    if not arquivos:
-        return pd.DataFrame()
 
-    dfs = []
+def versao_dataset() -> tuple:
+    """
+    Identifica a versão dos dados em disco (nome, tamanho e data de
+    modificação de cada arquivo). Muda a cada upload/exclusão e serve de
+    chave para os resumos pré-calculados.
+    """
+    return tuple(
+        (arq.name, arq.stat().st_size, arq.stat().st_mtime_ns)
+        for arq in arquivos_empenhos()
+    )
 
-    for arq in arquivos:
-        encodings = ["utf-8", "utf-8-sig", "latin1"]
-        df = None
-        for enc in encodings:
-            try:
-                df = pd.read_csv(
-                    arq,
-                    sep=";",
-                    dtype=str,
-                    encoding=enc,
-                    engine="python",
-                    on_bad_lines="skip"
-                )
-                break  # leu corretamente
-            except Exception:
-                continue
-        
-        if df is None:
-            st.warning(f"⚠️ Não foi possível ler {arq.name}.")
+
+def _para_numero(serie: pd.Series) -> pd.Series:
+    """
+    Converte texto em número aceitando os dois formatos dos CSVs:
+    pt-BR ("1.234,56") e ponto decimal ("1234.56", colunas saldo*).
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float).fillna(0.0)
+
+    texto = serie.astype(str).str.strip()
+    pt_br = texto.str.contains(",", regex=False)
+    texto = texto.mask(
+        pt_br,
+        texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    )
+    return pd.to_numeric(texto, errors="coerce").fillna(0.0)
+
+
+# ==========================
+# PARTIÇÕES (um arquivo por ano)
+# ==========================
+def ler_csv_empenhos(origem):
+    """
+    Lê um CSV de empenhos (caminho ou arquivo aberto) como texto,
+    tentando diferentes encodings para evitar problemas de acentuação.
+    Devolve ``None`` se nenhum funcionar.
+    """
+    for enc in ENCODINGS:
+        if hasattr(origem, "seek"):
+            origem.seek(0)
+        try:
+            return pd.read_csv(
+                origem,
+                sep=";",
+                dtype=str,
+                encoding=enc,
+                engine="python",
+                on_bad_lines="skip"
+            )
+        except Exception:
             continue
+    return None
 
-        # Corrigir caracteres estranhos (ex: Ã)
-        for col in df.select_dtypes(include=["object"]).columns:
-            df[col] = df[col].astype(str).apply(lambda x: x.encode('utf-8', errors='replace').decode('utf-8'))
 
-        # Extrair o ano do nome do arquivo
-        df["Ano"] = arq.stem.split("_")[0]
-        dfs.append(df)
+def validar_esquema(df: pd.DataFrame) -> list:
+    """Colunas obrigatórias ausentes (lista vazia = arquivo válido)."""
+    return [col for col in COLUNAS_OBRIGATORIAS if col not in df.columns]
 
-    if not dfs:
-        return pd.DataFrame()
 
-    df = pd.concat(dfs, ignore_index=True)
+def preparar_particao(df: pd.DataFrame, ano: str) -> pd.DataFrame:
+    """
+    Tratamento que depende só do próprio arquivo: texto corrigido, ano do
+    arquivo e colunas de valor numéricas. É o que vai para o Parquet.
+    """
+    # Corrigir caracteres estranhos (ex: Ã)
+    for col in df.select_dtypes(include=["object"]).columns:
+        df[col] = df[col].astype(str).apply(lambda x: x.encode('utf-8', errors='replace').decode('utf-8'))
+
+    # Extrair o ano do nome do arquivo
+    df["Ano"] = str(ano)
 
     # Criar colunas numéricas padronizadas (sem espaços, vírgulas para ponto)
     mapping = {
@@ -59,18 +329,13 @@ def load_empenhos():
 
     for origem, destino in mapping.items():
         if origem in df.columns:
-            df[destino] = (
-                df[origem]
-                .astype(str)
-                .str.replace(".", "", regex=False)
-                .str.replace(",", ".", regex=False)
-            )
-            df[destino] = pd.to_numeric(df[destino], errors="coerce").fillna(0.0)
+            df[destino] = _para_numero(df[origem])
         else:
             df[destino] = 0.0
 
-    # Mantém compatibilidade antiga
-    df["Valor"] = df["valorEmpenhadoBruto_num"]
+    for col in COLUNAS_VALOR + COLUNAS_ESTAGIOS:
+        if col in df.columns:
+            df[col] = _para_numero(df[col])
 
     # Limpeza de strings para evitar problemas em filtros
     for col in ["nomeCredor", "numRecurso", "numNaturezaEmp"]:
@@ -79,6 +344,105 @@ def load_empenhos():
         else:
             df[col] = ""
 
+    return df
+
+
+def gerar_parquet(origem, nome: str):
+    """
+    Converte um CSV enviado em partição Parquet (zstd) num arquivo
+    temporário. Valida o esquema antes: levanta ``ValueError`` com as
+    colunas ausentes ou se o arquivo não puder ser lido.
+
+    Devolve ``(arquivo, linhas)``.
+    """
+    df = ler_csv_empenhos(origem)
+    if df is None:
+        raise ValueError(f"{nome}: não foi possível ler o arquivo")
+
+    faltando = validar_esquema(df)
+    if faltando:
+        raise ValueError(f"{nome}: colunas ausentes: {', '.join(faltando)}")
+
+    df = preparar_particao(df, nome.split("_")[0])
+
+    destino = tempfile.TemporaryFile()
+    df.to_parquet(destino, index=False, compression="zstd")
+    destino.seek(0)
+    if hasattr(origem, "seek"):
+        origem.seek(0)
+    return destino, len(df)
+
+
+# Partições já lidas: {(nome, tamanho, mtime): DataFrame}. Quando um ano
+# muda, só ele é relido; os demais vêm daqui.
+_particoes: dict = {}
+_trava_particoes = threading.Lock()
+
+
+def carregar_particao(arq: Path):
+    """DataFrame de um arquivo de ``data/`` (Parquet, CSV ou CSV.gz); ``None`` se ilegível."""
+    estado = arq.stat()
+    chave = (arq.name, estado.st_size, estado.st_mtime_ns)
+    with _trava_particoes:
+        if chave in _particoes:
+            return _particoes[chave]
+
+    if arq.suffix == ".parquet":
+        try:
+            df = pd.read_parquet(arq)
+        except Exception:
+            return None
+    else:
+        df = ler_csv_empenhos(arq)
+        if df is None:
+            return None
+        df = preparar_particao(df, arq.name.split("_")[0])
+
+    with _trava_particoes:
+        for antiga in [c for c in _particoes if c[0] == arq.name]:
+            del _particoes[antiga]
+        _particoes[chave] = df
+    return df
+
+
+def load_empenhos(ilegiveis: list | None = None):
+    """
+    Junta as partições de ``data/`` (uma por ano, ver ``arquivos_empenhos``)
+    e calcula o que depende da base inteira (credor canônico).
+
+    Não usa ``st.*``: roda na thread de aquecimento. Os arquivos que não
+    puderam ser lidos são anotados em ``ilegiveis``.
+    """
+    arquivos = arquivos_empenhos()
+
+    if not arquivos:
+        return pd.DataFrame()
+
+    dfs = []
+
+    for arq in arquivos:
+        df = carregar_particao(arq)
+
+        if df is None:
+            if ilegiveis is not None:
+                ilegiveis.append(arq.name)
+            continue
+
+        dfs.append(df)
+
+    if not dfs:
+        return pd.DataFrame()
+
+    # concat copia: as partições guardadas não são alteradas abaixo
+    df = pd.concat(dfs, ignore_index=True)
+
+    # Mantém compatibilidade antiga
+    df["Valor"] = df["valorEmpenhadoBruto_num"]
+
+    # Credor canônico (agrupa variações de grafia / idCredor do mesmo credor)
+    indice_credores = construir_indice_credores(df)
+    df["credorCanonico"] = df["nomeCredor"].map(indice_credores).fillna(df["nomeCredor"])
+
     # Garantir tipos consistentes
     df["Ano"] = df["Ano"].astype(str)
     for col in ["valorEmpenhadoBruto_num", "valorEmpenhadoAnulado_num", "valorBaixadoBruto_num"]:
@@ -88,3 +452,260 @@ def load_empenhos():
             df[col] = 0.0
 
     return df
+
+
+def tratar_empenhos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Limpa e tipa a base bruta (Exercício e Entidade normalizados,
+    colunas de valor numéricas). Também roda na thread de aquecimento.
+    """
+    if df.empty:
+        return df
+
+    df["anoEmpenho"] = (
+        df["anoEmpenho"]
+        .astype(str)
+        .str.replace(".0", "", regex=False)
+        .str.strip()
+        .replace(["nan", "None", ""], pd.NA)
+    )
+
+    for col in ["nomeEntidade", "Descrição da despesa"]:
+        df[col] = (
+            df[col]
+            .astype(str)
+            .str.strip()
+            .replace(["nan", "None", ""], pd.NA)
+        )
+
+    df = df.dropna(subset=["anoEmpenho", "nomeEntidade"]).reset_index(drop=True)
+
+    # Arquivos antigos sem saldoPagar junto de novos: o concat deixa NaN
+    # nessas linhas, que são derivadas abaixo (a tipagem as zeraria)
+    sem_saldo_pagar = (
+        df["saldoPagar"].isna().to_numpy()
+        if "saldoPagar" in df.columns
+        else np.ones(len(df), dtype=bool)
+    )
+
+    # Tipadas uma vez aqui (partições antigas ainda trazem texto)
+    for col in COLUNAS_VALOR + COLUNAS_ESTAGIOS:
+        if col in df.columns:
+            df[col] = _para_numero(df[col])
+        else:
+            df[col] = 0.0
+
+    df["valorEmpenhadoLiquido"] = (
+        df["valorEmpenhadoBruto"] - df["valorEmpenhadoAnulado"]
+    )
+
+    df["saldoPagar"] = np.where(
+        sem_saldo_pagar,
+        df["valorEmpenhadoLiquido"] - df["saldoBaixado"],
+        df["saldoPagar"]
+    )
+
+    return decompor_classificacoes(df)
+
+
+def decompor_classificacoes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Separa natureza da despesa, fonte de recurso e classificação
+    funcional-programática nos níveis de ``HIERARQUIAS`` (colunas
+    categóricas).
+
+    O fatiamento é feito só sobre os códigos distintos (categorias da
+    coluna de origem, algumas dezenas) e levado às linhas pelos códigos
+    inteiros da categoria, sem operar texto linha a linha. Códigos fora
+    do formato (inclusive vazios) viram ``NAO_INFORMADO``.
+    """
+    categoricas = {}
+    for destino, (origem, formato, fatiar) in _NIVEIS_CODIGO.items():
+        if origem not in categoricas:
+            serie = df[origem] if origem in df.columns else pd.Series("", index=df.index)
+            categoricas[origem] = serie.astype(str).str.strip().astype("category")
+        coluna = categoricas[origem]
+
+        codigos = pd.Series(coluna.cat.categories.astype(str))
+        validos = codigos.str.fullmatch(formato)
+        niveis = pd.Series(NAO_INFORMADO, index=codigos.index, dtype=object)
+        # Fatia só os códigos no formato (coluna ausente ou vazia não tem nenhum)
+        niveis[validos] = fatiar(codigos[validos])
+
+        rotulos, posicoes = np.unique(niveis.to_numpy(dtype=str), return_inverse=True)
+        df[destino] = pd.Categorical.from_codes(
+            posicoes[coluna.cat.codes.to_numpy()],
+            categories=rotulos
+        )
+
+    return df
+
+
+# ==========================
+# AQUECIMENTO EM SEGUNDO PLANO
+# ==========================
+# Uma carga por versão dos dados, feita fora das sessões: o processo
+# começa a ler e indexar enquanto o usuário ainda está no login.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aquecimento-empenhos")
+_cargas: dict = {}
+_trava = threading.Lock()
+
+
+def _preparar_base():
+    ilegiveis = []
+    df = tratar_empenhos(load_empenhos(ilegiveis))
+    return df, ilegiveis
+
+
+def aquecer(versao: tuple | None = None) -> Future:
+    """
+    Dispara (se ainda não disparou) a carga da versão atual dos dados em
+    segundo plano e devolve o ``Future`` compartilhado.
+
+    Não depende de sessão: pode ser chamada antes do login ou por um
+    gancho de aquecimento do processo. Uma versão nova (upload, exclusão)
+    gera uma nova carga; uma carga que falhou é refeita na próxima chamada.
+    """
+    versao = versao_dataset() if versao is None else versao
+    with _trava:
+        futuro = _cargas.get(versao)
+        if futuro is None or (futuro.done() and futuro.exception() is not None):
+            # Só as que ainda não começaram são canceladas; quem já
+            # esperava por elas passa para esta (load_empenhos_tratados)
+            for antigo in _cargas.values():
+                antigo.cancel()
+            _cargas.clear()
+            futuro = _cargas[versao] = _executor.submit(_preparar_base)
+        return futuro
+
+
+def load_empenhos_tratados():
+    """
+    Base limpa e tipada usada pelas páginas de consulta.
+
+    Aguarda a carga em segundo plano da versão atual (``aquecer``). O
+    mesmo objeto é compartilhado entre sessões e as páginas NÃO devem
+    alterá-lo (filtros e agrupamentos já geram novos objetos).
+    """
+    while True:
+        futuro = aquecer()
+        try:
+            if futuro.done():
+                df, ilegiveis = futuro.result()
+            else:
+                with st.spinner("📂 Carregando empenhos..."):
+                    df, ilegiveis = futuro.result()
+            break
+        except CancelledError:
+            # A carga esperada foi trocada por uma versão mais nova dos
+            # dados (upload/exclusão) antes de começar: espera a nova
+            continue
+
+    for nome in ilegiveis:
+        st.warning(f"⚠️ Não foi possível ler {nome}.")
+
+    return df
+
+
+@st.cache_data(show_spinner="📊 Calculando resumo...")
+def resumo_visao_geral(versao: tuple) -> pd.DataFrame:
+    """
+    Somas por Exercício x Entidade usadas pela página inicial, incluindo
+    "Restos a Pagar" (``saldoPagar`` do CSV).
+
+    Calculado uma vez por ``versao`` (ver ``versao_dataset``); a página
+    filtra e soma só esta tabela, sem tocar na base completa.
+    """
+    df = load_empenhos_tratados()
+    if df.empty:
+        return pd.DataFrame(
+            columns=["anoEmpenho", "nomeEntidade", *COLUNAS_VALOR, "Restos a Pagar"]
+        )
+
+    resumo = df.groupby(
+        ["anoEmpenho", "nomeEntidade"], as_index=False, sort=True
+    )[[*COLUNAS_VALOR, "saldoPagar"]].sum()
+
+    return resumo.rename(columns={"saldoPagar": "Restos a Pagar"})
+
+
+# ==========================
+# ESTÁGIOS DA EXECUÇÃO
+# ==========================
+def calcular_estagios(somas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Acrescenta as colunas de ``ESTAGIOS`` (e os detalhes do "a pagar") a
+    uma tabela com as somas de ``COLUNAS_VALOR`` + ``COLUNAS_ESTAGIOS``.
+
+    Os estágios são combinações lineares das colunas, então podem ser
+    calculados sobre somas já agrupadas (poucas linhas), em operações
+    de coluna inteira:
+
+    - empenhado = bruto - anulado
+    - liquidado = liquidado bruto - anulado
+    - pago = baixado no exercício (``saldoBaixado``, inclui retenções)
+    - a pagar = ``saldoPagar``, dividido em liquidado a pagar (processado)
+      e empenhado a liquidar (não processado)
+    """
+    empenhado = somas["valorEmpenhadoBruto"].to_numpy() - somas["valorEmpenhadoAnulado"].to_numpy()
+    liquidado = somas["valorLiquidadoBruto"].to_numpy() - somas["valorLiquidadoAnulado"].to_numpy()
+    pago = somas["saldoBaixado"].to_numpy()
+
+    return somas.assign(
+        empenhado=empenhado,
+        liquidado=liquidado,
+        pago=pago,
+        aPagar=somas["saldoPagar"].to_numpy(),
+        liquidadoAPagar=np.clip(liquidado - pago, 0.0, None),
+        aLiquidar=np.clip(empenhado - liquidado, 0.0, None),
+        retido=somas["valorRetidoBruto"].to_numpy() - somas["valorRetidoAnulado"].to_numpy(),
+        restosPagos=(
+            somas["valorPagoRestosPagarProcessados"].to_numpy()
+            - somas["valorPagoAnuladoRestosPagarProcessados"].to_numpy()
+            + somas["valorPagoRestosPagarNaoProcessados"].to_numpy()
+            - somas["valorPagoAnuladoRestosPagarNaoProcessados"].to_numpy()
+        ),
+    )
+
+
+def somar_estagios(df: pd.DataFrame, grao: list) -> pd.DataFrame:
+    """Soma as colunas de valor/estágio no ``grao`` e calcula os estágios."""
+    somas = df.groupby(grao, as_index=False, sort=True, observed=True)[
+        [*COLUNAS_VALOR, *COLUNAS_ESTAGIOS]
+    ].sum()
+    return calcular_estagios(somas)
+
+
+@st.cache_data(show_spinner="📊 Calculando estágios da execução...")
+def funil_execucao(versao: tuple) -> pd.DataFrame:
+    """
+    Estágios da execução por Exercício x Entidade na base inteira.
+    Calculado uma vez por ``versao``; seleções de exercício/entidade
+    são recortes desta tabela.
+    """
+    df = load_empenhos_tratados()
+    if df.empty:
+        vazio = pd.DataFrame(
+            columns=["anoEmpenho", "nomeEntidade", *COLUNAS_VALOR, *COLUNAS_ESTAGIOS],
+            dtype=float
+        )
+        return calcular_estagios(vazio)
+    return somar_estagios(df, ["anoEmpenho", "nomeEntidade"])
+
+
+def recarregar_particoes(nomes=()) -> Future:
+    """
+    Recarga dirigida após upload/exclusão: descarta só as partições dos
+    anos de ``nomes`` (todos os formatos) e a carga atual, e reinicia o
+    aquecimento. Os demais anos vêm do cache de partições; resumos e
+    filtros são refeitos porque a versão dos dados muda.
+    """
+    bases = {_base(Path(nome).name) for nome in nomes}
+    with _trava_particoes:
+        for chave in [c for c in _particoes if _base(c[0]) in bases]:
+            del _particoes[chave]
+    with _trava:
+        for futuro in _cargas.values():
+            futuro.cancel()
+        _cargas.clear()
+    return aquecer()
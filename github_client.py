@@ -0,0 +1,549 @@
+import base64
+import io
+import json
+import os
+import posixpath
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ==========================
+# CONFIGURAÇÃO
+# ==========================
+REPO = "planejamentobarbacena-web/Comparativos_Empenhos"
+BRANCH = "master"
+API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# (conexão, leitura) em segundos
+TIMEOUT = (5, 30)
+
+# Tentativas por requisição (falha de rede, 5xx, limite secundário)
+MAX_TENTATIVAS = 4
+ESPERA_BASE = 1.0
+# Acima disso não vale segurar a página: a requisição falha com o aviso
+ESPERA_MAXIMA = 30.0
+
+STATUS_TEMPORARIOS = {500, 502, 503, 504}
+
+# Envio em streaming: bytes lidos do arquivo por vez (múltiplo de 3, para
+# o base64 de cada bloco não ter "=" no meio do corpo)
+BLOCO_ENVIO = 3 * 256 * 1024
+# Acima disso o arquivo vai pela Git Data API (blob + commit) em vez da
+# API de conteúdo, que recusa corpos grandes
+LIMITE_CONTENTS_API = 20 * 1024 * 1024
+# Só arquivos pequenos (JSONs) ficam guardados para leituras condicionais
+LIMITE_CACHE_CONTEUDO = 1024 * 1024
+
+
+class ErroGitHub(Exception):
+    """Resposta de erro da API do GitHub (depois das tentativas)."""
+
+    def __init__(self, mensagem, status=None, resposta=None):
+        super().__init__(mensagem)
+        self.status = status
+        self.resposta = resposta
+
+
+# O que uma chamada ao GitHub pode levantar: resposta de erro ou falha de
+# rede (sem conexão, timeout) depois das tentativas
+ERROS_GITHUB = (ErroGitHub, requests.RequestException)
+
+
+# ==========================
+# SESSÃO (conexões reaproveitadas)
+# ==========================
+_sessao = None
+_trava = threading.Lock()
+
+
+def _token():
+    token = os.getenv("GITHUB_TOKEN")
+    if token:
+        return token
+    try:
+        import streamlit as st
+        return st.secrets["GITHUB_TOKEN"]
+    except Exception:
+        return None
+
+
+def sessao() -> requests.Session:
+    """
+    Sessão HTTP única do processo: mantém as conexões TLS abertas
+    (keep-alive) entre as chamadas de todas as páginas.
+    """
+    global _sessao
+    with _trava:
+        if _sessao is None:
+            s = requests.Session()
+            s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            s.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            s.headers["Accept"] = "application/vnd.github.v3+json"
+            token = _token()
+            if token:
+                s.headers["Authorization"] = f"token {token}"
+            _sessao = s
+        return _sessao
+
+
+def _espera_limite(r: requests.Response):
+    """
+    Segundos a aguardar se a resposta for de limite de requisições
+    (primário ou secundário), ou ``None`` se não for.
+    """
+    if r.status_code not in (403, 429):
+        return None
+
+    if "Retry-After" in r.headers:
+        try:
+            return float(r.headers["Retry-After"])
+        except ValueError:
+            return ESPERA_BASE
+
+    if r.headers.get("X-RateLimit-Remaining") == "0":
+        reinicio = float(r.headers.get("X-RateLimit-Reset", 0))
+        return max(reinicio - time.time(), 0) + 1
+
+    # Limite secundário sem cabeçalhos: o GitHub pede ao menos 1 minuto
+    if r.status_code == 429 or "rate limit" in r.text.lower():
+        return 60.0
+
+    # 403 comum (permissão): não é limite
+    return None
+
+
+def _recuo(tentativa: int) -> float:
+    """Recuo exponencial com jitter ("full jitter")."""
+    return random.uniform(0, ESPERA_BASE * 2 ** tentativa)
+
+
+def requisitar(metodo: str, url: str, **kwargs) -> requests.Response:
+    """
+    Faz a requisição pela sessão compartilhada, com timeout e novas
+    tentativas limitadas em falhas de rede, erros 5xx e limites de taxa.
+
+    ``url`` pode ser relativa à API (``/repos/...``). A resposta final é
+    devolvida como veio; quem chama decide o que é erro.
+    """
+    if url.startswith("/"):
+        url = API_URL + url
+    kwargs.setdefault("timeout", TIMEOUT)
+
+    for tentativa in range(MAX_TENTATIVAS):
+        ultima = tentativa == MAX_TENTATIVAS - 1
+        # Corpo em streaming é relido do início a cada tentativa
+        if hasattr(kwargs.get("data"), "seek"):
+            kwargs["data"].seek(0)
+        try:
+            r = sessao().request(metodo, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if ultima:
+                raise
+            time.sleep(_recuo(tentativa))
+            continue
+
+        espera = _espera_limite(r)
+        if espera is not None:
+            if ultima or espera > ESPERA_MAXIMA:
+                return r
+            time.sleep(espera + random.uniform(0, ESPERA_BASE))
+            continue
+
+        if r.status_code in STATUS_TEMPORARIOS and not ultima:
+            time.sleep(_recuo(tentativa))
+            continue
+
+        return r
+
+    return r
+
+
+def _erro(r: requests.Response, mensagem: str) -> ErroGitHub:
+    try:
+        resposta = r.json()
+    except ValueError:
+        resposta = r.text
+    return ErroGitHub(f"{mensagem} (HTTP {r.status_code})", r.status_code, resposta)
+
+
+# ==========================
+# CORPO EM STREAMING (base64 sob demanda)
+# ==========================
+def abrir_conteudo(conteudo):
+    """Aceita ``bytes`` ou arquivo binário (com ``seek``); devolve (arquivo, tamanho)."""
+    if isinstance(conteudo, (bytes, bytearray)):
+        conteudo = io.BytesIO(conteudo)
+    conteudo.seek(0, io.SEEK_END)
+    tamanho = conteudo.tell()
+    conteudo.seek(0)
+    return conteudo, tamanho
+
+
+class _CorpoBase64:
+    """
+    Corpo JSON ``{..., "content": "<base64>"}`` montado enquanto é enviado.
+
+    Só um bloco de ``BLOCO_ENVIO`` bytes (e seu base64) fica em memória:
+    nem os bytes, nem o base64, nem o JSON completos existem de uma vez.
+    O tamanho é conhecido de antemão, então vai com ``Content-Length``.
+    """
+
+    def __init__(self, origem, tamanho: int, campos: dict):
+        self._origem = origem
+        self._prefixo = (json.dumps(campos)[:-1] + ', "content": "').encode("ascii")
+        self._sufixo = b'"}'
+        self._tamanho = len(self._prefixo) + 4 * -(-tamanho // 3) + len(self._sufixo)
+        self.enviados = 0
+        self.seek(0)
+
+    def __len__(self):
+        return self._tamanho
+
+    def seek(self, posicao, *_):
+        self._origem.seek(0)
+        self._buffer = self._prefixo
+        self._fim = False
+        self.enviados = 0
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            n = self._tamanho
+        while len(self._buffer) < n and not self._fim:
+            bloco = self._origem.read(BLOCO_ENVIO)
+            if bloco:
+                self.enviados += len(bloco)
+                self._buffer += base64.b64encode(bloco)
+            else:
+                self._buffer += self._sufixo
+                self._fim = True
+        saida, self._buffer = self._buffer[:n], self._buffer[n:]
+        return saida
+
+
+# ==========================
+# API DE CONTEÚDO (arquivos do repositório)
+# ==========================
+# Último estado conhecido de cada caminho: {"sha", "etag", "conteudo"}.
+# Leituras viram GET condicional (If-None-Match): 304 não conta no limite
+# de requisições. Gravações usam o SHA guardado, sem GET antes do PUT.
+_estado: dict = {}
+_trava_estado = threading.Lock()
+
+
+def _url_conteudo(caminho: str) -> str:
+    return f"/repos/{REPO}/contents/{caminho}"
+
+
+def _guardar(caminho: str, **campos):
+    with _trava_estado:
+        if campos.get("sha") is None:
+            _estado.pop(caminho, None)
+        else:
+            _estado[caminho] = campos
+
+
+def _conhecido(caminho: str) -> dict:
+    with _trava_estado:
+        return dict(_estado.get(caminho) or {})
+
+
+def esquecer(caminho: str | None = None):
+    """Descarta o estado guardado de um caminho (ou de todos)."""
+    with _trava_estado:
+        if caminho is None:
+            _estado.clear()
+        else:
+            _estado.pop(caminho, None)
+
+
+def ler_arquivo(caminho: str):
+    """
+    Conteúdo (bytes) e SHA de um arquivo do repositório; ``(None, None)``
+    se não existir. Uma requisição só: o conteúdo vem em base64 na própria
+    resposta (arquivos acima de 1 MB ainda usam o ``download_url``).
+    """
+    conhecido = _conhecido(caminho)
+    cabecalhos = {}
+    if conhecido.get("etag") and conhecido.get("conteudo") is not None:
+        cabecalhos["If-None-Match"] = conhecido["etag"]
+
+    r = requisitar("GET", _url_conteudo(caminho), params={"ref": BRANCH}, headers=cabecalhos)
+    if r.status_code == 304:
+        return conhecido["conteudo"], conhecido["sha"]
+    if r.status_code == 404:
+        esquecer(caminho)
+        return None, None
+    if r.status_code != 200:
+        raise _erro(r, f"Erro ao ler {caminho}")
+
+    info = r.json()
+    if info.get("encoding") == "base64":
+        conteudo = base64.b64decode(info["content"])
+    else:
+        bruto = requisitar("GET", info["download_url"])
+        if bruto.status_code != 200:
+            raise _erro(bruto, f"Erro ao baixar {caminho}")
+        conteudo = bruto.content
+
+    _guardar(caminho, sha=info["sha"], etag=r.headers.get("ETag"), conteudo=conteudo)
+    return conteudo, info["sha"]
+
+
+def ler_json(caminho: str):
+    """Lê um JSON do repositório: ``(dados, sha)``, ou ``({}, None)`` se não existir."""
+    conteudo, sha = ler_arquivo(caminho)
+    if conteudo is None:
+        return {}, None
+    return json.loads(conteudo.decode("utf-8")), sha
+
+
+def sha_arquivo(caminho: str):
+    """SHA atual do arquivo (guardado, ou consultado se ainda não conhecido)."""
+    conhecido = _conhecido(caminho)
+    if conhecido.get("sha"):
+        return conhecido["sha"]
+
+    r = requisitar("GET", _url_conteudo(caminho), params={"ref": BRANCH})
+    if r.status_code == 404:
+        return None
+    if r.status_code != 200:
+        raise _erro(r, f"Erro ao consultar {caminho}")
+    sha = r.json()["sha"]
+    _guardar(caminho, sha=sha, etag=None, conteudo=None)
+    return sha
+
+
+def salvar_arquivo(caminho: str, conteudo, mensagem: str, sha=None) -> dict:
+    """
+    Cria ou atualiza um arquivo (um commit) pela API de conteúdo.
+    ``conteudo`` pode ser ``bytes`` ou um arquivo binário (enviado em streaming).
+
+    Sem ``sha`` informado usa o último SHA conhecido do caminho; se ele
+    estiver desatualizado (409/422) consulta o atual e tenta de novo uma
+    vez. Com ``sha`` informado o conflito é devolvido como erro.
+
+    Acima de ``LIMITE_CONTENTS_API`` o arquivo vai por ``commit_arquivos``
+    (a API de conteúdo recusa corpos grandes), com o mesmo formato de
+    resposta e a mesma conferência do ``sha`` informado.
+    """
+    origem, tamanho = abrir_conteudo(conteudo)
+
+    if tamanho > LIMITE_CONTENTS_API:
+        # sha "" = o arquivo ainda não pode existir
+        esperados = None if sha is None else {caminho: sha or None}
+        commit = commit_arquivos({caminho: origem}, mensagem, esperados=esperados)
+        return {"content": {"sha": sha_arquivo(caminho)}, "commit": commit}
+
+    informado = sha is not None
+    if not informado:
+        sha = sha_arquivo(caminho)
+
+    def enviar(sha):
+        campos = {"message": mensagem, "branch": BRANCH}
+        if sha:
+            campos["sha"] = sha
+        return requisitar(
+            "PUT",
+            _url_conteudo(caminho),
+            data=_CorpoBase64(origem, tamanho, campos),
+            headers={"Content-Type": "application/json"}
+        )
+
+    r = enviar(sha)
+
+    if r.status_code in (409, 422) and not informado:
+        esquecer(caminho)
+        r = enviar(sha_arquivo(caminho))
+
+    if r.status_code not in (200, 201):
+        if r.status_code in (409, 422):
+            esquecer(caminho)
+        raise _erro(r, f"Erro ao salvar {caminho}")
+
+    resposta = r.json()
+    # O PUT devolve o SHA novo: a próxima gravação não precisa de GET
+    pequeno = isinstance(conteudo, (bytes, bytearray)) and tamanho <= LIMITE_CACHE_CONTEUDO
+    _guardar(
+        caminho,
+        sha=resposta["content"]["sha"],
+        etag=None,
+        conteudo=bytes(conteudo) if pequeno else None
+    )
+    return resposta
+
+
+def salvar_json(caminho: str, dados, mensagem: str, sha=None) -> dict:
+    """Grava ``dados`` como JSON indentado (UTF-8, acentos preservados)."""
+    conteudo = json.dumps(dados, indent=2, ensure_ascii=False).encode("utf-8")
+    return salvar_arquivo(caminho, conteudo, mensagem, sha=sha)
+
+
+# ==========================
+# GIT DATA API (vários arquivos em um commit)
+# ==========================
+# Blobs enviados ao mesmo tempo (cabe no pool da sessão)
+BLOBS_PARALELOS = 4
+# Novas tentativas se o branch andar entre a leitura e a atualização da ref
+TENTATIVAS_REF = 3
+
+
+def _git(metodo: str, recurso: str, ok=(200, 201), **kwargs) -> dict:
+    r = requisitar(metodo, f"/repos/{REPO}/git/{recurso}", **kwargs)
+    if r.status_code not in ok:
+        raise _erro(r, f"Erro na Git Data API ({recurso})")
+    return r.json()
+
+
+def criar_blob(conteudo) -> str:
+    """
+    Envia o conteúdo (``bytes`` ou arquivo binário, em streaming) como
+    blob e devolve o SHA (ainda fora de qualquer commit).
+    """
+    origem, tamanho = abrir_conteudo(conteudo)
+    corpo = _CorpoBase64(origem, tamanho, {"encoding": "base64"})
+    r = requisitar(
+        "POST",
+        f"/repos/{REPO}/git/blobs",
+        data=corpo,
+        headers={"Content-Type": "application/json"}
+    )
+    if r.status_code != 201:
+        raise _erro(r, "Erro ao criar blob")
+    return r.json()["sha"]
+
+
+def commit_arquivos(
+    arquivos: dict,
+    mensagem: str,
+    remover=(),
+    progresso=None,
+    esperados=None
+) -> dict:
+    """
+    Grava vários arquivos (``{caminho: bytes ou arquivo}``) e remove
+    ``remover`` em um único commit: blobs em paralelo (em streaming),
+    uma árvore, um commit e a atualização do branch (o app é
+    reimplantado uma vez só).
+
+    ``progresso(caminho, feitos, total, bytes_enviados, segundos)`` é
+    chamado na thread de quem chamou a cada blob concluído (pode
+    atualizar a tela do Streamlit e mostrar a vazão).
+
+    ``esperados`` (``{caminho: sha}``, ``None`` se ainda não pode existir) faz o
+    commit só se esses arquivos ainda estiverem na versão lida; senão
+    levanta ``ErroGitHub`` com status 409 (concorrência otimista).
+    """
+    blobs = {}
+    total = len(arquivos)
+    tamanhos = {caminho: abrir_conteudo(conteudo)[1] for caminho, conteudo in arquivos.items()}
+    enviados = 0
+    inicio = time.monotonic()
+    with ThreadPoolExecutor(max_workers=BLOBS_PARALELOS) as executor:
+        futuros = {
+            executor.submit(criar_blob, conteudo): caminho
+            for caminho, conteudo in arquivos.items()
+        }
+        for feitos, futuro in enumerate(as_completed(futuros), start=1):
+            caminho = futuros[futuro]
+            blobs[caminho] = futuro.result()
+            enviados += tamanhos[caminho]
+            if progresso is not None:
+                progresso(caminho, feitos, total, enviados, time.monotonic() - inicio)
+
+    entradas = [
+        {"path": caminho, "mode": "100644", "type": "blob", "sha": sha}
+        for caminho, sha in blobs.items()
+    ] + [
+        {"path": caminho, "mode": "100644", "type": "blob", "sha": None}
+        for caminho in remover
+    ]
+
+    for tentativa in range(TENTATIVAS_REF):
+        pai = _git("GET", f"ref/heads/{BRANCH}")["object"]["sha"]
+        arvore_pai = _git("GET", f"commits/{pai}")["tree"]["sha"]
+
+        if esperados:
+            # Só as pastas dos arquivos conferidos, sem recursão
+            atuais = {}
+            for pasta in {posixpath.dirname(caminho) for caminho in esperados}:
+                atuais.update(listar_arvore(pasta, ref=arvore_pai, recursiva=False))
+            mudados = [c for c, sha in esperados.items() if atuais.get(c) != sha]
+            if mudados:
+                raise ErroGitHub(f"Alterado por outro commit: {', '.join(mudados)}", 409)
+
+        arvore = _git("POST", "trees", json={"base_tree": arvore_pai, "tree": entradas})
+        commit = _git(
+            "POST",
+            "commits",
+            json={"message": mensagem, "tree": arvore["sha"], "parents": [pai]}
+        )
+
+        r = requisitar(
+            "PATCH",
+            f"/repos/{REPO}/git/refs/heads/{BRANCH}",
+            json={"sha": commit["sha"], "force": False}
+        )
+        if r.status_code == 200:
+            break
+        # 422: o branch recebeu outro commit no meio do caminho; refaz
+        # árvore e commit sobre o novo topo (os blobs continuam valendo)
+        if r.status_code != 422 or tentativa == TENTATIVAS_REF - 1:
+            raise _erro(r, "Erro ao atualizar o branch")
+
+    for caminho, sha in blobs.items():
+        _guardar(caminho, sha=sha, etag=None, conteudo=None)
+    for caminho in remover:
+        esquecer(caminho)
+
+    return commit
+
+
+def listar_arvore(pasta: str = "data", ref: str = BRANCH, recursiva: bool = True) -> dict:
+    """
+    Blobs do branch (ou da árvore/commit ``ref``) dentro de ``pasta``:
+    ``{caminho: sha}``. Só a subárvore da pasta é pedida: desce nível a
+    nível (sem recursão) até ela. ``recursiva=False`` lista só os arquivos
+    diretos da pasta; ``pasta`` vazia parte da raiz.
+    """
+    sha, prefixo = ref, ""
+    for parte in filter(None, pasta.strip("/").split("/")):
+        itens = _git("GET", f"trees/{sha}")["tree"]
+        sha = next(
+            (item["sha"] for item in itens if item["path"] == parte and item["type"] == "tree"),
+            None
+        )
+        if sha is None:
+            return {}
+        prefixo += parte + "/"
+
+    arvore = _git("GET", f"trees/{sha}", params={"recursive": "1"} if recursiva else None)
+    return {
+        prefixo + item["path"]: item["sha"]
+        for item in arvore["tree"]
+        if item["type"] == "blob"
+    }
+
+
+def baixar_blob(sha: str, destino) -> int:
+    """
+    Baixa o blob ``sha`` em streaming para ``destino`` (arquivo binário
+    aberto), sem passar pelo base64. Devolve o número de bytes gravados.
+    """
+    r = requisitar(
+        "GET",
+        f"/repos/{REPO}/git/blobs/{sha}",
+        headers={"Accept": "application/vnd.github.raw"},
+        stream=True
+    )
+    with r:
+        if r.status_code != 200:
+            raise _erro(r, f"Erro ao baixar o blob {sha[:7]}")
+        gravados = 0
+        for bloco in r.iter_content(BLOCO_ENVIO):
+            destino.write(bloco)
+            gravados += len(bloco)
+    return gravados
@@ -1,7 +1,4 @@
 import streamlit as st
-import json
-import requests
-import base64
 
 st.set_page_config(page_title="Solicitar Acesso", layout="centered")
 st.title("📝 Solicitar Acesso ao Sistema")
@@ -33,51 +30,6 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# ----------------------------
-# Configuração GitHub
-# ----------------------------
-REPO = "planejamentobarbacena-web/Comparativos_Empenhos"
-BRANCH = "master"
-FILE_SOLIC = "data/solicitacoes.json"
-TOKEN = st.secrets["GITHUB_TOKEN"]
-
-HEADERS = {
-    "Authorization": f"token {TOKEN}",
-    "Accept": "application/vnd.github.v3+json"
-}
-
-# ----------------------------
-# Funções GitHub
-# ----------------------------
-def carregar_github(caminho):
-    url = f"https://api.github.com/repos/{REPO}/contents/{caminho}"
-    r = requests.get(url, headers=HEADERS)
-    if r.status_code != 200:
-        return {}, None
-    info = r.json()
-    dados = json.loads(requests.get(info["download_url"]).text)
-    return dados, info["sha"]
-
-def salvar_github(dados, caminho, mensagem):
-    _, sha_atual = carregar_github(caminho)
-    conteudo = base64.b64encode(
-        json.dumps(dados, indent=2, ensure_ascii=False).encode("utf-8")
-    ).decode("utf-8")
-    payload = {
-        "message": mensagem,
-        "content": conteudo,
-        "sha": sha_atual,
-        "branch": BRANCH
-    }
-    r = requests.put(
-        f"https://api.github.com/repos/{REPO}/contents/{caminho}",
-        json=payload,
-        headers=HEADERS
-    )
-    if r.status_code not in (200, 201):
-        st.error(r.json())
-        st.stop()
-
 # ----------------------------
 # Botão de envio
 # ----------------------------
@@ -86,17 +38,29 @@ if st.button("📨 Enviar solicitação"):
         st.error("Preencha todos os campos!")
         st.stop()
 
-    solicitacoes, _ = carregar_github(FILE_SOLIC)
+    # Importado só no envio: a tela de solicitação abre sem carregar requests
+    from cadastro import Conflito, solicitacoes_github
+    from github_client import ERROS_GITHUB, ErroGitHub
 
-    if nome in solicitacoes:
-        st.warning("Este nome de usuário já possui uma solicitação pendente.")
+    # Criação atômica: se outra solicitação gravar antes, relê e confere de novo
+    try:
+        criada = solicitacoes_github().inserir(
+            nome,
+            {"senha": senha, "perfil": "USER", "status": "pendente"},
+            f"Nova solicitação: {nome}"
+        )
+    except ErroGitHub as e:
+        st.error(e.resposta)
+        st.stop()
+    except ERROS_GITHUB as e:
+        st.error(f"❌ Sem conexão com o GitHub: {e}")
+        st.stop()
+    except Conflito:
+        st.error("Muitas solicitações ao mesmo tempo. Tente novamente em instantes.")
         st.stop()
 
-    solicitacoes[nome] = {
-        "senha": senha,
-        "perfil": "USER",
-        "status": "pendente"
-    }
+    if not criada:
+        st.warning("Este nome de usuário já possui uma solicitação pendente.")
+        st.stop()
 
-    salvar_github(solicitacoes, FILE_SOLIC, f"Nova solicitação: {nome}")
     st.success("✅ Solicitação enviada! Aguarde aprovação do administrador.")
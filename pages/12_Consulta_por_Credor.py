@@ -1,15 +1,25 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
 
 from auth import login
+from aquecimento import aquecer_em_segundo_plano
 from components.header import render_header
-from data_loader import load_empenhos
+
+# Começa a carregar os dados enquanto o login é exibido
+aquecer_em_segundo_plano()
 
 # 🔐 Segurança
 login()
 render_header()
 
+# Importações pesadas só depois do login: a tela de login abre sem
+# carregar pandas/altair
+import altair as alt
+from components.tabelas import tabela_paginada
+from components.exportacao import botao_download_csv, botao_download_xlsx
+from components.graficos import dados_grafico, top_n_com_outros, TOP_N_MAXIMO
+from components.filtros import filtro_compartilhado, linhas_filtradas
+from data_loader import load_empenhos_tratados
+
 st.set_page_config(
     page_title="📁 Consulta por Credor",
     layout="wide"
@@ -20,122 +30,55 @@ st.title("📁 Consulta por Credor")
 # ==========================
 # CARREGAR DADOS
 # ==========================
-df = load_empenhos()
+# Base já limpa e tipada (cache compartilhado – não alterar)
+df = load_empenhos_tratados()
 if df.empty:
     st.warning("Nenhum dado carregado.")
     st.stop()
 
-# 🔹 Limpeza definitiva de Exercício e Entidade
-df["anoEmpenho"] = (
-    df["anoEmpenho"]
-    .astype(str)
-    .str.strip()
-    .replace(["nan", "None", ""], pd.NA)
-)
-
-df["nomeEntidade"] = (
-    df["nomeEntidade"]
-    .astype(str)
-    .str.strip()
-    .replace(["nan", "None", ""], pd.NA)
-)
-
-df = df.dropna(subset=["anoEmpenho", "nomeEntidade"])
-
-# ==========================
-# TRATAMENTO DE VALORES
-# ==========================
-for col in ["valorEmpenhadoBruto", "valorEmpenhadoAnulado"]:
-    df[col] = (
-        df[col]
-        .astype(str)
-        .str.replace(".", "", regex=False)
-        .str.replace(",", ".", regex=False)
-    )
-    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-df["valorEmpenhadoLiquido"] = (
-    df["valorEmpenhadoBruto"] - df["valorEmpenhadoAnulado"]
-)
-
 # ==========================
-# FILTRO – EXERCÍCIO
+# FILTROS (compartilhados entre as páginas e refletidos na URL)
 # ==========================
-anos = sorted(df["anoEmpenho"].dropna().unique())
-
-anos_sel = st.multiselect(
+selecao = {}
+selecao["ano"] = filtro_compartilhado(
+    "ano",
     "📅 Selecione Exercício(s)",
-    anos,
-    default=anos
+    selecao,
+    todos=False
 )
-
-df = df[df["anoEmpenho"].isin(anos_sel)]
-
-# ==========================
-# FILTRO – ENTIDADE
-# ==========================
-entidades = sorted(df["nomeEntidade"].dropna().unique())
-
-entidades_sel = st.multiselect(
+selecao["entidade"] = filtro_compartilhado(
+    "entidade",
     "🏢 Selecione Entidade(s)",
-    entidades,
-    default=entidades
+    selecao,
+    todos=False
 )
-
-df = df[df["nomeEntidade"].isin(entidades_sel)]
-
-# ==========================
-# FILTRO – CREDOR
-# ==========================
-credores = ["Todos"] + sorted(df["nomeCredor"].dropna().unique())
-
-credor_sel = st.multiselect(
+selecao["credor"] = filtro_compartilhado(
+    "credor",
     "🏦 Selecione Credor(es)",
-    credores,
-    default=["Todos"]
+    selecao
 )
-
-if "Todos" not in credor_sel:
-    df = df[df["nomeCredor"].isin(credor_sel)]
-
-# ==========================
-# FILTRO – FONTE (numRecurso)
-# ==========================
-fontes = ["Todos"] + sorted(df["numRecurso"].dropna().unique())
-
-fonte_sel = st.multiselect(
+selecao["fonte"] = filtro_compartilhado(
+    "fonte",
     "💰 Selecione Fonte(s) de Recurso",
-    fontes,
-    default=["Todos"]
+    selecao
 )
-
-if "Todos" not in fonte_sel:
-    df = df[df["numRecurso"].isin(fonte_sel)]
-
-# ==========================
-# FILTRO – DESCRIÇÃO DA DESPESA
-# ==========================
-despesas = ["Todos"] + sorted(df["Descrição da despesa"].dropna().unique())
-
-despesa_sel = st.multiselect(
+selecao["despesa"] = filtro_compartilhado(
+    "despesa",
     "📂 Selecione Descrição da Despesa",
-    despesas,
-    default=["Todos"]
+    selecao
 )
 
-if "Todos" not in despesa_sel:
-    df = df[df["Descrição da despesa"].isin(despesa_sel)]
+# Linhas filtradas vêm do cache por seleção (reaproveitado entre páginas)
+df = linhas_filtradas(selecao)
 
 # ==========================
 # AGRUPAMENTO
 # ==========================
-comparativo = (
-    df
-    .groupby(
-        ["anoEmpenho", "nomeCredor"],
-        as_index=False
-    )["valorEmpenhadoLiquido"]
-    .sum()
+comparativo = dados_grafico(
+    df,
+    ["anoEmpenho", "credorCanonico"],
+    "valorEmpenhadoLiquido",
+    limite=None  # o top N abaixo já limita o gráfico
 )
 
 if comparativo.empty:
@@ -145,42 +88,64 @@ if comparativo.empty:
 # ==========================
 # GRÁFICO
 # ==========================
-graf = (
-    alt.Chart(comparativo)
-    .mark_bar(size=28)  # barras um pouco mais finas
-    .encode(
-        x=alt.X(
-            "anoEmpenho:N",
-            title="Exercício",
-            axis=alt.Axis(labelAngle=0)
-        ),
-        xOffset=alt.XOffset(
-            "nomeCredor:N",
-            title=None
-        ),
-        y=alt.Y(
-            "valorEmpenhadoLiquido:Q",
-            title="Valor Empenhado Líquido (R$)"
-        ),
-        color=alt.Color(
-            "nomeCredor:N",
-            title="Credor",
-            legend=alt.Legend(
-                orient="bottom",
-                direction="horizontal",
-                columns=2   # 👈 quebra a legenda em colunas no celular
-            )
-        ),
-        tooltip=[
-            "anoEmpenho:N",
-            "nomeCredor:N",
-            alt.Tooltip("valorEmpenhadoLiquido:Q", format=",.2f")
-        ]
+@st.fragment
+def grafico_credores(comparativo):
+    """Fragmento: mudar o top N redesenha só o gráfico."""
+    # Só os N maiores credores de cada exercício; o restante vira "Outros"
+    top_n = st.slider(
+        "🏆 Credores por exercício no gráfico",
+        min_value=1,
+        max_value=TOP_N_MAXIMO,
+        value=10
+    )
+
+    comparativo_graf = top_n_com_outros(
+        comparativo,
+        grupo="anoEmpenho",
+        categoria="credorCanonico",
+        valor="valorEmpenhadoLiquido",
+        n=top_n
     )
-    .properties(height=420)
-)
 
-st.altair_chart(graf, use_container_width=True)
+    graf = (
+        alt.Chart(comparativo_graf)
+        .mark_bar(size=28)  # barras um pouco mais finas
+        .encode(
+            x=alt.X(
+                "anoEmpenho:N",
+                title="Exercício",
+                axis=alt.Axis(labelAngle=0)
+            ),
+            xOffset=alt.XOffset(
+                "credorCanonico:N",
+                title=None
+            ),
+            y=alt.Y(
+                "valorEmpenhadoLiquido:Q",
+                title="Valor Empenhado Líquido (R$)"
+            ),
+            color=alt.Color(
+                "credorCanonico:N",
+                title="Credor",
+                legend=alt.Legend(
+                    orient="bottom",
+                    direction="horizontal",
+                    columns=2   # 👈 quebra a legenda em colunas no celular
+                )
+            ),
+            tooltip=[
+                "anoEmpenho:N",
+                alt.Tooltip("credorCanonico:N", title="Credor"),
+                alt.Tooltip("valorEmpenhadoLiquido:Q", format=",.2f")
+            ]
+        )
+        .properties(height=420)
+    )
+
+    st.altair_chart(graf, use_container_width=True)
+
+
+grafico_credores(comparativo)
 
 
 # ==========================
@@ -188,43 +153,49 @@ st.altair_chart(graf, use_container_width=True)
 # ==========================
 st.subheader("📋 Detalhamento")
 
-tabela = df[
-    [
-        "numeroEmpenho",
-        "anoEmpenho",
-        "nomeEntidade",
-        "nomeCredor",
-        "numRecurso",
-        "Descrição da despesa",
-        "valorEmpenhadoBruto",
-        "valorEmpenhadoAnulado",
-        "valorEmpenhadoLiquido",
-    ]
-].copy()
-
-# Formatação
-for col in [
+colunas_tabela = [
+    "numeroEmpenho",
+    "anoEmpenho",
+    "nomeEntidade",
+    "credorCanonico",
+    "nomeCredor",
+    "numRecurso",
+    "Descrição da despesa",
     "valorEmpenhadoBruto",
     "valorEmpenhadoAnulado",
-    "valorEmpenhadoLiquido"
-]:
-    tabela[col] = tabela[col].apply(
-        lambda x: f"R$ {x:,.2f}"
-        .replace(",", "X")
-        .replace(".", ",")
-        .replace("X", ".")
-    )
+    "valorEmpenhadoLiquido",
+]
 
-st.dataframe(tabela, use_container_width=True)
+colunas_valor = [
+    "valorEmpenhadoBruto",
+    "valorEmpenhadoAnulado",
+    "valorEmpenhadoLiquido"
+]
+
+# Só a página visível é recortada e enviada; o total vem do agrupamento
+tabela_paginada(
+    df,
+    colunas_tabela,
+    colunas_valor,
+    totais={"Empenhado Líquido": comparativo["valorEmpenhadoLiquido"].sum()}
+)
 
 # ==========================
 # DOWNLOAD CSV
 # ==========================
-csv = tabela.to_csv(index=False, sep=";", encoding="utf-8")
-
-st.download_button(
+# Exportações geradas em blocos só quando o botão é clicado
+botao_download_csv(
     "⬇️ Baixar CSV – Consulta por Credor",
-    csv,
-    file_name="consulta_por_credor_filtrada.csv",
-    mime="text/csv"
+    df,
+    colunas_tabela,
+    "consulta_por_credor_filtrada.csv",
+    colunas_valor
+)
+
+botao_download_xlsx(
+    "⬇️ Baixar Excel – Consulta por Credor",
+    df,
+    colunas_tabela,
+    "consulta_por_credor_filtrada.xlsx",
+    colunas_valor
 )
@@ -1,15 +1,26 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
 
 from auth import login
+from aquecimento import aquecer_em_segundo_plano
 from components.header import render_header
-from data_loader import load_empenhos
+
+# Começa a carregar os dados enquanto o login é exibido
+aquecer_em_segundo_plano()
 
 # 🔐 Segurança
 login()
 render_header()
 
+# Importações pesadas só depois do login: a tela de login abre sem
+# carregar pandas/altair
+import altair as alt
+from components.tabelas import tabela_paginada
+from components.exportacao import botao_download_csv, botao_download_xlsx
+from components.graficos import dados_grafico, limitar_grafico
+from components.filtros import filtro_compartilhado, linhas_filtradas, confirmar_selecao
+from components.hierarquias import detalhar_hierarquia
+from data_loader import load_empenhos_tratados
+
 st.set_page_config(
     page_title="💰 Consulta por Fonte de Recurso",
     layout="wide"
@@ -20,122 +31,61 @@ st.title("💰 Consulta por Fonte de Recurso")
 # ==========================
 # CARREGAR DADOS
 # ==========================
-df = load_empenhos()
+# Base já limpa e tipada (cache compartilhado – não alterar)
+df = load_empenhos_tratados()
 if df.empty:
     st.warning("Nenhum dado carregado.")
     st.stop()
 
-# 🔹 Limpeza definitiva de Exercício e Entidade
-df["anoEmpenho"] = (
-    df["anoEmpenho"]
-    .astype(str)
-    .str.strip()
-    .replace(["nan", "None", ""], pd.NA)
-)
-
-df["nomeEntidade"] = (
-    df["nomeEntidade"]
-    .astype(str)
-    .str.strip()
-    .replace(["nan", "None", ""], pd.NA)
-)
-
-df = df.dropna(subset=["anoEmpenho", "nomeEntidade"])
-
-# ==========================
-# TRATAMENTO DE VALORES
-# ==========================
-for col in ["valorEmpenhadoBruto", "valorEmpenhadoAnulado"]:
-    df[col] = (
-        df[col]
-        .astype(str)
-        .str.replace(".", "", regex=False)
-        .str.replace(",", ".", regex=False)
-    )
-    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-df["valorEmpenhadoLiquido"] = (
-    df["valorEmpenhadoBruto"] - df["valorEmpenhadoAnulado"]
-)
-
 # ==========================
-# FILTRO – EXERCÍCIO
+# FILTROS (compartilhados entre as páginas e refletidos na URL)
 # ==========================
-anos = sorted(df["anoEmpenho"].dropna().unique())
-
-anos_sel = st.multiselect(
+selecao = {}
+selecao["ano"] = filtro_compartilhado(
+    "ano",
     "📅 Selecione Exercício(s)",
-    anos,
-    default=anos
+    selecao,
+    todos=False
 )
-
-df = df[df["anoEmpenho"].isin(anos_sel)]
-
-# ==========================
-# FILTRO – ENTIDADE
-# ==========================
-entidades = sorted(df["nomeEntidade"].dropna().unique())
-
-entidades_sel = st.multiselect(
+selecao["entidade"] = filtro_compartilhado(
+    "entidade",
     "🏢 Selecione Entidade(s)",
-    entidades,
-    default=entidades
+    selecao,
+    todos=False
 )
-
-df = df[df["nomeEntidade"].isin(entidades_sel)]
-
-# ==========================
-# FILTRO – FONTE
-# ==========================
-fontes = ["Todos"] + sorted(df["numRecurso"].dropna().unique())
-
-fontes_sel = st.multiselect(
+selecao["fonte"] = filtro_compartilhado(
+    "fonte",
     "💰 Selecione Fonte(s) de Recurso",
-    fontes,
-    default=["Todos"]
+    selecao
 )
-
-if "Todos" not in fontes_sel:
-    df = df[df["numRecurso"].isin(fontes_sel)]
-
-# ==========================
-# FILTRO – DESCRIÇÃO DA DESPESA
-# ==========================
-despesas = ["Todos"] + sorted(df["Descrição da despesa"].dropna().unique())
-
-despesa_sel = st.multiselect(
+selecao["despesa"] = filtro_compartilhado(
+    "despesa",
     "📂 Selecione Descrição da Despesa",
-    despesas,
-    default=["Todos"]
+    selecao
 )
-
-if "Todos" not in despesa_sel:
-    df = df[df["Descrição da despesa"].isin(despesa_sel)]
-
-# ==========================
-# FILTRO – CREDOR
-# ==========================
-credores = ["Todos"] + sorted(df["nomeCredor"].dropna().unique())
-
-credor_sel = st.multiselect(
+selecao["credor"] = filtro_compartilhado(
+    "credor",
     "🏦 Selecione Credor(es)",
-    credores,
-    default=["Todos"]
+    selecao
 )
 
-if "Todos" not in credor_sel:
-    df = df[df["nomeCredor"].isin(credor_sel)]
+# Linhas filtradas vêm do cache por seleção (reaproveitado entre páginas)
+df = linhas_filtradas(selecao)
 
 # ==========================
 # AGRUPAMENTO
 # ==========================
-comparativo = (
-    df
-    .groupby(
-        ["anoEmpenho", "numRecurso"],
-        as_index=False
-    )["valorEmpenhadoLiquido"]
-    .sum()
+# Agregado completo (totais) e recorte limitado só para o gráfico
+por_fonte = dados_grafico(
+    df,
+    ["anoEmpenho", "numRecurso"],
+    "valorEmpenhadoLiquido",
+    limite=None
+)
+comparativo = limitar_grafico(
+    por_fonte,
+    ["anoEmpenho", "numRecurso"],
+    "valorEmpenhadoLiquido"
 )
 
 if comparativo.empty:
@@ -145,42 +95,103 @@ if comparativo.empty:
 # ==========================
 # GRÁFICO
 # ==========================
-graf = (
-    alt.Chart(comparativo)
-    .mark_bar(size=28)  # barras mais finas
-    .encode(
-        x=alt.X(
-            "anoEmpenho:N",
-            title="Exercício",
-            axis=alt.Axis(labelAngle=0)
-        ),
-        xOffset=alt.XOffset(
-            "numRecurso:N",
-            title=None
-        ),
-        y=alt.Y(
-            "valorEmpenhadoLiquido:Q",
-            title="Valor Empenhado Líquido (R$)"
-        ),
-        color=alt.Color(
-            "numRecurso:N",
-            title="Fonte",
-            legend=alt.Legend(
-                orient="bottom",
-                direction="horizontal",
-                columns=3   # 👈 mais fontes, então 3 colunas funciona melhor
-            )
-        ),
-        tooltip=[
-            "anoEmpenho:N",
-            "numRecurso:N",
-            alt.Tooltip("valorEmpenhadoLiquido:Q", format=",.2f")
-        ]
+@st.fragment
+def grafico_fontes(comparativo):
+    """
+    Clicar num exercício filtra o resumo por fonte no próprio navegador
+    (parâmetro de seleção do Vega-Lite); os filtros da página só mudam
+    quando o usuário confirma no formulário abaixo do gráfico.
+    """
+    sel_ano = alt.selection_point(name="ano", fields=["anoEmpenho"])
+
+    barras = (
+        alt.Chart(comparativo)
+        .mark_bar(size=28)  # barras mais finas
+        .encode(
+            x=alt.X(
+                "anoEmpenho:N",
+                title="Exercício",
+                axis=alt.Axis(labelAngle=0)
+            ),
+            xOffset=alt.XOffset(
+                "numRecurso:N",
+                title=None
+            ),
+            y=alt.Y(
+                "valorEmpenhadoLiquido:Q",
+                title="Valor Empenhado Líquido (R$)"
+            ),
+            color=alt.Color(
+                "numRecurso:N",
+                title="Fonte",
+                legend=alt.Legend(
+                    orient="bottom",
+                    direction="horizontal",
+                    columns=3   # 👈 mais fontes, então 3 colunas funciona melhor
+                )
+            ),
+            opacity=alt.condition(sel_ano, alt.value(1.0), alt.value(0.35)),
+            tooltip=[
+                "anoEmpenho:N",
+                "numRecurso:N",
+                alt.Tooltip("valorEmpenhadoLiquido:Q", format=",.2f")
+            ]
+        )
+        .add_params(sel_ano)
+        .properties(height=420)
     )
-    .properties(height=420)
-)
 
-st.altair_chart(graf, use_container_width=True)
+    # Resumo ligado: soma por fonte só dos exercícios clicados
+    resumo = (
+        alt.Chart(comparativo)
+        .transform_filter(sel_ano)
+        .transform_aggregate(
+            total="sum(valorEmpenhadoLiquido)",
+            groupby=["numRecurso"]
+        )
+        .transform_window(
+            posicao="rank()",
+            sort=[alt.SortField("total", order="descending")]
+        )
+        .transform_filter(alt.datum.posicao <= 15)
+        .mark_bar()
+        .encode(
+            y=alt.Y("numRecurso:N", sort="-x", title="Fonte"),
+            x=alt.X("total:Q", title="Empenhado Líquido (R$)"),
+            tooltip=[
+                "numRecurso:N",
+                alt.Tooltip("total:Q", format=",.2f")
+            ]
+        )
+        .properties(height=300, title="Maiores fontes no(s) exercício(s) selecionado(s)")
+    )
+
+    # Sem on_select: o filtro cruzado roda inteiro no navegador
+    st.altair_chart(alt.vconcat(barras, resumo), use_container_width=True)
+
+    confirmar_selecao(
+        sorted(comparativo["anoEmpenho"].unique()),
+        "filtro_ano",
+        "Exercício"
+    )
+
+
+grafico_fontes(comparativo)
+
+
+# ==========================
+# DETALHAMENTO POR NÍVEL DA CLASSIFICAÇÃO
+# ==========================
+# Cada nível é somado a partir de um cubo da seleção (sem reler a base)
+st.subheader("🧭 Fontes por nível de classificação")
+
+detalhar_hierarquia(
+    selecao,
+    "fonte",
+    "valorEmpenhadoLiquido",
+    chave="fonte",
+    rotulo_valor="Empenhado Líquido"
+)
 
 
 # ==========================
@@ -188,43 +199,48 @@ st.altair_chart(graf, use_container_width=True)
 # ==========================
 st.subheader("📋 Detalhamento")
 
-tabela = df[
-    [
-        "numeroEmpenho",
-        "anoEmpenho",
-        "nomeEntidade",
-        "numRecurso",
-        "Descrição da despesa",
-        "nomeCredor",
-        "valorEmpenhadoBruto",
-        "valorEmpenhadoAnulado",
-        "valorEmpenhadoLiquido",
-    ]
-].copy()
-
-# Formatação
-for col in [
+colunas_tabela = [
+    "numeroEmpenho",
+    "anoEmpenho",
+    "nomeEntidade",
+    "numRecurso",
+    "Descrição da despesa",
+    "nomeCredor",
     "valorEmpenhadoBruto",
     "valorEmpenhadoAnulado",
-    "valorEmpenhadoLiquido"
-]:
-    tabela[col] = tabela[col].apply(
-        lambda x: f"R$ {x:,.2f}"
-        .replace(",", "X")
-        .replace(".", ",")
-        .replace("X", ".")
-    )
+    "valorEmpenhadoLiquido",
+]
 
-st.dataframe(tabela, use_container_width=True)
+colunas_valor = [
+    "valorEmpenhadoBruto",
+    "valorEmpenhadoAnulado",
+    "valorEmpenhadoLiquido"
+]
+
+# Só a página visível é recortada e enviada; o total vem do agrupamento
+tabela_paginada(
+    df,
+    colunas_tabela,
+    colunas_valor,
+    totais={"Empenhado Líquido": por_fonte["valorEmpenhadoLiquido"].sum()}
+)
 
 # ==========================
 # DOWNLOAD CSV
 # ==========================
-csv = tabela.to_csv(index=False, sep=";", encoding="utf-8")
-
-st.download_button(
+# Exportações geradas em blocos só quando o botão é clicado
+botao_download_csv(
     "⬇️ Baixar CSV – Consulta por Fonte",
-    csv,
-    file_name="consulta_por_fonte_filtrada.csv",
-    mime="text/csv"
+    df,
+    colunas_tabela,
+    "consulta_por_fonte_filtrada.csv",
+    colunas_valor
+)
+
+botao_download_xlsx(
+    "⬇️ Baixar Excel – Consulta por Fonte",
+    df,
+    colunas_tabela,
+    "consulta_por_fonte_filtrada.xlsx",
+    colunas_valor
 )
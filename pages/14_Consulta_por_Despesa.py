@@ -1,129 +1,73 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
 
 from auth import login
+from aquecimento import aquecer_em_segundo_plano
 from components.header import render_header
-from data_loader import load_empenhos
+
+# Começa a carregar os dados enquanto o login é exibido
+aquecer_em_segundo_plano()
 
 # 🔐 Segurança
 login()
 render_header()
 
+# Importações pesadas só depois do login: a tela de login abre sem
+# carregar pandas/altair
+import altair as alt
+from components.tabelas import tabela_paginada
+from components.exportacao import botao_download_csv, botao_download_xlsx
+from components.graficos import (
+    ROTULO_OUTROS, TOP_N_MAXIMO, dados_grafico, limitar_grafico, top_n_com_outros
+)
+from components.filtros import filtro_compartilhado, linhas_filtradas, confirmar_selecao
+from components.hierarquias import detalhar_hierarquia
+from data_loader import load_empenhos_tratados
+
 st.title("📑 Consulta por Despesa")
 
 # =======================
 # CARREGAR DADOS
 # =======================
-df = load_empenhos()
+# Base já limpa e tipada (cache compartilhado – não alterar)
+df = load_empenhos_tratados()
 if df.empty:
     st.warning("Nenhum dado carregado.")
     st.stop()
 
-# 🔹 Limpeza definitiva de Exercício e Entidade
-df["anoEmpenho"] = (
-    df["anoEmpenho"]
-    .astype(str)
-    .str.strip()
-    .replace(["nan", "None", ""], pd.NA)
-)
-
-df["nomeEntidade"] = (
-    df["nomeEntidade"]
-    .astype(str)
-    .str.strip()
-    .replace(["nan", "None", ""], pd.NA)
-)
-
-df = df.dropna(subset=["anoEmpenho", "nomeEntidade"])
-
-# =======================
-# TRATAMENTO DE VALORES
-# =======================
-for col in [
-    "valorEmpenhadoBruto",
-    "valorEmpenhadoAnulado",
-    "saldoBaixado"
-]:
-    df[col] = (
-        df[col]
-        .astype(str)
-        .str.replace(".", "", regex=False)
-        .str.replace(",", ".", regex=False)
-    )
-    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-df["empenhado_liquido"] = (
-    df["valorEmpenhadoBruto"] - df["valorEmpenhadoAnulado"]
-)
-
 # =======================
-# FILTRO – EXERCÍCIO
+# FILTROS (compartilhados entre as páginas e refletidos na URL)
 # =======================
-anos = sorted(df["anoEmpenho"].dropna().unique())
-
-anos_sel = st.multiselect(
+selecao = {}
+selecao["ano"] = filtro_compartilhado(
+    "ano",
     "📅 Exercício",
-    anos,
-    default=anos
+    selecao,
+    todos=False
 )
-
-df = df[df["anoEmpenho"].isin(anos_sel)]
-
-# =======================
-# FILTRO – ENTIDADE
-# =======================
-entidades = sorted(df["nomeEntidade"].dropna().unique())
-
-entidades_sel = st.multiselect(
+selecao["entidade"] = filtro_compartilhado(
+    "entidade",
     "🏢 Entidade",
-    entidades,
-    default=entidades
+    selecao,
+    todos=False
 )
-
-df = df[df["nomeEntidade"].isin(entidades_sel)]
-
-# =======================
-# FILTRO – DESCRIÇÃO DA DESPESA
-# =======================
-despesas = ["Todos"] + sorted(df["Descrição da despesa"].dropna().unique())
-
-despesa_sel = st.multiselect(
+selecao["despesa"] = filtro_compartilhado(
+    "despesa",
     "📂 Descrição da Despesa",
-    despesas,
-    default=["Todos"]
+    selecao
 )
-
-if "Todos" not in despesa_sel:
-    df = df[df["Descrição da despesa"].isin(despesa_sel)]
-
-# =======================
-# FILTRO – CREDOR
-# =======================
-credores = ["Todos"] + sorted(df["nomeCredor"].dropna().unique())
-
-credor_sel = st.multiselect(
+selecao["credor"] = filtro_compartilhado(
+    "credor",
     "🏷️ Credor",
-    credores,
-    default=["Todos"]
+    selecao
 )
-
-if "Todos" not in credor_sel:
-    df = df[df["nomeCredor"].isin(credor_sel)]
-
-# =======================
-# FILTRO – FONTE
-# =======================
-fontes = ["Todos"] + sorted(df["numRecurso"].dropna().unique())
-
-fonte_sel = st.multiselect(
+selecao["fonte"] = filtro_compartilhado(
+    "fonte",
     "💰 Fonte de Recurso",
-    fontes,
-    default=["Todos"]
+    selecao
 )
 
-if "Todos" not in fonte_sel:
-    df = df[df["numRecurso"].isin(fonte_sel)]
+# Linhas filtradas vêm do cache por seleção (reaproveitado entre páginas)
+df = linhas_filtradas(selecao)
 
 if df.empty:
     st.info("Nenhum dado para os filtros selecionados.")
@@ -132,118 +76,201 @@ if df.empty:
 # =======================
 # AGRUPAMENTO
 # =======================
-comparativo = (
-    df
-    .groupby("anoEmpenho", as_index=False)[
-        ["empenhado_liquido", "saldoBaixado"]
-    ]
-    .sum()
+# Agregado completo (totais) e recorte limitado só para o gráfico
+por_ano = dados_grafico(
+    df,
+    "anoEmpenho",
+    ["valorEmpenhadoLiquido", "saldoBaixado"],
+    limite=None
+)
+comparativo = limitar_grafico(por_ano, "anoEmpenho", "valorEmpenhadoLiquido")
+
+# Visão ligada ao gráfico: soma completa por exercício x despesa e, só
+# depois de somar, as TOP_N_MAXIMO maiores de cada exercício (o resto vai
+# para "Outros", fora do ranking). O navegador soma os exercícios
+# clicados e separa as maiores despesas
+por_despesa = top_n_com_outros(
+    dados_grafico(
+        df,
+        ["anoEmpenho", "Descrição da despesa"],
+        "valorEmpenhadoLiquido",
+        limite=None
+    ),
+    "anoEmpenho",
+    "Descrição da despesa",
+    "valorEmpenhadoLiquido",
+    n=TOP_N_MAXIMO
 )
 
 # =======================
 # GRÁFICO (DUAS BARRAS)
 # =======================
-graf = (
-    alt.Chart(comparativo)
-    .transform_fold(
-        ["empenhado_liquido", "saldoBaixado"],
-        as_=["Tipo", "Valor"]
-    )
-    .mark_bar(size=26)  # barras mais finas
-    .encode(
-        x=alt.X(
-            "anoEmpenho:N",
-            title="Exercício",
-            axis=alt.Axis(labelAngle=0)
-        ),
-        xOffset=alt.XOffset("Tipo:N"),
-        y=alt.Y(
-            "Valor:Q",
-            title="Valor (R$)"
-        ),
-        color=alt.Color(
-            "Tipo:N",
-            title="Tipo",
-            scale=alt.Scale(
-                domain=["empenhado_liquido", "saldoBaixado"],
-                range=["#1f77b4", "#ff7f0e"]
-            ),
-legend=alt.Legend(
-    orient="bottom",
-    direction="horizontal",
-    columns=2,
-    labelExpr="""
-        datum.label == 'empenhado_liquido'
-        ? 'Empenhado Líquido'
-        : datum.label == 'saldoBaixado'
-        ? 'Baixado no Exercício'
-        : datum.label
+@st.fragment
+def grafico_despesas(comparativo, por_despesa):
     """
-)
-        ),
-        tooltip=[
-            "anoEmpenho:N",
-            "Tipo:N",
-            alt.Tooltip("Valor:Q", format=",.2f")
-        ]
+    Clicar num exercício filtra, no navegador, o resumo por descrição da
+    despesa; os filtros da página só mudam quando o usuário confirma no
+    formulário abaixo do gráfico.
+    """
+    sel_ano = alt.selection_point(name="ano", fields=["anoEmpenho"])
+
+    barras = (
+        alt.Chart(comparativo)
+        .transform_fold(
+            ["valorEmpenhadoLiquido", "saldoBaixado"],
+            as_=["Tipo", "Valor"]
+        )
+        .mark_bar(size=26)  # barras mais finas
+        .encode(
+            x=alt.X(
+                "anoEmpenho:N",
+                title="Exercício",
+                axis=alt.Axis(labelAngle=0)
+            ),
+            xOffset=alt.XOffset("Tipo:N"),
+            y=alt.Y(
+                "Valor:Q",
+                title="Valor (R$)"
+            ),
+            color=alt.Color(
+                "Tipo:N",
+                title="Tipo",
+                scale=alt.Scale(
+                    domain=["valorEmpenhadoLiquido", "saldoBaixado"],
+                    range=["#1f77b4", "#ff7f0e"]
+                ),
+                legend=alt.Legend(
+                    orient="bottom",
+                    direction="horizontal",
+                    columns=2,
+                    labelExpr="""
+                        datum.label == 'valorEmpenhadoLiquido'
+                        ? 'Empenhado Líquido'
+                        : datum.label == 'saldoBaixado'
+                        ? 'Baixado no Exercício'
+                        : datum.label
+                    """
+                )
+            ),
+            opacity=alt.condition(sel_ano, alt.value(1.0), alt.value(0.35)),
+            tooltip=[
+                "anoEmpenho:N",
+                "Tipo:N",
+                alt.Tooltip("Valor:Q", format=",.2f")
+            ]
+        )
+        .add_params(sel_ano)
+        .properties(height=420)
+    )
+
+    resumo = (
+        alt.Chart(por_despesa)
+        .transform_filter(sel_ano)
+        .transform_filter(alt.datum["Descrição da despesa"] != ROTULO_OUTROS)
+        .transform_aggregate(
+            total="sum(valorEmpenhadoLiquido)",
+            groupby=["Descrição da despesa"]
+        )
+        .transform_window(
+            posicao="rank()",
+            sort=[alt.SortField("total", order="descending")]
+        )
+        .transform_filter(alt.datum.posicao <= 15)
+        .mark_bar()
+        .encode(
+            y=alt.Y("Descrição da despesa:N", sort="-x", title=None),
+            x=alt.X("total:Q", title="Empenhado Líquido (R$)"),
+            tooltip=[
+                "Descrição da despesa:N",
+                alt.Tooltip("total:Q", format=",.2f")
+            ]
+        )
+        .properties(height=360, title="Maiores despesas no(s) exercício(s) selecionado(s)")
+    )
+
+    # Sem on_select: o filtro cruzado roda inteiro no navegador
+    st.altair_chart(alt.vconcat(barras, resumo), use_container_width=True)
+
+    confirmar_selecao(
+        sorted(comparativo["anoEmpenho"].unique()),
+        "filtro_ano",
+        "Exercício"
     )
-    .properties(height=420)
-)
 
-st.altair_chart(graf, use_container_width=True)
+
+grafico_despesas(comparativo, por_despesa)
 
 
 # =======================
-# TABELA
+# DETALHAMENTO POR NÍVEL DA CLASSIFICAÇÃO
 # =======================
-st.subheader("📊 Detalhamento")
-
-tabela = df[
-    [
-        "anoEmpenho",        
-        "Descrição da despesa",
-        "nomeCredor",
-        "numRecurso",
-        "empenhado_liquido",
-        "saldoBaixado",
-        "especificacao",
-        "nomeEntidade"
-    ]
-].copy()
-
-tabela["Empenhado Líquido"] = tabela["empenhado_liquido"].apply(
-    lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+# Cada nível é somado a partir de um cubo da seleção (sem reler a base)
+st.subheader("🧭 Natureza da despesa por nível")
+
+detalhar_hierarquia(
+    selecao,
+    "natureza",
+    "valorEmpenhadoLiquido",
+    chave="natureza",
+    rotulo_valor="Empenhado Líquido"
 )
 
-tabela["Saldo Baixado"] = tabela["saldoBaixado"].apply(
-    lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-)
 
-tabela = tabela[
-    [
-        "anoEmpenho",        
-        "Descrição da despesa",
-        "nomeCredor",
-        "numRecurso",
-        "Empenhado Líquido",   # ✅ formatado
-        "Saldo Baixado",      # ✅ formatado
-        "especificacao",
-        "nomeEntidade"
-    ]
+# =======================
+# TABELA
+# =======================
+st.subheader("📊 Detalhamento")
+
+colunas_tabela = [
+    "anoEmpenho",
+    "Descrição da despesa",
+    "nomeCredor",
+    "numRecurso",
+    "valorEmpenhadoLiquido",
+    "saldoBaixado",
+    "especificacao",
+    "nomeEntidade"
 ]
 
-st.dataframe(tabela, use_container_width=True)
+rotulos = {
+    "valorEmpenhadoLiquido": "Empenhado Líquido",
+    "saldoBaixado": "Saldo Baixado"
+}
+
+colunas_valor = ["valorEmpenhadoLiquido", "saldoBaixado"]
+
+tabela_paginada(
+    df,
+    colunas_tabela,
+    colunas_valor,
+    rotulos=rotulos,
+    totais={
+        "Empenhado Líquido": por_ano["valorEmpenhadoLiquido"].sum(),
+        "Saldo Baixado": por_ano["saldoBaixado"].sum()
+    }
+)
 
 # =======================
 # DOWNLOAD CSV
 # =======================
 st.divider()
 
-csv = tabela.to_csv(index=False, sep=";", encoding="utf-8-sig")
-
-st.download_button(
+# Exportações geradas em blocos só quando o botão é clicado
+botao_download_csv(
     "📥 Baixar CSV – Consulta por Despesa",
-    csv,
-    file_name="consulta_por_despesa.csv",
-    mime="text/csv"
+    df,
+    colunas_tabela,
+    "consulta_por_despesa.csv",
+    colunas_valor,
+    rotulos=rotulos,
+    encoding="utf-8-sig"
+)
+
+botao_download_xlsx(
+    "📥 Baixar Excel – Consulta por Despesa",
+    df,
+    colunas_tabela,
+    "consulta_por_despesa.xlsx",
+    colunas_valor,
+    rotulos=rotulos
 )
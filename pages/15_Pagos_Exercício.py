@@ -1,102 +1,54 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
-import unicodedata
 
 from auth import login
+from aquecimento import aquecer_em_segundo_plano
 from components.header import render_header
-from data_loader import load_empenhos
 
 # ==================================
 # CONFIGURAÇÃO / SEGURANÇA
 # ==================================
+# Começa a carregar os dados enquanto o login é exibido
+aquecer_em_segundo_plano()
+
 login()
 render_header()
 
-st.title("💰 Pagos no Exercício")
-
-# ==================================
-# FUNÇÕES AUXILIARES
-# ==================================
-def normalizar_texto(txt):
-    if pd.isna(txt):
-        return ""
-    txt = str(txt)
-    txt = unicodedata.normalize("NFKD", txt)
-    return "".join(c for c in txt if not unicodedata.combining(c)).lower().strip()
-
-def filtro_multiselect(df_base, coluna, label, normalizar=False):
-    if normalizar:
-        df_base["_filtro_norm"] = df_base[coluna].apply(normalizar_texto)
-        opcoes = sorted(df_base["_filtro_norm"].unique().tolist())
-    else:
-        opcoes = sorted(df_base[coluna].dropna().unique().tolist())
-
-    opcoes = ["Todos"] + opcoes
-
-    selecionado = st.multiselect(
-        label,
-        options=opcoes,
-        default=["Todos"]
-    )
-
-    if "Todos" in selecionado or not selecionado:
-        return df_base
-
-    if normalizar:
-        return df_base[df_base["_filtro_norm"].isin(selecionado)]
+# Importações pesadas só depois do login: a tela de login abre sem
+# carregar pandas/altair
+import altair as alt
+from components.tabelas import tabela_paginada
+from components.exportacao import botao_download_csv, botao_download_xlsx
+from components.graficos import dados_grafico
+from components.filtros import filtro_compartilhado, linhas_filtradas
+from data_loader import load_empenhos_tratados
 
-    return df_base[df_base[coluna].isin(selecionado)]
+st.title("💰 Pagos no Exercício")
 
 # ==================================
 # CARREGAR DADOS
 # ==================================
-df = load_empenhos()
+# Base já limpa e tipada (cache compartilhado – não alterar)
+df = load_empenhos_tratados()
 
 if df.empty:
     st.warning("Nenhum dado carregado.")
     st.stop()
 
-# ==================================
-# LIMPEZA BÁSICA
-# ==================================
-df["anoEmpenho"] = df["anoEmpenho"].astype(str).str.strip()
-df["nomeEntidade"] = df["nomeEntidade"].astype(str).str.strip()
-df["nomeCredor"] = df["nomeCredor"].astype(str).str.strip()
-df["Descrição da despesa"] = df["Descrição da despesa"].astype(str).str.strip()
-
-# ==================================
-# TRATAMENTO DOS VALORES
-# ==================================
-for col in ["saldoBaixado", "valorEmpenhadoBruto"]:
-    df[col] = (
-        df[col]
-        .astype(str)
-        .str.replace(".", "", regex=False)
-        .str.replace(",", ".", regex=False)
-    )
-    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
 # ==================================
 # FILTROS (VERTICAIS)
 # ==================================
 st.markdown("### 🔎 Filtros")
 
-df_filtrado = df.copy()
-df_filtrado = filtro_multiselect(df_filtrado, "anoEmpenho", "📅 Exercício")
-df_filtrado = filtro_multiselect(df_filtrado, "nomeEntidade", "🏢 Entidade")
-df_filtrado = filtro_multiselect(
-    df_filtrado,
-    "nomeCredor",
-    "🏷️ Credor (ignora acentuação)",
-    normalizar=True
-)
-df_filtrado = filtro_multiselect(df_filtrado, "numRecurso", "💰 Fonte de Recurso")
-df_filtrado = filtro_multiselect(
-    df_filtrado,
-    "Descrição da despesa",
-    "📂 Natureza da Despesa"
-)
+# Compartilhados com as demais páginas (e na URL); "Credor" já usa o
+# credor canônico, que ignora acentuação e variações de grafia
+selecao = {}
+selecao["ano"] = filtro_compartilhado("ano", "📅 Exercício", selecao)
+selecao["entidade"] = filtro_compartilhado("entidade", "🏢 Entidade", selecao)
+selecao["credor"] = filtro_compartilhado("credor", "🏷️ Credor (ignora acentuação)", selecao)
+selecao["fonte"] = filtro_compartilhado("fonte", "💰 Fonte de Recurso", selecao)
+selecao["despesa"] = filtro_compartilhado("despesa", "📂 Natureza da Despesa", selecao)
+
+df_filtrado = linhas_filtradas(selecao)
 
 if df_filtrado.empty:
     st.info("Nenhum dado para os filtros selecionados.")
@@ -105,11 +57,7 @@ if df_filtrado.empty:
 # ==================================
 # AGRUPAMENTO PARA O GRÁFICO
 # ==================================
-df_graf = (
-    df_filtrado
-    .groupby("anoEmpenho", as_index=False)["saldoBaixado"]
-    .sum()
-)
+df_graf = dados_grafico(df_filtrado, "anoEmpenho", "saldoBaixado")
 
 # ==================================
 # GRÁFICO – PAGOS NO EXERCÍCIO
@@ -145,53 +93,53 @@ st.altair_chart(graf, use_container_width=True)
 # ==================================
 st.subheader("📋 Detalhamento")
 
-tabela = df_filtrado[
-    [
-        "anoEmpenho",
-        "nomeEntidade",
-        "Descrição da despesa",
-        "nomeCredor",
-        "numRecurso",
-        "valorEmpenhadoBruto",
-        "saldoBaixado"
-    ]
-].copy()
-
-def formata_real(valor):
-    return (
-        f"{valor:,.2f}"
-        .replace(",", "X")
-        .replace(".", ",")
-        .replace("X", ".")
-    )
-
-tabela["Valor Empenhado Bruto"] = tabela["valorEmpenhadoBruto"].apply(formata_real)
-tabela["Valor Pago"] = tabela["saldoBaixado"].apply(formata_real)
-
-tabela = tabela[
-    [
-        "anoEmpenho",
-        "nomeEntidade",
-        "Descrição da despesa",
-        "nomeCredor",
-        "numRecurso",
-        "Valor Empenhado Bruto",
-        "Valor Pago"
-    ]
+colunas_tabela = [
+    "anoEmpenho",
+    "nomeEntidade",
+    "Descrição da despesa",
+    "nomeCredor",
+    "numRecurso",
+    "valorEmpenhadoBruto",
+    "saldoBaixado"
 ]
 
-st.dataframe(tabela, use_container_width=True)
+rotulos = {
+    "valorEmpenhadoBruto": "Valor Empenhado Bruto",
+    "saldoBaixado": "Valor Pago"
+}
+
+colunas_valor = ["valorEmpenhadoBruto", "saldoBaixado"]
+
+tabela_paginada(
+    df_filtrado,
+    colunas_tabela,
+    colunas_valor,
+    rotulos=rotulos,
+    totais={"Valor Pago": df_graf["saldoBaixado"].sum()}
+)
 
 # ==================================
 # DOWNLOAD
 # ==================================
 st.divider()
 
-csv = tabela.to_csv(index=False, sep=";", encoding="utf-8-sig")
-
-st.download_button(
+# Exportações geradas em blocos só quando o botão é clicado
+botao_download_csv(
     "📥 Baixar CSV – Pagos no Exercício",
-    csv,
-    file_name="pagos_no_exercicio.csv",
-    mime="text/csv"
+    df_filtrado,
+    colunas_tabela,
+    "pagos_no_exercicio.csv",
+    colunas_valor,
+    rotulos=rotulos,
+    prefixo_moeda="",
+    encoding="utf-8-sig"
+)
+
+botao_download_xlsx(
+    "📥 Baixar Excel – Pagos no Exercício",
+    df_filtrado,
+    colunas_tabela,
+    "pagos_no_exercicio.xlsx",
+    colunas_valor,
+    rotulos=rotulos
 )
@@ -0,0 +1,136 @@
+import streamlit as st
+
+from auth import login
+from aquecimento import aquecer_em_segundo_plano
+from components.header import render_header
+
+# Começa a carregar os dados enquanto o login é exibido
+aquecer_em_segundo_plano()
+
+# 🔐 Segurança
+login()
+render_header()
+
+# Importações pesadas só depois do login: a tela de login abre sem
+# carregar pandas/altair
+from components.exportacao import botao_download_csv, botao_download_xlsx
+from components.filtros import chave_selecao, filtro_compartilhado
+from components.formatacao import formatar_brl
+from components.hierarquias import cubo_hierarquia, detalhar_hierarquia
+from data_loader import HIERARQUIAS, load_empenhos_tratados, versao_dataset
+
+st.set_page_config(
+    page_title="🏛️ Consulta Funcional-Programática",
+    layout="wide"
+)
+
+st.title("🏛️ Consulta Funcional-Programática")
+st.caption("Função › Subfunção › Programa › Ação")
+
+# ==========================
+# CARREGAR DADOS
+# ==========================
+# Base já limpa e tipada (cache compartilhado – não alterar)
+df = load_empenhos_tratados()
+if df.empty:
+    st.warning("Nenhum dado carregado.")
+    st.stop()
+
+# ==========================
+# FILTROS (compartilhados entre as páginas e refletidos na URL)
+# ==========================
+# Só Exercício e Entidade: são dimensões do cubo, então a página nunca
+# volta às linhas da base
+selecao = {}
+selecao["ano"] = filtro_compartilhado(
+    "ano",
+    "📅 Selecione Exercício(s)",
+    selecao,
+    todos=False
+)
+selecao["entidade"] = filtro_compartilhado(
+    "entidade",
+    "🏢 Selecione Entidade(s)",
+    selecao,
+    todos=False
+)
+
+VALORES = {
+    "valorEmpenhadoLiquido": "Empenhado Líquido",
+    "valorEmpenhadoBruto": "Empenhado Bruto",
+    "saldoBaixado": "Baixado no Exercício",
+}
+
+valor = st.radio(
+    "Valor",
+    list(VALORES),
+    format_func=VALORES.get,
+    horizontal=True,
+    key="valor_funcional"
+)
+
+# ==========================
+# CUBO DA SELEÇÃO
+# ==========================
+cubo = cubo_hierarquia(chave_selecao(selecao), "funcional", versao_dataset())
+
+if cubo.empty:
+    st.info("Nenhum dado encontrado com os filtros selecionados.")
+    st.stop()
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Empenhado Líquido", formatar_brl(cubo["valorEmpenhadoLiquido"].sum()))
+c2.metric("Baixado no Exercício", formatar_brl(cubo["saldoBaixado"].sum()))
+c3.metric("Ações", f"{cubo['codAcao'].nunique():,}".replace(",", "."))
+
+# ==========================
+# DETALHAMENTO NÍVEL A NÍVEL
+# ==========================
+# Cada nível é calculado só quando aberto e fica em cache
+st.subheader("🧭 Detalhamento")
+
+detalhar_hierarquia(
+    selecao,
+    "funcional",
+    valor,
+    chave="funcional",
+    rotulo_valor=VALORES[valor]
+)
+
+# ==========================
+# DOWNLOAD DO CUBO
+# ==========================
+st.divider()
+
+colunas_tabela = [
+    "anoEmpenho",
+    "nomeEntidade",
+    *[coluna for coluna, _ in HIERARQUIAS["funcional"]],
+    *VALORES,
+]
+
+rotulos = {
+    "anoEmpenho": "Exercício",
+    "nomeEntidade": "Entidade",
+    **dict(HIERARQUIAS["funcional"]),
+    **VALORES,
+}
+
+botao_download_csv(
+    "⬇️ Baixar CSV – Consulta Funcional",
+    cubo,
+    colunas_tabela,
+    "consulta_funcional.csv",
+    list(VALORES),
+    rotulos=rotulos,
+    encoding="utf-8-sig"
+)
+
+botao_download_xlsx(
+    "⬇️ Baixar Excel – Consulta Funcional",
+    cubo,
+    colunas_tabela,
+    "consulta_funcional.xlsx",
+    list(VALORES),
+    rotulos=rotulos
+)
@@ -0,0 +1,234 @@
+import streamlit as st
+
+from auth import login
+from aquecimento import aquecer_em_segundo_plano
+from components.header import render_header
+
+# Começa a carregar os dados enquanto o login é exibido
+aquecer_em_segundo_plano()
+
+# 🔐 Segurança
+login()
+render_header()
+
+# Importações pesadas só depois do login: a tela de login abre sem
+# carregar pandas/altair
+import altair as alt
+import pandas as pd
+from components.estagios import estagios_selecao
+from components.exportacao import botao_download_csv, botao_download_xlsx
+from components.filtros import chave_selecao, filtro_compartilhado
+from components.formatacao import config_moeda, formatar_brl
+from data_loader import ESTAGIOS, load_empenhos_tratados, versao_dataset
+
+st.set_page_config(
+    page_title="🔄 Estágios da Execução",
+    layout="wide"
+)
+
+st.title("🔄 Estágios da Execução")
+st.caption("Empenhado › Liquidado › Pago › A Pagar")
+
+# ==========================
+# CARREGAR DADOS
+# ==========================
+# Base já limpa e tipada (cache compartilhado – não alterar)
+df = load_empenhos_tratados()
+if df.empty:
+    st.warning("Nenhum dado carregado.")
+    st.stop()
+
+# ==========================
+# FILTROS (compartilhados entre as páginas e refletidos na URL)
+# ==========================
+selecao = {}
+selecao["ano"] = filtro_compartilhado(
+    "ano",
+    "📅 Selecione Exercício(s)",
+    selecao,
+    todos=False
+)
+selecao["entidade"] = filtro_compartilhado(
+    "entidade",
+    "🏢 Selecione Entidade(s)",
+    selecao,
+    todos=False
+)
+selecao["fonte"] = filtro_compartilhado(
+    "fonte",
+    "💰 Selecione Fonte(s) de Recurso",
+    selecao
+)
+selecao["despesa"] = filtro_compartilhado(
+    "despesa",
+    "📂 Selecione Descrição da Despesa",
+    selecao
+)
+selecao["credor"] = filtro_compartilhado(
+    "credor",
+    "🏦 Selecione Credor(es)",
+    selecao
+)
+
+# ==========================
+# ESTÁGIOS DA SELEÇÃO
+# ==========================
+# Tabela Exercício x Entidade já somada (cache por versão/seleção)
+tabela = estagios_selecao(chave_selecao(selecao), versao_dataset())
+
+if tabela.empty:
+    st.info("Nenhum dado encontrado com os filtros selecionados.")
+    st.stop()
+
+totais = tabela[[*ESTAGIOS, "liquidadoAPagar", "aLiquidar", "retido", "restosPagos"]].sum()
+empenhado = totais["empenhado"]
+
+
+def percentual(valor):
+    return f"{valor / empenhado:.1%}".replace(".", ",") if empenhado else "—"
+
+
+colunas = st.columns(len(ESTAGIOS))
+for coluna, (estagio, rotulo) in zip(colunas, ESTAGIOS.items()):
+    coluna.metric(
+        rotulo,
+        formatar_brl(totais[estagio]),
+        None if estagio == "empenhado" else f"{percentual(totais[estagio])} do empenhado",
+        delta_color="off"
+    )
+
+st.caption(
+    f"A pagar: {formatar_brl(totais['liquidadoAPagar'])} liquidados (processados) e "
+    f"{formatar_brl(totais['aLiquidar'])} a liquidar (não processados) · "
+    f"Retenções: {formatar_brl(totais['retido'])} · "
+    f"Restos a pagar pagos: {formatar_brl(totais['restosPagos'])}"
+)
+
+# ==========================
+# FUNIL
+# ==========================
+st.subheader("📉 Funil da Execução")
+
+funil = pd.DataFrame({
+    "Estágio": list(ESTAGIOS.values()),
+    "Valor": [totais[estagio] for estagio in ESTAGIOS],
+})
+funil["Percentual"] = funil["Valor"] / empenhado if empenhado else 0.0
+
+ordem = list(ESTAGIOS.values())
+base_funil = alt.Chart(funil).encode(
+    y=alt.Y("Estágio:N", sort=ordem, title=None),
+    x=alt.X("Valor:Q", title="Valor (R$)"),
+)
+
+st.altair_chart(
+    (
+        base_funil.mark_bar(size=36).encode(
+            color=alt.Color("Estágio:N", sort=ordem, legend=None),
+            tooltip=[
+                "Estágio:N",
+                alt.Tooltip("Valor:Q", format=",.2f"),
+                alt.Tooltip("Percentual:Q", format=".1%", title="% do empenhado")
+            ]
+        )
+        + base_funil.mark_text(align="left", dx=4).encode(
+            text=alt.Text("Percentual:Q", format=".1%")
+        )
+    ).properties(height=260),
+    use_container_width=True
+)
+
+# ==========================
+# ESTÁGIOS POR EXERCÍCIO
+# ==========================
+st.subheader("📊 Estágios por Exercício")
+
+por_ano = tabela.groupby("anoEmpenho", as_index=False)[list(ESTAGIOS)].sum()
+
+st.altair_chart(
+    alt.Chart(por_ano)
+    .transform_fold(list(ESTAGIOS), as_=["Estágio", "Valor"])
+    .mark_bar(size=22)
+    .encode(
+        x=alt.X("anoEmpenho:N", title="Exercício", axis=alt.Axis(labelAngle=0)),
+        xOffset=alt.XOffset("Estágio:N", sort=list(ESTAGIOS)),
+        y=alt.Y("Valor:Q", title="Valor (R$)"),
+        color=alt.Color(
+            "Estágio:N",
+            sort=list(ESTAGIOS),
+            title="Estágio",
+            legend=alt.Legend(
+                orient="bottom",
+                direction="horizontal",
+                labelExpr=" : ".join(
+                    f"datum.label == '{estagio}' ? '{rotulo}'"
+                    for estagio, rotulo in ESTAGIOS.items()
+                ) + " : datum.label"
+            )
+        ),
+        tooltip=[
+            "anoEmpenho:N",
+            "Estágio:N",
+            alt.Tooltip("Valor:Q", format=",.2f")
+        ]
+    )
+    .properties(height=380),
+    use_container_width=True
+)
+
+# ==========================
+# TABELA POR EXERCÍCIO E ENTIDADE
+# ==========================
+st.subheader("📋 Por Exercício e Entidade")
+
+detalhe = tabela[["anoEmpenho", "nomeEntidade", *ESTAGIOS, "liquidadoAPagar", "aLiquidar"]].copy()
+detalhe["pctLiquidado"] = (detalhe["liquidado"] / detalhe["empenhado"]).where(detalhe["empenhado"] != 0)
+detalhe["pctPago"] = (detalhe["pago"] / detalhe["empenhado"]).where(detalhe["empenhado"] != 0)
+
+rotulos = {
+    "anoEmpenho": "Exercício",
+    "nomeEntidade": "Entidade",
+    **ESTAGIOS,
+    "liquidadoAPagar": "Liquidado a Pagar",
+    "aLiquidar": "A Liquidar",
+    "pctLiquidado": "% Liquidado",
+    "pctPago": "% Pago",
+}
+colunas_valor = [*ESTAGIOS, "liquidadoAPagar", "aLiquidar"]
+
+st.dataframe(
+    detalhe,
+    column_config={
+        "anoEmpenho": "Exercício",
+        "nomeEntidade": "Entidade",
+        **config_moeda(colunas_valor, rotulos),
+        "pctLiquidado": st.column_config.NumberColumn("% Liquidado", format="percent"),
+        "pctPago": st.column_config.NumberColumn("% Pago", format="percent"),
+    },
+    hide_index=True,
+    use_container_width=True
+)
+
+# ==========================
+# DOWNLOAD
+# ==========================
+colunas_tabela = ["anoEmpenho", "nomeEntidade", *colunas_valor]
+
+botao_download_csv(
+    "⬇️ Baixar CSV – Estágios da Execução",
+    detalhe,
+    colunas_tabela,
+    "estagios_execucao.csv",
+    colunas_valor,
+    rotulos=rotulos,
+    encoding="utf-8-sig"
+)
+
+botao_download_xlsx(
+    "⬇️ Baixar Excel – Estágios da Execução",
+    detalhe,
+    colunas_tabela,
+    "estagios_execucao.xlsx",
+    colunas_valor,
+    rotulos=rotulos
+)
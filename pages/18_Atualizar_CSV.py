@@ -1,5 +1,4 @@
 import streamlit as st
-from github_manager import upload_arquivo, excluir_arquivo
 from auth import login, exige_admin
 from components.header import render_header
 
@@ -8,37 +7,174 @@ login()
 render_header()
 exige_admin()
 
+# Importações pesadas só depois do login (requests, pandas)
+import re
+import github_client
+import tarefas
+from github_client import ERROS_GITHUB
+from github_manager import compactar_gzip
+from data_loader import EXTENSOES, gerar_parquet, nome_particao
+from sincronizacao import sincronizar
+
 st.title("📤 Gerenciar Arquivos")
 
-# ---------------------------
-# Mensagem pós-atualização
-# ---------------------------
-if st.session_state.get("arquivos_atualizados"):
-    st.success("🔄 Arquivos atualizados com sucesso.")
-    del st.session_state["arquivos_atualizados"]
+STATUS_TAREFA = {
+    tarefas.NA_FILA: "⏳ Na fila",
+    tarefas.EXECUTANDO: "🚀 Enviando",
+    tarefas.CONCLUIDA: "✅ Concluída",
+    tarefas.FALHOU: "❌ Falhou",
+}
+
+
+def painel_tarefas():
+    """
+    Acompanha os envios em segundo plano lendo os registros das tarefas.
+    Enquanto houver tarefa ativa, o fragmento se atualiza sozinho.
+    """
+    lista = tarefas.listar_tarefas(limite=5)
+    if not lista:
+        st.caption("Nenhum envio recente.")
+        return
+
+    for tarefa in lista:
+        arquivos = ", ".join(tarefa["arquivos"] or tarefa["remover"])
+        st.markdown(f"**{STATUS_TAREFA[tarefa['status']]}** · {tarefa['mensagem']}")
+
+        if tarefa["status"] in tarefas.ATIVAS and tarefa["bytes_total"]:
+            mb = tarefa["bytes_enviados"] / 1024 / 1024
+            vazao = mb / max(tarefa["segundos"], 1e-6)
+            st.progress(
+                min(tarefa["bytes_enviados"] / tarefa["bytes_total"], 1.0),
+                text=(
+                    f"{tarefa['arquivos_enviados']}/{len(tarefa['arquivos'])} arquivo(s)"
+                    f" · {mb:.1f} MB · {vazao:.1f} MB/s"
+                )
+            )
+        elif tarefa["commit"]:
+            st.caption(f"{arquivos} · commit `{tarefa['commit'][:7]}`")
+        if tarefa["erro"]:
+            st.error(tarefa["erro"])
+
+    # Terminou o que estava ativo: recarrega a página para parar a consulta
+    ativas = any(t["status"] in tarefas.ATIVAS for t in lista)
+    if st.session_state.get("_tarefas_ativas") and not ativas:
+        st.session_state["_tarefas_ativas"] = False
+        st.rerun()
+    st.session_state["_tarefas_ativas"] = ativas
+
+
+def enviar_em_segundo_plano(arquivos: dict, mensagem: str, remover=()):
+    """
+    Coloca o commit na fila; ao terminar, sincroniza ``data/`` com o
+    repositório (só os arquivos alterados) e recarrega só esses anos.
+    """
+    tarefas.enviar(
+        arquivos,
+        mensagem,
+        remover=remover,
+        usuario=st.session_state.get("usuario"),
+        ao_concluir=lambda caminhos: sincronizar()
+    )
+    st.session_state["_tarefas_ativas"] = True
+    st.rerun()
+
+
+# =========================
+# ENVIOS EM ANDAMENTO
+# =========================
+st.subheader("📡 Envios")
+st.fragment(run_every=2 if tarefas.existe_ativa() else None)(painel_tarefas)()
+st.divider()
 
 # =========================
 # UPLOAD
 # =========================
-arquivo = st.file_uploader("Selecione um CSV", type=("csv"))
+# Vários arquivos viram um único commit (um só redeploy e recarga)
+arquivos = st.file_uploader(
+    "Selecione um ou mais CSV",
+    type=("csv"),
+    accept_multiple_files=True
+)
+
+compactar = st.checkbox(
+    "Compactar CSV (gzip)",
+    help="Envia <arquivo>.csv.gz: menor no repositório e no deploy"
+)
+somente_parquet = st.checkbox(
+    "Enviar só a partição Parquet (sem o CSV)",
+    help="O app lê o Parquet; o CSV fica só como cópia do original"
+)
+
+
+# Só CSVs de empenhos de um ano: o nome vira caminho no repositório
+NOME_CSV = re.compile(r"^\d{4}_empenhos\.csv$")
+
+
+def formatos(nome: str) -> list:
+    """Caminhos no repositório de todos os formatos de um ano."""
+    base = nome_particao(nome).removesuffix(".parquet")
+    return [f"data/{base}{extensao}" for extensao in EXTENSOES]
 
-if arquivo is not None:
-    if st.button("Enviar Arquivo"):
+
+def existentes_no_github(caminhos) -> list:
+    """
+    Quais de ``caminhos`` existem hoje em ``data/`` no GitHub (a cópia
+    local pode estar atrasada em relação ao repositório).
+    """
+    no_repositorio = github_client.listar_arvore("data", recursiva=False)
+    return [caminho for caminho in caminhos if caminho in no_repositorio]
+
+
+invalidos = [arquivo.name for arquivo in arquivos or [] if not NOME_CSV.match(arquivo.name)]
+if invalidos:
+    for nome in invalidos:
+        st.error(f"❌ Nome inválido: {nome} (use AAAA_empenhos.csv, ex: 2024_empenhos.csv)")
+elif arquivos:
+    if st.button(f"Enviar {len(arquivos)} arquivo(s)"):
         try:
-            # ✅ bytes corretos para o GitHub
-            conteudo_bytes = arquivo.getvalue()
+            # 1) Valida e converte cada CSV em partição Parquet (tipada, zstd)
+            conteudos = {}
+            erros = []
+            validacao = st.progress(0.0, text="Validando arquivos...")
+            for i, arquivo in enumerate(arquivos, start=1):
+                try:
+                    parquet, linhas = gerar_parquet(arquivo, arquivo.name)
+                except ValueError as e:
+                    erros.append(str(e))
+                    continue
+                conteudos[f"data/{nome_particao(arquivo.name)}"] = parquet
+                validacao.progress(
+                    i / len(arquivos),
+                    text=f"✔️ {arquivo.name}: {linhas:,} linhas".replace(",", ".")
+                )
 
-            resultado = upload_arquivo(
-                conteudo_bytes,
-                f"data/{arquivo.name}",
-                mensagem=f"Upload {arquivo.name}"
+            if erros:
+                for erro in erros:
+                    st.error(f"❌ {erro}")
+                st.stop()
+
+            # 2) CSV original (em streaming, sem cópias extras em memória)
+            if not somente_parquet:
+                for arquivo in arquivos:
+                    if compactar:
+                        conteudos[f"data/{arquivo.name}.gz"] = compactar_gzip(arquivo)
+                    else:
+                        conteudos[f"data/{arquivo.name}"] = arquivo
+
+            # Os outros formatos do mesmo ano saem no mesmo commit,
+            # para o ano não ficar duplicado
+            remover = existentes_no_github(
+                caminho
+                for arquivo in arquivos
+                for caminho in formatos(arquivo.name)
+                if caminho not in conteudos
             )
 
-            st.success("✅ Upload realizado com sucesso!")
-            st.cache_data.clear()
-            st.session_state["arquivos_atualizados"] = True
-            st.rerun()
+            nomes = ", ".join(arquivo.name for arquivo in arquivos)
+            enviar_em_segundo_plano(conteudos, f"Upload {nomes}", remover=remover)
 
+        except ERROS_GITHUB as e:
+            st.error(f"❌ Erro ao consultar o GitHub: {e}")
         except Exception as e:
             st.error(f"❌ Erro no upload: {e}")
 
@@ -51,18 +187,21 @@ st.subheader("🗑️ Excluir Arquivo")
 arquivo_excluir = st.text_input("Nome do CSV (ex: 2024_empenhos.csv)")
 
 if st.button("Excluir CSV do GitHub") and arquivo_excluir:
+    nome_excluir = arquivo_excluir.strip()
     try:
-        caminho_repo = f"data/{arquivo_excluir.strip()}"
+        if not NOME_CSV.match(nome_excluir):
+            st.error(f"❌ Nome inválido: {nome_excluir} (use AAAA_empenhos.csv)")
+            st.stop()
 
-        excluir_arquivo(
-            caminho_repo,
-            mensagem=f"Remoção {arquivo_excluir}"
-        )
+        # Remove também a partição Parquet / versão compactada do mesmo ano
+        caminhos = existentes_no_github(formatos(nome_excluir))
+        if not caminhos:
+            st.error(f"❌ {nome_excluir} não está no GitHub")
+            st.stop()
 
-        st.success("🗑️ Arquivo removido com sucesso!")
-        st.cache_data.clear()
-        st.session_state["arquivos_atualizados"] = True
-        st.rerun()
+        enviar_em_segundo_plano({}, f"Remoção {nome_excluir}", remover=caminhos)
 
+    except ERROS_GITHUB as e:
+        st.error(f"❌ Erro ao consultar o GitHub: {e}")
     except Exception as e:
         st.error(f"❌ Erro na exclusão: {e}")
@@ -18,7 +18,7 @@ if not PASTA_DATA.exists():
     st.warning("Pasta /data não encontrada.")
     st.stop()
 
-arquivos = sorted(PASTA_DATA.glob("*.csv"))
+arquivos = sorted([*PASTA_DATA.glob("*.csv"), *PASTA_DATA.glob("*.csv.gz"), *PASTA_DATA.glob("*.parquet")])
 
 if not arquivos:
     st.info("Nenhum arquivo CSV encontrado.")
@@ -31,6 +31,27 @@ for arq in arquivos:
 
 st.divider()
 
+# Traz do repositório só os arquivos alterados desde a última vez
+# (sem esperar o redeploy do app)
+if st.button("🔄 Sincronizar com o GitHub"):
+    from sincronizacao import sincronizar
+
+    barra = st.progress(0.0, text="Comparando com o repositório...")
+
+    def progresso(nome, feitos, total):
+        barra.progress(feitos / total, text=f"📥 {nome} ({feitos}/{total})")
+
+    try:
+        alterados = sincronizar(progresso=progresso)
+    except Exception as e:
+        st.error(f"❌ Erro na sincronização: {e}")
+    else:
+        barra.progress(1.0, text="✅ Sincronizado")
+        if alterados:
+            st.success(f"Arquivos atualizados: {', '.join(alterados)}")
+        else:
+            st.info("Nenhuma alteração no repositório.")
+
 st.info(
     "📌 **Observação:** o envio e a exclusão de arquivos CSV "
     "devem ser realizados exclusivamente pela página **Atualizar CSV**."
@@ -1,165 +1,234 @@
-import streamlit as st
-import json
-import requests
-import base64
-from auth import login, exige_admin
-from components.header import render_header
-
-# ============================
-# CONFIGURAÇÃO DA PÁGINA
-# ============================
-st.set_page_config(page_title="Gerenciar Usuários", layout="wide")
-
-login()
-render_header()
-exige_admin()
-
-st.title("👥 Gerenciar Usuários e Solicitações")
-
-# ============================
-# CONFIGURAÇÃO GITHUB
-# ============================
-REPO = "planejamentobarbacena-web/Comparativos_Empenhos"
-BRANCH = "master"
-
-FILE_USERS = "data/usuarios.json"
-FILE_SOLIC = "data/solicitacoes.json"
-
-TOKEN = st.secrets["GITHUB_TOKEN"]
-
-HEADERS = {
-    "Authorization": f"token {TOKEN}",
-    "Accept": "application/vnd.github.v3+json"
-}
-
-# ============================
-# FUNÇÕES AUXILIARES
-# ============================
-def carregar_github(caminho):
-    url = f"https://api.github.com/repos/{REPO}/contents/{caminho}"
-    r = requests.get(url, headers=HEADERS)
-    if r.status_code != 200:
-        return {}, None
-    info = r.json()
-    dados = json.loads(requests.get(info["download_url"]).text)
-    return dados, info.get("sha")
-
-
-def salvar_github(dados, caminho, mensagem):
-    _, sha_atual = carregar_github(caminho)
-    conteudo = base64.b64encode(
-        json.dumps(dados, indent=2, ensure_ascii=False).encode("utf-8")
-    ).decode("utf-8")
-
-    payload = {
-        "message": mensagem,
-        "content": conteudo,
-        "sha": sha_atual,
-        "branch": BRANCH
-    }
-
-    r = requests.put(
-        f"https://api.github.com/repos/{REPO}/contents/{caminho}",
-        json=payload,
-        headers=HEADERS
-    )
-
-    if r.status_code not in (200, 201):
-        st.error("Erro ao salvar no GitHub")
-        st.json(r.json())
-        st.stop()
-
-# ============================
-# CARREGAR DADOS
-# ============================
-solicitacoes, _ = carregar_github(FILE_SOLIC)
-usuarios, _ = carregar_github(FILE_USERS)
-
-solicitacoes = solicitacoes or {}
-usuarios = usuarios or {}
-
-# ============================
-# SOLICITAÇÕES PENDENTES
-# ============================
-pendentes = {
-    nome: info
-    for nome, info in solicitacoes.items()
-    if isinstance(info, dict) and info.get("status") == "pendente"
-}
-
-st.subheader("📬 Solicitações Pendentes")
-
-if not pendentes:
-    st.info("📭 Nenhuma solicitação pendente no momento.")
-else:
-    for nome, info in pendentes.items():
-        st.markdown(f"### 👤 {nome}")
-
-        perfil_escolhido = st.selectbox(
-            f"Perfil do usuário **{nome}**",
-            ["USER", "ADMIN"],
-            key=f"perfil_{nome}"
-        )
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            if st.button(f"✅ Aprovar {nome}", key=f"aprovar_{nome}"):
-                usuarios[nome] = {
-                    "senha": info["senha"],
-                    "perfil": perfil_escolhido,
-                    "status": "ativo"
-                }
-                solicitacoes[nome]["status"] = "aprovado"
-
-                salvar_github(usuarios, FILE_USERS, f"Aprovação do usuário {nome}")
-                salvar_github(solicitacoes, FILE_SOLIC, f"Aprovação da solicitação {nome}")
-
-                st.success(f"Usuário **{nome}** aprovado com sucesso!")
-                st.experimental_rerun()
-
-        with col2:
-            if st.button(f"❌ Rejeitar {nome}", key=f"rejeitar_{nome}"):
-                solicitacoes[nome]["status"] = "rejeitado"
-                salvar_github(solicitacoes, FILE_SOLIC, f"Rejeição da solicitação {nome}")
-                st.warning(f"Solicitação de **{nome}** rejeitada.")
-                st.experimental_rerun()
-
-# ============================
-# USUÁRIOS ATIVOS
-# ============================
-st.divider()
-st.subheader("👥 Usuários Ativos")
-
-ativos = {
-    nome: info
-    for nome, info in usuarios.items()
-    if isinstance(info, dict) and info.get("status") == "ativo"
-}
-
-if not ativos:
-    st.info("Nenhum usuário ativo cadastrado.")
-else:
-    remover = []
-
-    for nome, info in ativos.items():
-        col1, col2, col3 = st.columns([4, 2, 1])
-
-        with col1:
-            st.write(f"👤 {nome}")
-
-        with col2:
-            st.write(info.get("perfil", "USER"))
-
-        with col3:
-            if nome != "admin":
-                if st.button("🗑️", key=f"del_{nome}"):
-                    remover.append(nome)
-
-    if remover:
-        for nome in remover:
-            usuarios.pop(nome, None)
-
-        salvar_github(usuarios, FILE_USERS, "Remoção de usuários")
-        st.success("Usuário(s) removido(s) com sucesso!")
-        st.experimental_rerun()
+import streamlit as st
+from auth import login, exige_admin
+from components.header import render_header
+
+# ============================
+# CONFIGURAÇÃO DA PÁGINA
+# ============================
+st.set_page_config(page_title="Gerenciar Usuários", layout="wide")
+
+login()
+render_header()
+exige_admin()
+
+# Importado só depois do login: não pesa na tela de acesso
+from cadastro import (
+    Conflito,
+    alterar_juntos,
+    carregar_juntos,
+    solicitacoes_github,
+    usuarios_github
+)
+from github_client import ERROS_GITHUB, ErroGitHub
+
+st.title("👥 Gerenciar Usuários e Solicitações")
+
+# ============================
+# CADASTROS NO GITHUB
+# ============================
+CADASTRO_USUARIOS = usuarios_github()
+CADASTRO_SOLIC = solicitacoes_github()
+
+
+# ============================
+# FUNÇÕES AUXILIARES
+# ============================
+def carregar_cadastros(recarregar=False):
+    """
+    Solicitações e usuários, lidos juntos (em paralelo) e guardados na
+    sessão: os cliques da página não voltam ao GitHub a cada rerun.
+    """
+    if recarregar or "cadastros_admin" not in st.session_state:
+        try:
+            st.session_state.cadastros_admin = carregar_juntos(CADASTRO_SOLIC, CADASTRO_USUARIOS)
+        except ERROS_GITHUB as e:
+            st.error(f"❌ Erro ao ler os cadastros no GitHub: {e}")
+            st.stop()
+    return st.session_state.cadastros_admin
+
+
+def alteracoes_pendentes():
+    """Aprovações, rejeições e remoções marcadas e ainda não salvas."""
+    if "alteracoes_admin" not in st.session_state:
+        st.session_state.alteracoes_admin = {"aprovar": {}, "rejeitar": [], "remover": []}
+    return st.session_state.alteracoes_admin
+
+
+def com_campos(**campos):
+    return lambda atual: {**(atual or {}), **campos}
+
+
+def remover_registro(atual):
+    return None
+
+
+def plural(n, singular, plural):
+    return f"{n} {singular if n == 1 else plural}"
+
+
+def salvar_alteracoes(solicitacoes, alteracoes):
+    """
+    Grava tudo o que foi marcado num único commit com os dois arquivos.
+    Se outro admin salvou no meio, os arquivos são relidos e as
+    alterações reaplicadas registro a registro (nada se perde).
+    """
+    aprovar = alteracoes["aprovar"]
+
+    mudancas_usuarios = {
+        nome: com_campos(senha=solicitacoes[nome]["senha"], perfil=perfil, status="ativo")
+        for nome, perfil in aprovar.items()
+    }
+    mudancas_usuarios.update({nome: remover_registro for nome in alteracoes["remover"]})
+
+    mudancas_solic = {nome: com_campos(status="aprovado") for nome in aprovar}
+    mudancas_solic.update({nome: com_campos(status="rejeitado") for nome in alteracoes["rejeitar"]})
+
+    partes = [
+        plural(len(aprovar), "aprovação", "aprovações"),
+        plural(len(alteracoes["rejeitar"]), "rejeição", "rejeições"),
+        plural(len(alteracoes["remover"]), "remoção", "remoções"),
+    ]
+    mensagem = "Gerenciamento de usuários: " + ", ".join(
+        parte for parte in partes if not parte.startswith("0 ")
+    )
+
+    try:
+        alterar_juntos(
+            {CADASTRO_USUARIOS: mudancas_usuarios, CADASTRO_SOLIC: mudancas_solic},
+            mensagem
+        )
+    except ErroGitHub as e:
+        st.error("Erro ao salvar no GitHub")
+        st.json(e.resposta)
+        st.stop()
+    except ERROS_GITHUB as e:
+        st.error(f"❌ Sem conexão com o GitHub: {e}")
+        st.stop()
+    except Conflito:
+        st.error("O cadastro mudou várias vezes durante a gravação. Tente novamente.")
+        st.stop()
+
+
+# ============================
+# CARREGAR DADOS
+# ============================
+solicitacoes, usuarios = carregar_cadastros()
+alteracoes = alteracoes_pendentes()
+
+if "aviso_admin" in st.session_state:
+    st.success(st.session_state.pop("aviso_admin"))
+
+# ============================
+# SOLICITAÇÕES PENDENTES
+# ============================
+pendentes = {
+    nome: info
+    for nome, info in solicitacoes.items()
+    if isinstance(info, dict) and info.get("status") == "pendente"
+}
+
+st.subheader("📬 Solicitações Pendentes")
+
+if not pendentes:
+    st.info("📭 Nenhuma solicitação pendente no momento.")
+else:
+    for nome, info in pendentes.items():
+        st.markdown(f"### 👤 {nome}")
+
+        if nome in alteracoes["aprovar"] or nome in alteracoes["rejeitar"]:
+            acao = (
+                f"aprovação como {alteracoes['aprovar'][nome]}"
+                if nome in alteracoes["aprovar"] else "rejeição"
+            )
+            st.caption(f"⏳ Marcada para {acao} (ainda não salva)")
+            if st.button("↩️ Desfazer", key=f"desfazer_{nome}"):
+                alteracoes["aprovar"].pop(nome, None)
+                if nome in alteracoes["rejeitar"]:
+                    alteracoes["rejeitar"].remove(nome)
+                st.rerun()
+            continue
+
+        perfil_escolhido = st.selectbox(
+            f"Perfil do usuário **{nome}**",
+            ["USER", "ADMIN"],
+            key=f"perfil_{nome}"
+        )
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            if st.button(f"✅ Aprovar {nome}", key=f"aprovar_{nome}"):
+                alteracoes["aprovar"][nome] = perfil_escolhido
+                st.rerun()
+
+        with col2:
+            if st.button(f"❌ Rejeitar {nome}", key=f"rejeitar_{nome}"):
+                alteracoes["rejeitar"].append(nome)
+                st.rerun()
+
+# ============================
+# USUÁRIOS ATIVOS
+# ============================
+st.divider()
+st.subheader("👥 Usuários Ativos")
+
+ativos = {
+    nome: info
+    for nome, info in usuarios.items()
+    if isinstance(info, dict) and info.get("status") == "ativo"
+}
+
+if not ativos:
+    st.info("Nenhum usuário ativo cadastrado.")
+else:
+    for nome, info in ativos.items():
+        col1, col2, col3 = st.columns([4, 2, 1])
+
+        marcado = nome in alteracoes["remover"]
+
+        with col1:
+            st.write(f"👤 ~~{nome}~~ (remoção não salva)" if marcado else f"👤 {nome}")
+
+        with col2:
+            st.write(info.get("perfil", "USER"))
+
+        with col3:
+            if nome != "admin":
+                if st.button("↩️" if marcado else "🗑️", key=f"del_{nome}"):
+                    if marcado:
+                        alteracoes["remover"].remove(nome)
+                    else:
+                        alteracoes["remover"].append(nome)
+                    st.rerun()
+
+# ============================
+# SALVAR ALTERAÇÕES
+# ============================
+st.divider()
+
+total = sum(len(v) for v in alteracoes.values())
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    if st.button(
+        f"💾 Salvar {plural(total, 'alteração', 'alterações')}",
+        disabled=total == 0,
+        type="primary"
+    ):
+        with st.spinner("Salvando no GitHub (um commit)..."):
+            salvar_alteracoes(solicitacoes, alteracoes)
+        del st.session_state.alteracoes_admin
+        carregar_cadastros(recarregar=True)
+        st.session_state.aviso_admin = "Alterações salvas com sucesso!"
+        st.rerun()
+
+with col2:
+    if st.button("🗑️ Descartar alterações", disabled=total == 0):
+        del st.session_state.alteracoes_admin
+        st.rerun()
+
+with col3:
+    if st.button("🔄 Recarregar do GitHub"):
+        carregar_cadastros(recarregar=True)
+        st.rerun()
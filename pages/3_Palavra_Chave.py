@@ -1,15 +1,27 @@
 import streamlit as st
-import altair as alt
 import unicodedata
-import pandas as pd
+
 from auth import login
+from aquecimento import aquecer_em_segundo_plano
 from components.header import render_header
-from data_loader import load_empenhos
+
+# Começa a carregar os dados enquanto o login é exibido
+aquecer_em_segundo_plano()
 
 # 🔐 Segurança
 login()
 render_header()
 
+# Importações pesadas só depois do login: a tela de login abre sem
+# carregar pandas/altair
+import altair as alt
+from components.formatacao import formatar_brl
+from components.tabelas import tabela_paginada
+from components.exportacao import botao_download_csv, botao_download_xlsx
+from components.graficos import dados_grafico
+from components.filtros import filtro_compartilhado, linhas_filtradas
+from data_loader import load_empenhos_tratados, versao_dataset
+
 st.set_page_config(
     page_title="🔎 Empenhos por Palavra-Chave",
     layout="wide"
@@ -20,66 +32,31 @@ st.title("🔎 Empenhos por Palavra-Chave")
 # ==========================
 # CARREGAR DADOS
 # ==========================
-df = load_empenhos()
+# Base já limpa e tipada (cache compartilhado – não alterar)
+df = load_empenhos_tratados()
 if df.empty:
     st.warning("Nenhum dado carregado.")
     st.stop()
 
-# 🔹 Limpeza definitiva de Exercício e Entidade
-df["anoEmpenho"] = (
-    df["anoEmpenho"]
-    .astype(str)
-    .str.strip()
-    .replace(["nan", "None", ""], pd.NA)
-)
-
-df["nomeEntidade"] = (
-    df["nomeEntidade"]
-    .astype(str)
-    .str.strip()
-    .replace(["nan", "None", ""], pd.NA)
-)
-
-df = df.dropna(subset=["anoEmpenho", "nomeEntidade"])
-
-# ==========================
-# TRATAMENTO DE VALORES (CORREÇÃO DO ERRO)
-# ==========================
-for col in ["valorEmpenhadoBruto", "valorEmpenhadoAnulado"]:
-    df[col] = (
-        df[col]
-        .astype(str)
-        .str.replace(".", "", regex=False)
-        .str.replace(",", ".", regex=False)
-    )
-    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-df["valorEmpenhadoLiquido"] = (
-    df["valorEmpenhadoBruto"] - df["valorEmpenhadoAnulado"]
-)
-
 # ==========================
 # FILTROS GLOBAIS
 # ==========================
-anos = sorted(df["anoEmpenho"].dropna().unique())
-entidades = sorted(df["nomeEntidade"].dropna().unique())
-
-anos_sel = st.multiselect(
+# Exercício e Entidade são compartilhados com as demais páginas (e na URL)
+selecao = {}
+selecao["ano"] = filtro_compartilhado(
+    "ano",
     "📅 Selecione Exercício(s)",
-    anos,
-    default=anos
+    selecao,
+    todos=False
 )
-
-entidades_sel = st.multiselect(
+selecao["entidade"] = filtro_compartilhado(
+    "entidade",
     "🏢 Selecione Entidade(s)",
-    entidades,
-    default=entidades
+    selecao,
+    todos=False
 )
 
-df = df[
-    df["anoEmpenho"].isin(anos_sel) &
-    df["nomeEntidade"].isin(entidades_sel)
-]
+df = linhas_filtradas(selecao)
 
 # ==========================
 # Normalização de texto
@@ -97,12 +74,19 @@ def singularize(word: str) -> str:
         return word[:-1]
     return word
 
-df["especificacao_norm"] = (
-    df["especificacao"]
-    .astype(str)
-    .apply(normalize_text)
-    .apply(singularize)
-)
+@st.cache_resource(max_entries=1, show_spinner="🔤 Indexando especificações...")
+def especificacoes_normalizadas(versao: tuple):
+    """
+    Normaliza a especificação da base inteira uma vez por versão dos dados
+    (não a cada busca). Só a versão atual fica em memória.
+    """
+    base = load_empenhos_tratados()
+    return (
+        base["especificacao"]
+        .astype(str)
+        .apply(normalize_text)
+        .apply(singularize)
+    )
 
 # ==========================
 # Palavra-chave
@@ -118,9 +102,11 @@ if not palavra:
 
 palavra_norm = singularize(normalize_text(palavra))
 
+especificacao_norm = especificacoes_normalizadas(versao_dataset()).loc[df.index]
+
 df_filtro = df[
-    df["especificacao_norm"].str.contains(palavra_norm, na=False)
-].copy()
+    especificacao_norm.str.contains(palavra_norm, na=False, regex=False)
+]
 
 if df_filtro.empty:
     st.warning("Nenhum empenho encontrado com essa palavra.")
@@ -151,25 +137,28 @@ total = df_filtro["valorEmpenhadoLiquido"].sum()
 
 st.metric(
     "💰 Total Empenhado Líquido",
-    f"R$ {total:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    formatar_brl(total)
 )
 
 # ==========================
 # Gráfico (sem linhas)
 # ==========================
+# Soma feita aqui: o navegador recebe só exercício e total
+df_graf = dados_grafico(df_filtro, "anoEmpenho", "valorEmpenhadoLiquido")
+
 graf = (
-    alt.Chart(df_filtro)
+    alt.Chart(df_graf)
     .mark_bar(size=50)
     .encode(
         x=alt.X("anoEmpenho:N", title="Exercício"),
         y=alt.Y(
-            "sum(valorEmpenhadoLiquido):Q",
+            "valorEmpenhadoLiquido:Q",
             title="Valor Empenhado Líquido (R$)"
         ),
         tooltip=[
             "anoEmpenho:N",
             alt.Tooltip(
-                "sum(valorEmpenhadoLiquido):Q",
+                "valorEmpenhadoLiquido:Q",
                 format=",.2f"
             )
         ]
@@ -179,9 +168,6 @@ graf = (
 
 st.altair_chart(graf, use_container_width=True)
 
-# ==========================
-# Tabela
-# ==========================
 # ==========================
 # Tabela
 # ==========================
@@ -199,31 +185,36 @@ cols = [
     "numRecurso"
 ]
 
-tabela = df_filtro[cols].copy()
-
-for col in [
+colunas_valor = [
     "valorEmpenhadoBruto",
     "valorEmpenhadoAnulado",
     "valorEmpenhadoLiquido"
-]:
-    tabela[col] = tabela[col].apply(
-        lambda x: f"R$ {x:,.2f}"
-        .replace(",", "X")
-        .replace(".", ",")
-        .replace("X", ".")
-    )
+]
 
 st.subheader("📋 Empenhos encontrados")
-st.dataframe(tabela, use_container_width=True)
+tabela_paginada(
+    df_filtro,
+    cols,
+    colunas_valor,
+    totais={"Empenhado Líquido": total}
+)
 
 # ==========================
 # Download
 # ==========================
-csv = tabela.to_csv(index=False, sep=";", encoding="utf-8")
-
-st.download_button(
+# Exportações geradas em blocos só quando o botão é clicado
+botao_download_csv(
     "⬇️ Baixar CSV – Palavra-Chave",
-    csv,
-    file_name=f"empenhos_palavra_chave_{palavra.replace(' ', '_')}.csv",
-    mime="text/csv"
+    df_filtro,
+    cols,
+    f"empenhos_palavra_chave_{palavra.replace(' ', '_')}.csv",
+    colunas_valor
+)
+
+botao_download_xlsx(
+    "⬇️ Baixar Excel – Palavra-Chave",
+    df_filtro,
+    cols,
+    f"empenhos_palavra_chave_{palavra.replace(' ', '_')}.xlsx",
+    colunas_valor
 )
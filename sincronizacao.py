@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import github_client
+from data_loader import EXTENSOES, PASTA_DADOS, recarregar_particoes
+
+# ==========================
+# SINCRONIZAÇÃO INCREMENTAL DE data/
+# ==========================
+# Manifesto local: {nome do arquivo: SHA do blob no repositório}
+MANIFESTO = PASTA_DADOS / ".manifesto.json"
+# Pasta no repositório espelhada em PASTA_DADOS
+PASTA_REPOSITORIO = "data"
+
+DOWNLOADS_PARALELOS = 4
+
+
+def _sincronizavel(nome: str) -> bool:
+    """Só os arquivos de empenhos (todos os formatos) são sincronizados."""
+    return any(nome.endswith(f"_empenhos{extensao}") for extensao in EXTENSOES)
+
+
+def sha_blob(caminho: Path) -> str:
+    """SHA que o Git daria ao arquivo local (``blob <tamanho>\\0<conteúdo>``)."""
+    h = hashlib.sha1(f"blob {caminho.stat().st_size}\0".encode())
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def ler_manifesto() -> dict:
+    """
+    Manifesto local. Arquivos que existem em ``data/`` mas ainda não estão
+    nele entram com o SHA calculado do próprio arquivo, para a primeira
+    sincronização não baixar de novo o que o deploy já trouxe.
+    """
+    try:
+        with open(MANIFESTO, encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifesto = {}
+
+    for arq in PASTA_DADOS.iterdir():
+        if _sincronizavel(arq.name) and arq.name not in manifesto:
+            manifesto[arq.name] = sha_blob(arq)
+
+    return {
+        nome: sha for nome, sha in manifesto.items()
+        if (PASTA_DADOS / nome).exists()
+    }
+
+
+def _gravar_manifesto(manifesto: dict):
+    temporario = MANIFESTO.with_suffix(".tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+    os.replace(temporario, MANIFESTO)
+
+
+def _baixar(nome: str, sha: str) -> int:
+    """Baixa para um temporário em ``data/`` e troca de uma vez (``os.replace``)."""
+    with tempfile.NamedTemporaryFile(dir=PASTA_DADOS, suffix=".parcial", delete=False) as tmp:
+        try:
+            tamanho = github_client.baixar_blob(sha, tmp)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    os.replace(tmp.name, PASTA_DADOS / nome)
+    return tamanho
+
+
+def sincronizar(progresso=None, recarregar: bool = True) -> list:
+    """
+    Traz para ``data/`` só os arquivos de empenhos cujo SHA no repositório
+    difere do manifesto local (downloads em paralelo) e apaga os que
+    saíram do repositório.
+
+    ``progresso(nome, feitos, total)`` é chamado na thread de quem chamou.
+    Com ``recarregar`` os anos alterados são repassados ao
+    ``data_loader`` (recarga só dessas partições). Devolve os nomes
+    alterados.
+    """
+    remoto = {
+        Path(caminho).name: sha
+        for caminho, sha in github_client.listar_arvore(PASTA_REPOSITORIO).items()
+        if _sincronizavel(Path(caminho).name)
+    }
+    manifesto = ler_manifesto()
+
+    baixar = {nome: sha for nome, sha in remoto.items() if manifesto.get(nome) != sha}
+    apagar = [nome for nome in manifesto if nome not in remoto]
+
+    try:
+        with ThreadPoolExecutor(max_workers=DOWNLOADS_PARALELOS) as executor:
+            futuros = {executor.submit(_baixar, nome, sha): nome for nome, sha in baixar.items()}
+            for feitos, futuro in enumerate(as_completed(futuros), start=1):
+                nome = futuros[futuro]
+                futuro.result()
+                manifesto[nome] = baixar[nome]
+                if progresso is not None:
+                    progresso(nome, feitos, len(futuros))
+
+        for nome in apagar:
+            (PASTA_DADOS / nome).unlink(missing_ok=True)
+            manifesto.pop(nome, None)
+    finally:
+        # O que já foi baixado fica registrado mesmo se outro download falhar
+        _gravar_manifesto(manifesto)
+
+    alterados = sorted([*baixar, *apagar])
+    if alterados and recarregar:
+        recarregar_particoes(alterados)
+    return alterados
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import github_client
+
+# ==========================
+# FILA DE ENVIOS AO GITHUB
+# ==========================
+# Uploads e exclusões rodam numa thread do processo, fora do script da
+# página: o admin pode fechar a aba ou a conexão cair sem perder o envio.
+# Cada tarefa tem um registro em disco que a página consulta.
+PASTA_TAREFAS = Path(".tarefas")
+
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+ATIVAS = (NA_FILA, EXECUTANDO)
+# Registros de tarefas terminadas guardados em disco (as mais antigas saem)
+MAX_TERMINADAS = 50
+
+# Um commit por vez: tarefas seguintes esperam na fila
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tarefas-github")
+_trava = threading.Lock()
+# Registros já lidos: {id: (versão do arquivo, tarefa)}; só relê o que mudou
+_lidas = {}
+_trava_lidas = threading.Lock()
+
+
+def _caminho(id_tarefa: str) -> Path:
+    return PASTA_TAREFAS / f"{id_tarefa}.json"
+
+
+def _gravar(tarefa: dict):
+    """Grava o registro de forma atômica (arquivo temporário + replace)."""
+    PASTA_TAREFAS.mkdir(exist_ok=True)
+    tarefa["atualizada_em"] = time.time()
+    temporario = _caminho(tarefa["id"]).with_suffix(".tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(tarefa, f, ensure_ascii=False)
+    os.replace(temporario, _caminho(tarefa["id"]))
+
+
+def _atualizar(tarefa: dict, **campos):
+    with _trava:
+        tarefa.update(campos)
+        _gravar(tarefa)
+
+
+def ler_tarefa(id_tarefa: str):
+    """Registro da tarefa (``None`` se não existir)."""
+    try:
+        with open(_caminho(id_tarefa), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def listar_tarefas(limite: int = 10) -> list:
+    """
+    Tarefas mais recentes primeiro. A cada consulta só os registros novos ou
+    alterados são lidos do disco; os demais vêm da memória.
+    """
+    try:
+        with os.scandir(PASTA_TAREFAS) as pasta:
+            entradas = [e for e in pasta if e.name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+
+    tarefas = []
+    with _trava_lidas:
+        vistas = set()
+        for entrada in entradas:
+            id_tarefa = entrada.name[:-len(".json")]
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            # _gravar troca o arquivo inteiro: inode novo a cada gravação
+            versao = (info.st_ino, info.st_mtime_ns)
+            vistas.add(id_tarefa)
+            lida = _lidas.get(id_tarefa)
+            if lida is None or lida[0] != versao:
+                lida = _lidas[id_tarefa] = (versao, ler_tarefa(id_tarefa))
+            if lida[1]:
+                tarefas.append(lida[1])
+        for id_tarefa in _lidas.keys() - vistas:
+            del _lidas[id_tarefa]
+
+    tarefas.sort(key=lambda t: t["criada_em"], reverse=True)
+    return tarefas[:limite]
+
+
+def _podar():
+    """Apaga os registros de tarefas terminadas além de ``MAX_TERMINADAS``."""
+    terminadas = [
+        t for t in listar_tarefas(limite=None) if t["status"] not in ATIVAS
+    ]
+    for tarefa in terminadas[MAX_TERMINADAS:]:
+        _caminho(tarefa["id"]).unlink(missing_ok=True)
+
+
+def existe_ativa() -> bool:
+    return any(t["status"] in ATIVAS for t in listar_tarefas())
+
+
+def _executar(tarefa: dict, arquivos: dict, remover: list, ao_concluir):
+    _atualizar(tarefa, status=EXECUTANDO, iniciada_em=time.time())
+
+    def progresso(caminho, feitos, total, enviados, segundos):
+        _atualizar(
+            tarefa,
+            bytes_enviados=enviados,
+            arquivos_enviados=feitos,
+            segundos=segundos
+        )
+
+    try:
+        commit = github_client.commit_arquivos(
+            arquivos, tarefa["mensagem"], remover=remover, progresso=progresso
+        )
+    except Exception as e:
+        _atualizar(tarefa, status=FALHOU, erro=str(e))
+        _podar()
+        return
+
+    _atualizar(
+        tarefa,
+        status=CONCLUIDA,
+        commit=commit["sha"],
+        bytes_enviados=tarefa["bytes_total"]
+    )
+
+    if ao_concluir is not None:
+        try:
+            ao_concluir(list(arquivos) + list(remover))
+        except Exception as e:
+            _atualizar(tarefa, erro=f"Commit feito, mas a recarga falhou: {e}")
+    _podar()
+
+
+def enviar(arquivos: dict, mensagem: str, remover=(), usuario=None, ao_concluir=None) -> str:
+    """
+    Coloca na fila um commit com ``arquivos`` ({caminho: bytes ou arquivo})
+    e remoções. Devolve o id da tarefa na hora; o envio acontece em
+    segundo plano.
+
+    ``ao_concluir(caminhos)`` roda na thread da tarefa depois do commit
+    (ex.: recarga só dos anos alterados).
+    """
+    tarefa = {
+        "id": uuid.uuid4().hex[:12],
+        "tipo": "upload" if arquivos else "exclusao",
+        "status": NA_FILA,
+        "mensagem": mensagem,
+        "usuario": usuario,
+        "arquivos": [caminho.removeprefix("data/") for caminho in arquivos],
+        "remover": [caminho.removeprefix("data/") for caminho in remover],
+        "bytes_total": sum(github_client.abrir_conteudo(c)[1] for c in arquivos.values()),
+        "bytes_enviados": 0,
+        "arquivos_enviados": 0,
+        "segundos": 0.0,
+        "commit": None,
+        "erro": None,
+        "criada_em": time.time(),
+    }
+    _atualizar(tarefa)
+    _executor.submit(_executar, tarefa, dict(arquivos), list(remover), ao_concluir)
+    return tarefa["id"]
+
+
+def _marcar_interrompidas():
+    """
+    Tarefas que estavam na fila/executando quando o processo anterior
+    terminou não vão mais andar: ficam como falhas, com o aviso de que o
+    commit pode ou não ter sido feito.
+    """
+    for tarefa in listar_tarefas(limite=None):
+        if tarefa["status"] in ATIVAS:
+            tarefa.update(
+                status=FALHOU,
+                erro="Interrompida pelo reinício do app: confira o histórico de commits"
+            )
+            _gravar(tarefa)
+    _podar()
+
+
+_marcar_interrompidas()
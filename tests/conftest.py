@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Os módulos do app ficam na raiz do repositório (sem pacote)
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from github_falso import GitHubFalso  # noqa: E402
+
+
+@pytest.fixture
+def github(monkeypatch):
+    """
+    ``github_client`` apontado para um ``GitHubFalso`` local, sem token e
+    sem esperas reais (as esperas pedidas ficam em ``github.esperas``).
+    """
+    import github_client
+
+    falso = GitHubFalso(github_client.REPO, github_client.BRANCH)
+    url = falso.iniciar()
+    falso.esperas = []
+
+    monkeypatch.setattr(github_client, "API_URL", url)
+    monkeypatch.setattr(github_client, "_sessao", None)
+    monkeypatch.setattr(github_client, "_token", lambda: None)
+    monkeypatch.setattr(github_client.time, "sleep", falso.esperas.append)
+    github_client.esquecer()
+
+    yield falso
+
+    github_client.esquecer()
+    falso.parar()
+
+
+# ==========================
+# BASE DE EMPENHOS EM data/ TEMPORÁRIA
+# ==========================
+LINHA_PADRAO = {
+    "anoEmpenho": "2025",
+    "nomeEntidade": "PREFEITURA",
+    "idCredor": "1",
+    "nomeCredor": "CREDOR A",
+    "numRecurso": "1.500.000.0000",
+    "especificacao": "",
+    "Descrição da despesa": "MANUTENÇÃO",
+    "numNaturezaEmp": "33901404000000",
+    "numNaturezaDesp": "33901400000000",
+    "numFuncao": "4",
+    "numSubfuncao": "122",
+    "numPrograma": "11",
+    "numAcao": "2.181",
+    "valorEmpenhadoBruto": "0,00",
+    "valorEmpenhadoAnulado": "0,00",
+    "saldoBaixado": "0",
+}
+
+
+def escrever_empenhos(pasta: Path, ano, linhas: list, extensao: str = ".csv") -> Path:
+    """Grava ``<ano>_empenhos.csv`` (separador ";", valores como nos CSVs reais)."""
+    linhas = [{**LINHA_PADRAO, "anoEmpenho": str(ano), **linha} for linha in linhas]
+    colunas = list(dict.fromkeys(coluna for linha in linhas for coluna in linha))
+    texto = ";".join(colunas) + "\n" + "".join(
+        ";".join(linha.get(coluna, "") for coluna in colunas) + "\n" for linha in linhas
+    )
+    caminho = pasta / f"{ano}_empenhos{extensao}"
+    caminho.write_text(texto, encoding="utf-8")
+    return caminho
+
+
+@pytest.fixture
+def dados(tmp_path, monkeypatch):
+    """``data_loader`` lendo de uma ``data/`` vazia, sem cargas nem caches anteriores."""
+    import streamlit as st
+
+    import data_loader
+
+    pasta = tmp_path / "data"
+    pasta.mkdir()
+    monkeypatch.setattr(data_loader, "PASTA_DADOS", pasta)
+
+    def limpar():
+        with data_loader._trava:
+            for futuro in data_loader._cargas.values():
+                futuro.cancel()
+            data_loader._cargas.clear()
+        data_loader._particoes.clear()
+        st.cache_data.clear()
+
+    limpar()
+    yield pasta
+    limpar()
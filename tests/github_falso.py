@@ -0,0 +1,259 @@
+"""
+GitHub falso para os testes: ``http.server`` local com a API de conteúdo
+e a Git Data API (blobs, árvores, commits e refs) de um único branch.
+
+O estado é um dicionário plano ``{caminho: bytes}`` por commit; as árvores
+são montadas a cada commit. ``falhas`` injeta respostas de erro antes do
+tratamento normal.
+"""
+import base64
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def sha_blob(conteudo: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(conteudo) + conteudo).hexdigest()
+
+
+def _sha_objeto(dados) -> str:
+    return hashlib.sha1(json.dumps(dados, sort_keys=True).encode()).hexdigest()
+
+
+class GitHubFalso:
+    def __init__(self, repo: str, branch: str, arquivos: dict | None = None):
+        self.repo = repo
+        self.branch = branch
+        self.blobs = {}
+        self.arvores = {}   # sha -> [{"path", "type", "sha", "mode"}]
+        self.planos = {}    # sha da árvore raiz -> {caminho: sha do blob}
+        self.commits = {}   # sha -> {"tree", "parents", "message"}
+        self.requisicoes = []
+        self.arvores_pedidas = []  # (ref, recursiva) de cada GET de árvore
+        self.corpos = []    # (caminho, cabeçalhos, tamanho) dos POST/PUT recebidos
+        # [(metodo, prefixo do caminho, status, cabeçalhos)] consumidas na ordem
+        self.falhas = []
+        # Chamado antes de atualizar a ref (simula outro commit no meio)
+        self.antes_da_ref = None
+        # Acima disto a API de conteúdo manda só o download_url (como a real)
+        self.limite_base64 = 1024 * 1024
+        self.url = None
+        self._trava = threading.Lock()
+
+        plano = {caminho: self._guardar_blob(conteudo) for caminho, conteudo in (arquivos or {}).items()}
+        self.head = self._novo_commit(self._montar_arvore(plano), [], "inicial")
+
+    # ----- objetos -----
+    def _guardar_blob(self, conteudo: bytes) -> str:
+        sha = sha_blob(conteudo)
+        self.blobs[sha] = conteudo
+        return sha
+
+    def _montar_arvore(self, plano: dict) -> str:
+        filhos = {}
+        entradas = []
+        for caminho, sha in plano.items():
+            if "/" in caminho:
+                pasta, resto = caminho.split("/", 1)
+                filhos.setdefault(pasta, {})[resto] = sha
+            else:
+                entradas.append({"path": caminho, "type": "blob", "sha": sha, "mode": "100644"})
+        for pasta, sub in filhos.items():
+            entradas.append({"path": pasta, "type": "tree", "sha": self._montar_arvore(sub), "mode": "040000"})
+        entradas.sort(key=lambda e: e["path"])
+        sha = _sha_objeto(entradas)
+        self.arvores[sha] = entradas
+        self.planos.setdefault(sha, dict(plano))
+        return sha
+
+    def _novo_commit(self, arvore: str, pais: list, mensagem: str) -> str:
+        dados = {"tree": arvore, "parents": pais, "message": mensagem}
+        sha = _sha_objeto({**dados, "n": len(self.commits)})
+        self.commits[sha] = dados
+        return sha
+
+    def arquivos(self) -> dict:
+        """Conteúdo atual do branch: ``{caminho: bytes}``."""
+        plano = self.planos[self.commits[self.head]["tree"]]
+        return {caminho: self.blobs[sha] for caminho, sha in plano.items()}
+
+    def commitar(self, alteracoes: dict, mensagem: str = "outro commit"):
+        """Commit direto no branch (``None`` remove), como outro cliente faria."""
+        with self._trava:
+            plano = dict(self.planos[self.commits[self.head]["tree"]])
+            for caminho, conteudo in alteracoes.items():
+                if conteudo is None:
+                    plano.pop(caminho, None)
+                else:
+                    plano[caminho] = self._guardar_blob(conteudo)
+            self.head = self._novo_commit(self._montar_arvore(plano), [self.head], mensagem)
+
+    def contar(self, metodo: str, trecho: str) -> int:
+        return sum(1 for m, caminho, _ in self.requisicoes if m == metodo and trecho in caminho)
+
+    # ----- servidor -----
+    def iniciar(self) -> str:
+        falso = self
+
+        class Tratador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _atender(self):
+                url = urlparse(self.path)
+                tamanho = int(self.headers.get("Content-Length") or 0)
+                corpo = self.rfile.read(tamanho) if tamanho else b""
+                cabecalhos = dict(self.headers)
+                falso.requisicoes.append((self.command, url.path, cabecalhos))
+                if corpo:
+                    falso.corpos.append((url.path, cabecalhos, len(corpo)))
+                with falso._trava:
+                    status, dados, extras = falso.responder(
+                        self.command, url.path, parse_qs(url.query), cabecalhos, corpo
+                    )
+                if isinstance(dados, bytes):
+                    saida = dados
+                else:
+                    saida = b"" if dados is None else json.dumps(dados).encode()
+                self.send_response(status)
+                for nome, valor in extras.items():
+                    self.send_header(nome, valor)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(saida)))
+                self.end_headers()
+                self.wfile.write(saida)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _atender
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Tratador)
+        threading.Thread(
+            target=self.servidor.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self.servidor.server_address[1]}"
+        return self.url
+
+    def parar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def responder(self, metodo, caminho, params, cabecalhos, corpo):
+        for i, (m, prefixo, status, extras) in enumerate(self.falhas):
+            if m == metodo and caminho.startswith(prefixo):
+                del self.falhas[i]
+                return status, {"message": "falha injetada"}, extras
+
+        if caminho.startswith("/bruto/"):
+            return 200, self.blobs[caminho[len("/bruto/"):]], {}
+        base = f"/repos/{self.repo}"
+        if caminho.startswith(f"{base}/contents/"):
+            return self._conteudo(metodo, caminho[len(f"{base}/contents/"):], cabecalhos, corpo)
+        if caminho.startswith(f"{base}/git/"):
+            return self._git(metodo, caminho[len(f"{base}/git/"):], params, corpo)
+        return 404, {"message": "Not Found"}, {}
+
+    def _conteudo(self, metodo, arquivo, cabecalhos, corpo):
+        atuais = self.arquivos()
+        if metodo == "GET":
+            if arquivo not in atuais:
+                return 404, {"message": "Not Found"}, {}
+            sha = sha_blob(atuais[arquivo])
+            etag = f'"{sha}"'
+            if cabecalhos.get("If-None-Match") == etag:
+                return 304, None, {"ETag": etag}
+            if len(atuais[arquivo]) > self.limite_base64:
+                return 200, {
+                    "sha": sha,
+                    "encoding": "none",
+                    "content": "",
+                    "download_url": f"{self.url}/bruto/{sha}",
+                }, {"ETag": etag}
+            return 200, {
+                "sha": sha,
+                "encoding": "base64",
+                "content": base64.b64encode(atuais[arquivo]).decode(),
+            }, {"ETag": etag}
+
+        if metodo == "PUT":
+            dados = json.loads(corpo)
+            atual = sha_blob(atuais[arquivo]) if arquivo in atuais else None
+            if dados.get("sha") != atual:
+                return 409, {"message": "sha desatualizado"}, {}
+            conteudo = base64.b64decode(dados["content"])
+            plano = dict(self.planos[self.commits[self.head]["tree"]])
+            plano[arquivo] = self._guardar_blob(conteudo)
+            self.head = self._novo_commit(self._montar_arvore(plano), [self.head], dados["message"])
+            return (200 if atual else 201), {"content": {"sha": sha_blob(conteudo)}}, {}
+
+        return 405, {"message": "Method Not Allowed"}, {}
+
+    def _git(self, metodo, recurso, params, corpo):
+        if metodo == "POST" and recurso == "blobs":
+            dados = json.loads(corpo)
+            return 201, {"sha": self._guardar_blob(base64.b64decode(dados["content"]))}, {}
+
+        if metodo == "GET" and recurso.startswith("blobs/"):
+            conteudo = self.blobs.get(recurso.split("/", 1)[1])
+            if conteudo is None:
+                return 404, {"message": "Not Found"}, {}
+            return 200, conteudo, {}
+
+        if metodo == "GET" and recurso == f"ref/heads/{self.branch}":
+            return 200, {"object": {"sha": self.head}}, {}
+
+        if metodo == "GET" and recurso.startswith("commits/"):
+            commit = self.commits.get(recurso.split("/", 1)[1])
+            if commit is None:
+                return 404, {"message": "Not Found"}, {}
+            return 200, {"tree": {"sha": commit["tree"]}}, {}
+
+        if metodo == "GET" and recurso.startswith("trees/"):
+            ref = recurso.split("/", 1)[1]
+            if ref == self.branch:
+                ref = self.commits[self.head]["tree"]
+            if ref not in self.arvores:
+                return 404, {"message": "Not Found"}, {}
+            recursiva = params.get("recursive") == ["1"]
+            self.arvores_pedidas.append((ref, recursiva))
+            return 200, {"sha": ref, "tree": self._listar(ref, recursiva), "truncated": False}, {}
+
+        if metodo == "POST" and recurso == "trees":
+            dados = json.loads(corpo)
+            plano = dict(self.planos[dados["base_tree"]])
+            for entrada in dados["tree"]:
+                if entrada["sha"] is None:
+                    plano.pop(entrada["path"], None)
+                else:
+                    plano[entrada["path"]] = entrada["sha"]
+            return 201, {"sha": self._montar_arvore(plano)}, {}
+
+        if metodo == "POST" and recurso == "commits":
+            dados = json.loads(corpo)
+            return 201, {"sha": self._novo_commit(dados["tree"], dados["parents"], dados["message"])}, {}
+
+        if metodo == "PATCH" and recurso == f"refs/heads/{self.branch}":
+            if self.antes_da_ref is not None:
+                antes, self.antes_da_ref = self.antes_da_ref, None
+                self._trava.release()
+                try:
+                    antes()
+                finally:
+                    self._trava.acquire()
+            dados = json.loads(corpo)
+            if self.commits[dados["sha"]]["parents"] != [self.head]:
+                return 422, {"message": "Update is not a fast forward"}, {}
+            self.head = dados["sha"]
+            return 200, {"object": {"sha": self.head}}, {}
+
+        return 404, {"message": "Not Found"}, {}
+
+    def _listar(self, sha: str, recursiva: bool, prefixo: str = "") -> list:
+        itens = []
+        for entrada in self.arvores[sha]:
+            itens.append({**entrada, "path": prefixo + entrada["path"]})
+            if recursiva and entrada["type"] == "tree":
+                itens.extend(self._listar(entrada["sha"], True, prefixo + entrada["path"] + "/"))
+        return itens
@@ -0,0 +1,113 @@
+import sys
+import threading
+import time
+
+import aquecimento
+import data_loader
+from conftest import escrever_empenhos
+
+
+def test_mesma_versao_reaproveita_a_carga(dados):
+    escrever_empenhos(dados, 2025, [{"valorEmpenhadoBruto": "1,00"}])
+
+    futuro = data_loader.aquecer()
+    assert data_loader.aquecer() is futuro
+    df, ilegiveis = futuro.result(timeout=30)
+
+    assert len(df) == 1
+    assert ilegiveis == []
+    # As páginas recebem o mesmo objeto já carregado
+    assert data_loader.load_empenhos_tratados() is df
+
+
+def test_versao_nova_dispara_outra_carga(dados):
+    escrever_empenhos(dados, 2025, [{}])
+    antiga = data_loader.aquecer()
+    antiga.result(timeout=30)
+
+    escrever_empenhos(dados, 2026, [{}, {}])
+    nova = data_loader.aquecer()
+
+    assert nova is not antiga
+    assert len(nova.result(timeout=30)[0]) == 3
+    assert list(data_loader._cargas.values()) == [nova]
+
+
+def test_carga_que_falhou_e_refeita(dados, monkeypatch):
+    escrever_empenhos(dados, 2025, [{}])
+    preparar = data_loader._preparar_base
+    tentativas = []
+
+    def falhar_na_primeira():
+        tentativas.append(1)
+        if len(tentativas) == 1:
+            raise OSError("disco indisponível")
+        return preparar()
+
+    monkeypatch.setattr(data_loader, "_preparar_base", falhar_na_primeira)
+    falhou = data_loader.aquecer()
+    assert isinstance(falhou.exception(timeout=30), OSError)
+
+    refeita = data_loader.aquecer()
+    assert refeita is not falhou
+    assert len(refeita.result(timeout=30)[0]) == 1
+
+
+def test_arquivo_ilegivel_vira_aviso(dados):
+    escrever_empenhos(dados, 2025, [{}])
+    (dados / "2026_empenhos.parquet").write_bytes(b"isto nao e parquet")
+
+    df, ilegiveis = data_loader.aquecer().result(timeout=30)
+
+    assert ilegiveis == ["2026_empenhos.parquet"]
+    assert df["anoEmpenho"].unique().tolist() == ["2025"]
+
+
+def test_segundo_plano_com_data_loader_ja_importado_chama_direto(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(data_loader, "aquecer", lambda: chamadas.append(1))
+    thread = aquecimento._thread
+
+    aquecimento.aquecer_em_segundo_plano()
+
+    # Sem thread nova: a importação já aconteceu
+    assert chamadas == [1]
+    assert aquecimento._thread is thread
+
+
+def test_carga_trocada_antes_de_comecar_entrega_a_nova(dados):
+    escrever_empenhos(dados, 2025, [{}])
+    # Segura a fila: a carga da versão atual fica esperando para começar
+    liberar = threading.Event()
+    data_loader._executor.submit(liberar.wait)
+    antiga = data_loader.aquecer()
+
+    resultado = []
+    sessao = threading.Thread(target=lambda: resultado.append(data_loader.load_empenhos_tratados()))
+    sessao.start()
+    time.sleep(0.1)
+
+    # Upload no meio: a carga antiga é cancelada e a sessão recebe a nova
+    escrever_empenhos(dados, 2026, [{}, {}])
+    nova = data_loader.aquecer()
+    liberar.set()
+    sessao.join(timeout=30)
+
+    assert antiga.cancelled()
+    assert len(resultado[0]) == 3
+    assert resultado[0] is nova.result()[0]
+
+
+def test_main_aquece_antes_de_subir_o_streamlit(dados, monkeypatch):
+    from streamlit.web import cli
+
+    escrever_empenhos(dados, 2025, [{}])
+    subiu = []
+    monkeypatch.setattr(cli, "main", lambda: subiu.append((list(sys.argv), dict(data_loader._cargas))))
+    monkeypatch.setattr(sys, "argv", ["aquecimento"])
+
+    aquecimento.main(["--server.port", "8600"])
+
+    (argv, cargas), = subiu
+    assert argv == ["streamlit", "run", "Inicio.py", "--server.port", "8600"]
+    assert list(cargas) == [data_loader.versao_dataset()]
@@ -0,0 +1,62 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import tarefas
+from conftest import RAIZ
+
+PAGINA = str(RAIZ / "pages" / "18_Atualizar_CSV.py")
+
+
+@pytest.fixture
+def enviados(tmp_path, monkeypatch):
+    """Tarefas que a página colocaria na fila (sem rodar o commit)."""
+    monkeypatch.setattr(tarefas, "PASTA_TAREFAS", tmp_path / ".tarefas")
+    monkeypatch.setattr(tarefas, "_lidas", {})
+    fila = []
+    monkeypatch.setattr(
+        tarefas, "enviar", lambda arquivos, mensagem, remover=(), **_: fila.append(list(remover))
+    )
+    return fila
+
+
+def _excluir(nome: str) -> AppTest:
+    app = AppTest.from_file(PAGINA, default_timeout=30)
+    app.session_state["autenticado"] = True
+    app.session_state["usuario"] = "admin"
+    app.session_state["perfil"] = "ADMIN"
+    app.run()
+    app.text_input[0].input(nome)
+    app.button[0].click()
+    return app.run()
+
+
+def test_exclusao_remove_os_formatos_que_estao_no_github(github, enviados):
+    # A cópia local de data/ não importa: vale o que está no repositório
+    github.commitar({
+        "data/2024_empenhos.parquet": b"p",
+        "data/2024_empenhos.csv.gz": b"gz",
+        "data/2023_empenhos.csv": b"c",
+    })
+
+    app = _excluir("2024_empenhos.csv")
+
+    assert not app.exception
+    assert enviados == [["data/2024_empenhos.parquet", "data/2024_empenhos.csv.gz"]]
+
+
+def test_exclusao_de_ano_ausente_no_github_e_erro(github, enviados):
+    github.commitar({"data/2023_empenhos.csv": b"c"})
+
+    app = _excluir("2024_empenhos.csv")
+
+    assert "não está no GitHub" in app.error[0].value
+    assert enviados == []
+
+
+@pytest.mark.parametrize("nome", ["../usuarios.json", "usuarios.json", "24_empenhos.csv"])
+def test_nome_invalido_nao_vai_para_a_fila(github, enviados, nome):
+    app = _excluir(nome)
+
+    assert "Nome inválido" in app.error[0].value
+    assert enviados == []
+    assert github.contar("GET", "/git/") == 0
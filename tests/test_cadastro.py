@@ -0,0 +1,192 @@
+import threading
+
+import pytest
+
+from cadastro import Cadastro, Conflito, OrigemArquivo, OrigemSQLite, alterar_juntos
+
+
+@pytest.fixture(params=["sqlite", "arquivo"])
+def nova_origem(request, tmp_path):
+    """Fábrica de origens que apontam para o mesmo cadastro."""
+    if request.param == "sqlite":
+        return lambda: OrigemSQLite(tmp_path / "cadastros.db", "usuarios")
+    return lambda: OrigemArquivo(tmp_path / "usuarios.json")
+
+
+class _Intrometida:
+    """Origem que roda ``antes()`` uma vez entre a leitura e a gravação."""
+
+    def __init__(self, origem, antes):
+        self.origem = origem
+        self.antes = antes
+        self.gravacoes = 0
+
+    def versao(self):
+        return self.origem.versao()
+
+    def ler(self):
+        return self.origem.ler()
+
+    def gravar(self, dados, versao, mensagem):
+        self.gravacoes += 1
+        if self.antes is not None:
+            antes, self.antes = self.antes, None
+            antes()
+        return self.origem.gravar(dados, versao, mensagem)
+
+
+def test_versao_desatualizada_e_conflito(nova_origem):
+    origem = nova_origem()
+    _, versao = origem.ler()
+    origem.gravar({"a": {}}, versao, "cria")
+
+    with pytest.raises(Conflito):
+        origem.gravar({"b": {}}, versao, "versão velha")
+    assert origem.ler()[0] == {"a": {}}
+
+
+def test_conflito_relê_e_reaplica(nova_origem):
+    outro = Cadastro(nova_origem())
+    outro.atualizar("ana", {"perfil": "usuario"}, "cria ana")
+
+    origem = _Intrometida(
+        nova_origem(),
+        lambda: outro.atualizar("bia", {"perfil": "admin"}, "outro admin")
+    )
+    cadastro = Cadastro(origem)
+    cadastro.atualizar("ana", {"perfil": "admin"}, "promove ana")
+
+    # A primeira gravação conflitou; a segunda reaplicou sobre os dados novos
+    assert origem.gravacoes == 2
+    assert Cadastro(nova_origem()).todos() == {
+        "ana": {"perfil": "admin"},
+        "bia": {"perfil": "admin"},
+    }
+
+
+def test_conflito_persistente_desiste(nova_origem, monkeypatch):
+    monkeypatch.setattr("cadastro.TENTATIVAS_CONFLITO", 2)
+    outro = Cadastro(nova_origem())
+    cadastro = Cadastro(nova_origem())
+
+    class SempreIntrometida(_Intrometida):
+        def gravar(self, dados, versao, mensagem):
+            self.antes = lambda: outro.atualizar(f"x{self.gravacoes}", {}, "outro")
+            return super().gravar(dados, versao, mensagem)
+
+    cadastro.origem = SempreIntrometida(cadastro.origem, None)
+    with pytest.raises(Conflito):
+        cadastro.atualizar("ana", {}, "nunca passa")
+    assert cadastro.origem.gravacoes == 2
+
+
+def test_inserir_so_cria_se_nao_existir(nova_origem):
+    cadastro = Cadastro(nova_origem())
+    assert cadastro.inserir("ana", {"status": "pendente"}, "pede")
+    assert not cadastro.inserir("ana", {"status": "outro"}, "pede de novo")
+    assert cadastro.obter("ana") == {"status": "pendente"}
+
+
+def test_indice_acompanha_gravacao_de_outra_instancia(nova_origem):
+    leitor = Cadastro(nova_origem())
+    assert leitor.todos() == {}
+
+    Cadastro(nova_origem()).atualizar("ana", {"perfil": "usuario"}, "cria")
+    assert leitor.obter("ana") == {"perfil": "usuario"}
+
+    Cadastro(nova_origem()).remover("ana", "remove")
+    assert leitor.obter("ana") is None
+
+
+def test_gravacoes_concorrentes_nao_perdem_registros(nova_origem, tmp_path):
+    # Duas instâncias (como duas sessões) gravando no mesmo cadastro
+    cadastros = [Cadastro(nova_origem()), Cadastro(nova_origem())]
+    falhas = []
+
+    def inserir(indice):
+        try:
+            for i in range(30):
+                cadastros[indice].inserir(f"u{indice}-{i}", {"i": i}, "insere")
+        except Exception as e:
+            falhas.append(e)
+
+    # Conflitos são esperados aqui: cada um relê e reaplica
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("cadastro.TENTATIVAS_CONFLITO", 1000)
+        threads = [threading.Thread(target=inserir, args=(i,)) for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert falhas == []
+    assert len(Cadastro(nova_origem()).todos()) == 60
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_alterar_juntos_fora_do_github_grava_cada_um(tmp_path):
+    usuarios = Cadastro(OrigemSQLite(tmp_path / "c.db", "usuarios"))
+    solicitacoes = Cadastro(OrigemArquivo(tmp_path / "solicitacoes.json"))
+    solicitacoes.inserir("ana", {"status": "pendente"}, "pede")
+
+    alterar_juntos({
+        usuarios: {"ana": lambda atual: {"perfil": "usuario"}},
+        solicitacoes: {"ana": lambda atual: {**atual, "status": "aprovado"}},
+    }, "aprova ana")
+
+    assert usuarios.obter("ana") == {"perfil": "usuario"}
+    assert solicitacoes.obter("ana") == {"status": "aprovado"}
+
+
+# ==========================
+# VÁRIOS CADASTROS NO GITHUB (um commit)
+# ==========================
+def _cadastros_github():
+    from cadastro import ARQUIVO_SOLICITACOES, ARQUIVO_USUARIOS, OrigemGitHub
+    return Cadastro(OrigemGitHub(ARQUIVO_USUARIOS)), Cadastro(OrigemGitHub(ARQUIVO_SOLICITACOES))
+
+
+def test_alterar_juntos_no_github_faz_um_commit(github):
+    github.commitar({
+        "data/usuarios.json": b'{"admin": {"perfil": "ADMIN"}}',
+        "data/solicitacoes.json": b'{"ana": {"status": "pendente", "senha": "x"}}',
+    })
+    usuarios, solicitacoes = _cadastros_github()
+    commits_antes = len(github.commits)
+
+    alterar_juntos({
+        usuarios: {"ana": lambda atual: {"perfil": "USER", "status": "ativo"}},
+        solicitacoes: {"ana": lambda atual: {**atual, "status": "aprovado"}},
+    }, "aprova ana")
+
+    assert len(github.commits) == commits_antes + 1
+    assert usuarios.todos() == {"admin": {"perfil": "ADMIN"}, "ana": {"perfil": "USER", "status": "ativo"}}
+    assert solicitacoes.obter("ana")["status"] == "aprovado"
+
+
+def test_alterar_juntos_no_github_reaplica_apos_conflito(github):
+    import json
+
+    github.commitar({"data/usuarios.json": b"{}", "data/solicitacoes.json": b"{}"})
+    usuarios, solicitacoes = _cadastros_github()
+    outro = {"bia": {"perfil": "USER"}}
+    # Outro admin grava depois da leitura e antes do commit
+    original = github.responder
+    intrometeu = []
+
+    def responder(metodo, caminho, *args):
+        if metodo == "GET" and "/git/ref/heads/" in caminho and not intrometeu:
+            intrometeu.append(True)
+            plano = dict(github.planos[github.commits[github.head]["tree"]])
+            plano["data/usuarios.json"] = github._guardar_blob(json.dumps(outro).encode())
+            github.head = github._novo_commit(github._montar_arvore(plano), [github.head], "outro")
+        return original(metodo, caminho, *args)
+
+    github.responder = responder
+
+    alterar_juntos({usuarios: {"ana": lambda atual: {"perfil": "USER"}}}, "aprova ana")
+
+    assert json.loads(github.arquivos()["data/usuarios.json"]) == {
+        "bia": {"perfil": "USER"},
+        "ana": {"perfil": "USER"},
+    }
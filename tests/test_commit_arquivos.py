@@ -0,0 +1,192 @@
+import base64
+import io
+import json
+
+import pytest
+
+import github_client
+from github_falso import sha_blob
+
+
+def test_varios_arquivos_em_um_commit(github):
+    github.commitar({"data/2024_empenhos.csv": b"velho", "data/2023_empenhos.csv": b"sai"})
+    antes = github.head
+    progresso = []
+
+    commit = github_client.commit_arquivos(
+        {"data/2024_empenhos.csv": b"novo", "data/2025_empenhos.csv": io.BytesIO(b"ano novo")},
+        "Atualiza CSVs",
+        remover=["data/2023_empenhos.csv"],
+        progresso=lambda *args: progresso.append(args)
+    )
+
+    assert github.head == commit["sha"]
+    assert github.commits[commit["sha"]]["parents"] == [antes]
+    assert github.arquivos() == {
+        "data/2024_empenhos.csv": b"novo",
+        "data/2025_empenhos.csv": b"ano novo",
+    }
+    # Fluxo blob -> árvore -> commit -> ref, um commit só
+    assert github.contar("POST", "/git/blobs") == 2
+    assert github.contar("POST", "/git/trees") == 1
+    assert github.contar("POST", "/git/commits") == 1
+    assert github.contar("PATCH", "/git/refs/heads/") == 1
+    assert [feitos for _, feitos, *_ in progresso] == [1, 2]
+    assert progresso[-1][3] == len(b"novo") + len(b"ano novo")
+    # O SHA dos blobs fica guardado para a próxima gravação
+    assert github_client.sha_arquivo("data/2024_empenhos.csv") == sha_blob(b"novo")
+
+
+def test_branch_que_andou_refaz_arvore_e_commit(github):
+    github.commitar({"data/a.csv": b"a"})
+    github.antes_da_ref = lambda: github.commitar({"data/b.csv": b"outro"})
+
+    github_client.commit_arquivos({"data/a.csv": b"a2"}, "grava")
+
+    # O commit concorrente não se perde e os blobs não são reenviados
+    assert github.arquivos() == {"data/a.csv": b"a2", "data/b.csv": b"outro"}
+    assert github.contar("POST", "/git/blobs") == 1
+    assert github.contar("PATCH", "/git/refs/heads/") == 2
+
+
+def test_esperados_desatualizados_levantam_409(github):
+    github.commitar({"data/usuarios.json": b"{}", "data/solicitacoes.json": b"{}"})
+    lidos = {
+        "data/usuarios.json": sha_blob(b"{}"),
+        "data/solicitacoes.json": sha_blob(b"{}"),
+    }
+    github.commitar({"data/usuarios.json": b'{"outro": {}}'})
+    topo = github.head
+
+    with pytest.raises(github_client.ErroGitHub) as erro:
+        github_client.commit_arquivos(
+            {"data/usuarios.json": b"{1}", "data/solicitacoes.json": b"{2}"},
+            "grava",
+            esperados=lidos
+        )
+
+    assert erro.value.status == 409
+    assert "data/usuarios.json" in str(erro.value)
+    assert github.head == topo
+    assert github.contar("PATCH", "/git/refs/heads/") == 0
+
+
+def test_esperado_none_exige_arquivo_novo(github):
+    github.commitar({"data/usuarios.json": b"{}"})
+
+    with pytest.raises(github_client.ErroGitHub):
+        github_client.commit_arquivos(
+            {"data/usuarios.json": b"{}"}, "cria", esperados={"data/usuarios.json": None}
+        )
+
+    github_client.commit_arquivos(
+        {"data/solicitacoes.json": b"{}"}, "cria", esperados={"data/solicitacoes.json": None}
+    )
+    assert github.arquivos()["data/solicitacoes.json"] == b"{}"
+
+
+# ==========================
+# CORPO EM STREAMING
+# ==========================
+def test_blob_vai_em_streaming_com_content_length(github, monkeypatch):
+    monkeypatch.setattr(github_client, "BLOCO_ENVIO", 3 * 1024)
+    conteudo = bytes(range(256)) * 200  # vários blocos, tamanho não múltiplo de 3
+
+    sha = github_client.criar_blob(io.BytesIO(conteudo))
+
+    assert sha == sha_blob(conteudo)
+    assert github.blobs[sha] == conteudo
+    (caminho, cabecalhos, tamanho), = github.corpos
+    assert cabecalhos["Content-Length"] == str(tamanho)
+    assert "Transfer-Encoding" not in cabecalhos
+
+
+def test_corpo_base64_so_guarda_um_bloco(monkeypatch):
+    monkeypatch.setattr(github_client, "BLOCO_ENVIO", 3 * 64)
+    conteudo = bytes(range(256)) * 40 + b"x"
+    corpo = github_client._CorpoBase64(io.BytesIO(conteudo), len(conteudo), {"encoding": "base64"})
+
+    partes, maior_buffer = [], 0
+    while parte := corpo.read(100):
+        partes.append(parte)
+        maior_buffer = max(maior_buffer, len(corpo._buffer))
+
+    texto = b"".join(partes)
+    assert len(texto) == len(corpo)
+    assert json.loads(texto) == {
+        "encoding": "base64",
+        "content": base64.b64encode(conteudo).decode(),
+    }
+    # Nunca mais que um bloco em base64 (mais o pedaço lido) em memória
+    assert maior_buffer <= 4 * github_client.BLOCO_ENVIO // 3 + 100
+    assert corpo.enviados == len(conteudo)
+
+    # Nova tentativa relê do início
+    corpo.seek(0)
+    assert corpo.read() == texto
+
+
+# ==========================
+# LISTAGEM DA ÁRVORE
+# ==========================
+def test_conferencia_de_esperados_so_lista_as_pastas_envolvidas(github):
+    github.commitar({
+        "data/usuarios.json": b"{}",
+        "data/2024_empenhos.csv": b"x",
+        "assets/logo.png": b"png",
+        "pages/1.py": b"",
+    })
+
+    github_client.commit_arquivos(
+        {"data/usuarios.json": b"[]"},
+        "grava",
+        esperados={"data/usuarios.json": sha_blob(b"{}")}
+    )
+
+    # Raiz e data/, sem recursão (nada de listar o repositório inteiro)
+    assert len(github.arvores_pedidas) == 2
+    assert not any(recursiva for _, recursiva in github.arvores_pedidas)
+
+
+def test_listar_arvore_so_da_pasta(github):
+    github.commitar({
+        "data/a.csv": b"a",
+        "data/sub/b.csv": b"b",
+        "assets/logo.png": b"png",
+    })
+
+    assert github_client.listar_arvore("data") == {
+        "data/a.csv": sha_blob(b"a"),
+        "data/sub/b.csv": sha_blob(b"b"),
+    }
+    assert github_client.listar_arvore("data", recursiva=False) == {"data/a.csv": sha_blob(b"a")}
+    assert github_client.listar_arvore("nao_existe") == {}
+
+
+# ==========================
+# ARQUIVOS GRANDES NA API DE CONTEÚDO
+# ==========================
+def test_arquivo_grande_vai_pela_git_data_api(github, monkeypatch):
+    monkeypatch.setattr(github_client, "LIMITE_CONTENTS_API", 10)
+    github.commitar({"data/2024_empenhos.csv": b"velho"})
+    conteudo = b"x" * 11
+
+    resposta = github_client.salvar_arquivo("data/2024_empenhos.csv", io.BytesIO(conteudo), "grande")
+
+    assert resposta["content"]["sha"] == sha_blob(conteudo)
+    assert github.arquivos()["data/2024_empenhos.csv"] == conteudo
+    assert github.contar("PUT", "/contents/") == 0
+    assert github.contar("POST", "/git/blobs") == 1
+
+
+def test_arquivo_grande_respeita_o_sha_informado(github, monkeypatch):
+    monkeypatch.setattr(github_client, "LIMITE_CONTENTS_API", 10)
+    github.commitar({"data/a.csv": b"velho"})
+
+    with pytest.raises(github_client.ErroGitHub) as erro:
+        github_client.salvar_arquivo("data/a.csv", b"y" * 11, "grande", sha=sha_blob(b"outro"))
+    assert erro.value.status == 409
+
+    with pytest.raises(github_client.ErroGitHub):
+        github_client.salvar_arquivo("data/a.csv", b"y" * 11, "não pode existir", sha="")
+    assert github.arquivos()["data/a.csv"] == b"velho"
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import RAIZ, escrever_empenhos
+from data_loader import NAO_INFORMADO, decompor_classificacoes
+
+PAGINA = str(RAIZ / "pages" / "16_Consulta_Funcional.py")
+
+
+def test_codigos_funcionais_ganham_zeros_a_esquerda():
+    df = decompor_classificacoes(pd.DataFrame({
+        "numFuncao": ["4", "10", "123"],
+        "numSubfuncao": ["122", "31", ""],
+        "numPrograma": ["11", "1001", "abc"],
+        "numAcao": ["2.181", "1.005", "2181"],
+    }))
+
+    assert df["codFuncao"].tolist() == ["04", "10", NAO_INFORMADO]
+    assert df["codSubfuncao"].tolist() == ["122", "031", NAO_INFORMADO]
+    assert df["codPrograma"].tolist() == ["0011", "1001", NAO_INFORMADO]
+    assert df["codAcao"].tolist() == ["2.181", "1.005", NAO_INFORMADO]
+
+
+@pytest.fixture
+def pagina(dados):
+    escrever_empenhos(dados, 2025, [
+        {"numFuncao": "4", "numSubfuncao": "122", "valorEmpenhadoBruto": "100,00",
+         "Descrição da despesa": "MANUTENÇÃO DA SEGOV"},
+        {"numFuncao": "10", "numSubfuncao": "301", "numPrograma": "20", "numAcao": "2.300",
+         "valorEmpenhadoBruto": "50,00", "Descrição da despesa": "ATENÇÃO BÁSICA"},
+    ])
+    app = AppTest.from_file(PAGINA, default_timeout=30)
+    app.session_state["autenticado"] = True
+    app.session_state["usuario"] = "ana"
+    app.session_state["perfil"] = "USER"
+    return app.run()
+
+
+def _linhas_tabela(app):
+    return app.dataframe[0].value.index.tolist()
+
+
+def test_pagina_abre_na_funcao_com_descricoes(pagina):
+    assert not pagina.exception
+    assert pagina.metric[0].value == "R$ 150,00"
+    assert _linhas_tabela(pagina) == ["04 – Administração", "10 – Saúde"]
+    assert "Todos os níveis" in pagina.caption[1].value
+
+
+def test_descer_e_voltar_um_nivel(pagina):
+    pagina.selectbox[0].select("10 – Saúde").run()
+
+    assert not pagina.exception
+    assert _linhas_tabela(pagina) == ["301 – Atenção Básica"]
+    assert "10 – Saúde" in pagina.caption[1].value
+    # O seletor volta ao vazio para a próxima escolha
+    assert pagina.selectbox[0].value == "—"
+
+    pagina.selectbox[0].select("301 – Atenção Básica").run()
+    pagina.selectbox[0].select("0020").run()
+    assert _linhas_tabela(pagina) == ["2.300 – ATENÇÃO BÁSICA"]
+
+    pagina.button(key="voltar_funcional").click().run()
+    assert _linhas_tabela(pagina) == ["0020"]
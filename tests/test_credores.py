@@ -0,0 +1,88 @@
+import pandas as pd
+
+from credores import construir_indice_credores, extrair_sigla, normalizar_nome
+
+
+def _indice(linhas):
+    return construir_indice_credores(pd.DataFrame(linhas, columns=["nomeCredor", "idCredor"]))
+
+
+def test_variacoes_de_grafia_sao_unidas():
+    indice = _indice([
+        ("Padaria São José Ltda", None),
+        ("PADARIA SAO JOSE LTDA", None),
+        ("PADARIA SAO JOSE LTDA", None),
+        ("PADARIA SÃO JOSÉ - ME", None),
+    ])
+    assert set(indice) == {"PADARIA SAO JOSE LTDA"}
+
+
+def test_mesmo_id_une_nomes_diferentes():
+    indice = _indice([("ACME COMERCIO", "10"), ("ACME COM E SERV", "10"), ("ACME COMERCIO", "10")])
+    assert set(indice) == {"ACME COMERCIO"}
+
+
+def test_ids_diferentes_nao_sao_unidos_por_similaridade():
+    indice = _indice([
+        ("JOSE CARLOS FERREIRA", "1"),
+        ("JOSE CARLOS PEREIRA", "2"),
+        ("LUMAR PARTICIPACOES E INVESTIMENTOS LTDA", "7118730"),
+        ("ISAMAR PARTICIPACOES E INVESTIMENTOS LTDA", "7184583"),
+    ])
+    assert (indice.index == indice.values).all()
+
+
+def test_mesma_chave_com_ids_diferentes_nao_e_unida():
+    # Mesma chave normalizada (sufixo societário / acentos), credores diferentes
+    indice = _indice([
+        ("JOAO DA SILVA ME", "1"),
+        ("JOAO DA SILVA", "2"),
+        ("JOSÉ SOUZA LTDA", "3"),
+        ("JOSE SOUZA EPP", "4"),
+    ])
+    assert (indice.index == indice.values).all()
+
+
+def test_mesma_chave_sem_conflito_continua_unida():
+    indice = _indice([
+        ("JOAO DA SILVA ME", "1"),
+        ("JOAO DA SILVA ME", "1"),
+        ("JOAO DA SILVA", None),
+        ("JOÃO DA SILVA", "2"),
+        ("JOAO DA SILVA - ME", "2"),
+    ])
+    # Sem id, "JOAO DA SILVA" vai para o primeiro grupo (o mais frequente);
+    # o id 2 forma outro credor com as suas grafias
+    assert indice["JOAO DA SILVA"] == "JOAO DA SILVA ME"
+    assert indice["JOÃO DA SILVA"] == indice["JOAO DA SILVA - ME"] != "JOAO DA SILVA ME"
+
+
+def test_similaridade_une_quando_falta_id():
+    indice = _indice([("JOSE CARLOS FERREIRA", "1"), ("JOSE CARLOS FERREIR", None)])
+    assert set(indice) == {"JOSE CARLOS FERREIRA"}
+
+
+def test_palavra_comum_no_fim_nao_e_sigla():
+    assert extrair_sigla("LUMAR PARTICIPACOES E INVESTIMENTOS LTDA") is None
+    assert extrair_sigla("LIDER PRESTADORA DE SERVICOS EIRELI") is None
+    assert extrair_sigla("COMERCIO DE PECAS LTDA - EPP") is None
+    assert extrair_sigla("COMPANHIA DE TECNOLOGIA DE MG - PRODEMGE") == "PRODEMGE"
+    assert extrair_sigla("SERVICO FEDERAL DE PROCESSAMENTO DE DADOS (SERPRO)") == "SERPRO"
+
+
+def test_sigla_une_nomes_com_inicio_diferente():
+    indice = _indice([
+        ("EMPRESA DE PESQUISA AGROPECUARIA DE MINAS GERAIS-EPAMIG", None),
+        ("EMPRESA DE PESQUISA AGROPECUARIA DE MINAS GERAIS-EPAMIG", None),
+        ("PESQUISA AGROPECUARIA DE MINAS GERAIS (EPAMIG)", None),
+    ])
+    assert set(indice) == {"EMPRESA DE PESQUISA AGROPECUARIA DE MINAS GERAIS-EPAMIG"}
+
+
+def test_nomes_so_com_sufixos_nao_se_juntam():
+    assert normalizar_nome("S/A ME") == ""
+    indice = _indice([("S/A ME", None), ("LTDA", None), ("EIRELI", "5"), ("ACME EIRELI", "5")])
+    assert indice["S/A ME"] == "S/A ME"
+    assert indice["LTDA"] == "LTDA"
+    # idCredor ainda une o nome vazio ao seu credor
+    assert indice["EIRELI"] == indice["ACME EIRELI"]
@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import data_loader
+from components.estagios import estagios_selecao
+from components.filtros import chave_selecao
+from conftest import RAIZ, escrever_empenhos
+from data_loader import COLUNAS_ESTAGIOS, COLUNAS_VALOR, calcular_estagios
+
+PAGINA = str(RAIZ / "pages" / "17_Estagios_Execucao.py")
+
+
+def _somas(**valores):
+    return pd.DataFrame([{coluna: 0.0 for coluna in [*COLUNAS_VALOR, *COLUNAS_ESTAGIOS]} | valores])
+
+
+def test_estagios_e_detalhes_do_a_pagar():
+    estagios = calcular_estagios(_somas(
+        valorEmpenhadoBruto=100.0, valorEmpenhadoAnulado=10.0,
+        valorLiquidadoBruto=70.0, valorLiquidadoAnulado=5.0,
+        saldoBaixado=40.0, saldoPagar=50.0,
+        valorRetidoBruto=3.0, valorRetidoAnulado=1.0,
+        valorPagoRestosPagarProcessados=8.0, valorPagoAnuladoRestosPagarProcessados=2.0,
+        valorPagoRestosPagarNaoProcessados=4.0,
+    )).iloc[0]
+
+    assert estagios["empenhado"] == 90.0
+    assert estagios["liquidado"] == 65.0
+    assert estagios["pago"] == 40.0
+    assert estagios["aPagar"] == 50.0
+    assert estagios["liquidadoAPagar"] == 25.0
+    assert estagios["aLiquidar"] == 25.0
+    assert estagios["retido"] == 2.0
+    assert estagios["restosPagos"] == 10.0
+
+
+def test_detalhes_nao_ficam_negativos():
+    # Pago acima do liquidado (ex.: adiantamento) não gera "a pagar" negativo
+    estagios = calcular_estagios(_somas(
+        valorEmpenhadoBruto=10.0, valorLiquidadoBruto=20.0, saldoBaixado=30.0
+    )).iloc[0]
+    assert estagios["liquidadoAPagar"] == 0.0
+    assert estagios["aLiquidar"] == 0.0
+
+
+@pytest.fixture
+def base(dados):
+    escrever_empenhos(dados, 2025, [
+        {"valorEmpenhadoBruto": "1.000,00", "valorLiquidadoBruto": "600,00",
+         "saldoBaixado": "500.5", "saldoPagar": "499.5", "numRecurso": "1.500.000.0000"},
+        {"valorEmpenhadoBruto": "200,00", "valorLiquidadoBruto": "200,00",
+         "saldoBaixado": "200", "saldoPagar": "0", "numRecurso": "1.600.000.0000"},
+    ])
+    # Arquivo antigo: sem colunas de liquidação e sem saldoPagar
+    escrever_empenhos(dados, 2024, [
+        {"valorEmpenhadoBruto": "300,00", "valorEmpenhadoAnulado": "50,00", "saldoBaixado": "100",
+         "numRecurso": "2.500.000.0000"},
+    ])
+    return data_loader.versao_dataset()
+
+
+def test_colunas_ausentes_viram_zero_e_saldo_a_pagar_e_derivado(base):
+    tabela = estagios_selecao((), base).set_index("anoEmpenho")
+
+    antigo = tabela.loc["2024"]
+    assert antigo["liquidado"] == 0.0
+    assert antigo["aPagar"] == 150.0
+    novo = tabela.loc["2025"]
+    assert (novo["empenhado"], novo["liquidado"], novo["pago"], novo["aPagar"]) == (
+        1200.0, 800.0, 700.5, 499.5
+    )
+
+
+def test_recorte_do_funil_e_soma_das_linhas_concordam(base):
+    # Fonte não é dimensão do funil: soma as linhas; ano recorta a tabela
+    por_fonte = estagios_selecao(chave_selecao({"fonte": ("1.500.000.0000",)}), base)
+    por_ano = estagios_selecao(chave_selecao({"ano": ("2025",)}), base)
+    ambas_fontes = estagios_selecao(
+        chave_selecao({"fonte": ("1.500.000.0000", "1.600.000.0000")}), base
+    )
+
+    assert por_fonte["empenhado"].sum() == 1000.0
+    colunas = ["empenhado", "liquidado", "pago", "aPagar"]
+    assert ambas_fontes[colunas].reset_index(drop=True).equals(
+        por_ano[colunas].reset_index(drop=True)
+    )
+
+
+def test_pagina_mostra_os_estagios(base):
+    app = AppTest.from_file(PAGINA, default_timeout=30)
+    app.session_state["autenticado"] = True
+    app.session_state["usuario"] = "ana"
+    app.session_state["perfil"] = "USER"
+    app.run()
+
+    assert not app.exception
+    metricas = {m.label: m.value for m in app.metric}
+    assert metricas["Empenhado"] == "R$ 1.450,00"
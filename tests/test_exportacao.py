@@ -0,0 +1,142 @@
+import gzip
+import io
+from unittest import mock
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.testing.v1 import AppTest
+
+from components.exportacao import gerar_csv, gerar_xlsx
+
+DF = pd.DataFrame({
+    "nome": ["ALFA", None, "GAMA"],
+    "valor": [1234.5, 0.0, -10.0],
+})
+
+
+def _botoes_csv():
+    import pandas as pd
+    from components.exportacao import botao_download_csv
+
+    df = pd.DataFrame({"nome": ["ALFA", "BETA"], "valor": [1.5, 2.0]})
+    botao_download_csv("CSV", df, ["nome", "valor"], "t.csv", ["valor"])
+
+
+def _callables_deferidos(script) -> list:
+    """Roda ``script`` no AppTest e devolve os callables dos downloads."""
+    capturados = []
+    original = MediaFileManager.add_deferred
+
+    def espiao(self, funcao, *args, **kwargs):
+        capturados.append(funcao)
+        return original(self, funcao, *args, **kwargs)
+
+    with mock.patch.object(MediaFileManager, "add_deferred", espiao):
+        app = AppTest.from_function(script).run()
+    assert not app.exception
+    return capturados
+
+
+def _para_bytes(dados) -> bytes:
+    # Mesma conversão que o Streamlit faz ao executar o download
+    return convert_data_to_bytes_and_infer_mime(dados, TypeError(type(dados)))[0]
+
+
+# ==========================
+# CSV
+# ==========================
+def test_gerar_csv_devolve_bytes_em_pt_br():
+    conteudo = _para_bytes(gerar_csv(DF, ["nome", "valor"], ["valor"], rotulos={"nome": "Nome"}))
+    assert conteudo.decode("utf-8").splitlines() == [
+        "Nome;valor",
+        "ALFA;R$ 1.234,50",
+        ";R$ 0,00",
+        "GAMA;R$ -10,00",
+    ]
+
+
+def test_gerar_csv_em_blocos_e_compactado():
+    df = pd.DataFrame({"nome": [f"N{i}" for i in range(7)], "valor": range(7)})
+    with mock.patch("components.exportacao.TAMANHO_BLOCO", 3):
+        conteudo = _para_bytes(gerar_csv(df, ["nome", "valor"], compactar=True))
+    linhas = gzip.decompress(conteudo).decode("utf-8").splitlines()
+    assert linhas[0] == "nome;valor"  # cabeçalho uma vez só
+    assert linhas[1:] == [f"N{i};{i}" for i in range(7)]
+
+
+def test_botao_csv_callable_aceito_pelo_streamlit():
+    (funcao,) = _callables_deferidos(_botoes_csv)
+    conteudo = _para_bytes(funcao())
+    assert conteudo.decode("utf-8").startswith("nome;valor\nALFA;R$ 1,50")
+
+
+# ==========================
+# XLSX
+# ==========================
+def _botoes_xlsx():
+    import pandas as pd
+    from components.exportacao import botao_download_xlsx
+
+    df = pd.DataFrame({"nome": ["ALFA", "BETA"], "valor": [1.5, 2.0]})
+    botao_download_xlsx("Excel", df, ["nome", "valor"], "t.xlsx", ["valor"])
+
+
+def test_botao_xlsx_callable_aceito_pelo_streamlit():
+    (funcao,) = _callables_deferidos(_botoes_xlsx)
+    planilha = load_workbook(io.BytesIO(_para_bytes(funcao()))).active
+    linhas = list(planilha.values)
+    assert linhas[:3] == [("nome", "valor"), ("ALFA", 1.5), ("BETA", 2.0)]
+    assert linhas[3] == ("TOTAL", "=SUM(B2:B3)")
+    assert planilha["B2"].number_format == '"R$" #,##0.00'
+
+
+# ==========================
+# LIMITE DE LINHAS
+# ==========================
+def test_acima_do_limite_nao_gera():
+    with mock.patch("components.exportacao.LIMITE_LINHAS_CSV", 2), \
+            mock.patch("components.exportacao.LIMITE_LINHAS_XLSX", 2):
+        with pytest.raises(ValueError, match="limite"):
+            gerar_csv(DF, ["nome", "valor"])
+        with pytest.raises(ValueError, match="limite"):
+            gerar_xlsx(DF, ["nome", "valor"])
+
+
+def test_botoes_acima_do_limite_avisam_em_vez_de_baixar():
+    def pagina():
+        import pandas as pd
+        from components.exportacao import botao_download_csv, botao_download_xlsx
+
+        df = pd.DataFrame({"nome": ["A", "B", "C"], "valor": [1.0, 2.0, 3.0]})
+        botao_download_csv("CSV", df, ["nome", "valor"], "t.csv", ["valor"])
+        botao_download_xlsx("Excel", df, ["nome", "valor"], "t.xlsx", ["valor"])
+
+    with mock.patch("components.exportacao.LIMITE_LINHAS_CSV", 2), \
+            mock.patch("components.exportacao.LIMITE_LINHAS_XLSX", 2):
+        assert _callables_deferidos(pagina) == []
+        app = AppTest.from_function(pagina).run()
+
+    assert [w.value for w in app.warning] == [
+        "⚠️ 3 linhas: acima do limite de 2 para exportação. Refine os filtros para baixar."
+    ] * 2
+
+
+def test_blocos_recortam_as_linhas_antes_das_colunas():
+    # A seleção de colunas copia: tem de ser feita só sobre o bloco
+    df = pd.DataFrame({"nome": [f"N{i}" for i in range(7)], "valor": range(7), "extra": 0})
+    selecoes = []
+    original = pd.DataFrame.__getitem__
+
+    def espiao(self, chave):
+        if isinstance(chave, list):
+            selecoes.append(len(self))
+        return original(self, chave)
+
+    with mock.patch("components.exportacao.TAMANHO_BLOCO", 3), \
+            mock.patch.object(pd.DataFrame, "__getitem__", espiao):
+        gerar_csv(df, ["nome", "valor"], ["valor"])
+        gerar_xlsx(df, ["nome", "valor"], ["valor"])
+    assert selecoes and max(selecoes) <= 3
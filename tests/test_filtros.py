@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import components.filtros as filtros
+
+BASE = pd.DataFrame({
+    "anoEmpenho": [2024, 2024, 2025, 2025],
+    "nomeEntidade": ["Prefeitura", "Câmara", "Prefeitura", "Câmara"],
+    "credorCanonico": ["A", "B", "A", "C"],
+    "numRecurso": ["100", "200", "100", "100"],
+    "Descrição da despesa": ["x", "y", "x", "z"],
+})
+
+
+@pytest.fixture
+def base(monkeypatch):
+    """Base pequena no lugar dos CSVs; conta quantas máscaras são montadas."""
+    mascaras = []
+    monkeypatch.setattr(filtros, "load_empenhos_tratados", lambda: mascaras.append(1) or BASE)
+    monkeypatch.setattr(filtros, "versao_dataset", lambda: (("2025_empenhos.parquet", 1, 1),))
+    filtros.posicoes_filtradas.clear()
+    filtros.opcoes_filtro.clear()
+    yield mascaras
+    filtros.posicoes_filtradas.clear()
+    filtros.opcoes_filtro.clear()
+
+
+def test_chave_ignora_ordem_e_dimensoes_livres():
+    assert filtros.chave_selecao({"fonte": ("200", "100"), "ano": None, "credor": ("A",)}) == (
+        ("credor", ("A",)),
+        ("fonte", ("100", "200")),
+    )
+    assert filtros.chave_selecao({"ano": None}) == ()
+
+
+def test_mesma_selecao_em_outra_pagina_reaproveita_as_posicoes(base):
+    # Credor filtra por fonte e ano; Fonte chega com a mesma seleção em outra ordem
+    credor = filtros.linhas_filtradas({"ano": (2024, 2025), "fonte": ("100",)})
+    fonte = filtros.linhas_filtradas({"fonte": ("100",), "ano": (2025, 2024), "despesa": None})
+
+    assert credor.index.tolist() == fonte.index.tolist() == [0, 2, 3]
+    # load_empenhos_tratados: uma vez por chamada + uma vez para a máscara em cache
+    assert len(base) == 3
+
+
+def test_sem_selecao_devolve_a_base_sem_mascara(base):
+    assert filtros.linhas_filtradas({"ano": None}) is BASE
+    assert len(base) == 1
+
+
+def _pagina():
+    from components.filtros import filtro_compartilhado
+
+    filtro_compartilhado("ano", "Ano", {})
+
+
+def test_filtro_vem_da_url_e_volta_para_ela(base):
+    app = AppTest.from_function(_pagina, default_timeout=30)
+    app.query_params["ano"] = ["2025"]
+    app.run()
+
+    assert app.multiselect[0].value == [2025]
+    assert app.session_state["filtros"]["ano"] == (2025,)
+    assert app.query_params["ano"] == ["2025"]
+
+    # "Todos" escolhido por último vale sozinho e sai da URL
+    app.multiselect[0].select(filtros.TODOS).run()
+    assert app.multiselect[0].value == [filtros.TODOS]
+    assert app.session_state["filtros"]["ano"] is None
+    assert "ano" not in app.query_params
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.formatacao import config_moeda, formatar_brl, formatar_brl_serie
+
+
+VALORES = [
+    0.0, 1.0, -1.0, 1234.5, -1234.5,
+    # meio centavo: 0.005 e 0.015 ficam um pouco acima/abaixo em binário
+    0.005, 0.015, -0.015, 1.005, 2.675, -2.675, 0.125, -0.001,
+    999_999.995, 1_000_000.0, 1_234_567.891, -9_876_543_210.12,
+    float("nan"),
+]
+
+
+def test_serie_igual_ao_escalar():
+    serie = pd.Series(VALORES, index=range(10, 10 + len(VALORES)))
+    resultado = formatar_brl_serie(serie)
+
+    assert resultado.index.equals(serie.index)
+    assert resultado.tolist() == [formatar_brl(v) for v in VALORES]
+
+
+def test_serie_igual_ao_escalar_em_valores_aleatorios():
+    gerador = np.random.default_rng(0)
+    valores = np.round(gerador.uniform(-2e7, 2e7, 20_000), 3)
+    valores[::7] = np.round(valores[::7], 2) + 0.005
+
+    assert formatar_brl_serie(pd.Series(valores)).tolist() == [formatar_brl(v) for v in valores]
+
+
+@pytest.mark.parametrize("valor, texto", [
+    (-1234.5, "R$ -1.234,50"),
+    (1_234_567.891, "R$ 1.234.567,89"),
+    (0.015, "R$ 0,01"),
+    (float("nan"), "R$ 0,00"),
+    (-0.001, "R$ 0,00"),
+])
+def test_formato_pt_br(valor, texto):
+    assert formatar_brl(valor) == texto
+    assert formatar_brl_serie(pd.Series([valor])).tolist() == [texto]
+
+
+def test_serie_aceita_texto_e_prefixo():
+    serie = pd.Series(["1234.5", "x", None])
+    assert formatar_brl_serie(serie, prefixo="").tolist() == ["1.234,50", "0,00", "0,00"]
+
+
+def test_config_moeda_mantem_coluna_numerica():
+    config = config_moeda(["valorEmpenhadoBruto", "saldoBaixado"], {"saldoBaixado": "Baixado"})
+
+    assert list(config) == ["valorEmpenhadoBruto", "saldoBaixado"]
+    assert config["valorEmpenhadoBruto"]["label"] == "valorEmpenhadoBruto (R$)"
+    assert config["saldoBaixado"]["label"] == "Baixado (R$)"
+    for coluna in config.values():
+        assert coluna["type_config"]["type"] == "number"
+        assert coluna["type_config"]["format"] == "localized"
@@ -0,0 +1,41 @@
+import socket
+
+from streamlit.testing.v1 import AppTest
+
+import github_client
+from conftest import RAIZ
+
+PAGINA = str(RAIZ / "pages" / "20_Gerenciador_Usuarios.py")
+
+
+def _como_admin() -> AppTest:
+    app = AppTest.from_file(PAGINA, default_timeout=30)
+    app.session_state["autenticado"] = True
+    app.session_state["usuario"] = "admin"
+    app.session_state["perfil"] = "ADMIN"
+    return app
+
+
+def test_lista_os_cadastros_do_github(github):
+    github.commitar({
+        "data/usuarios.json": b'{"admin": {"perfil": "ADMIN", "status": "ativo"}}',
+        "data/solicitacoes.json": b'{"ana": {"status": "pendente", "senha": "x"}}',
+    })
+
+    app = _como_admin().run()
+
+    assert not app.exception
+    assert not app.error
+    assert any("ana" in m.value for m in app.markdown)
+
+
+def test_sem_rede_mostra_erro_em_vez_de_quebrar(github, monkeypatch):
+    with socket.socket() as livre:
+        livre.bind(("127.0.0.1", 0))
+        porta = livre.getsockname()[1]
+    monkeypatch.setattr(github_client, "API_URL", f"http://127.0.0.1:{porta}")
+
+    app = _como_admin().run()
+
+    assert not app.exception
+    assert "Erro ao ler os cadastros no GitHub" in app.error[0].value
@@ -0,0 +1,207 @@
+import socket
+import time
+
+import pytest
+import requests
+
+import github_client
+
+ARQUIVO = "data/usuarios.json"
+
+
+# ==========================
+# NOVAS TENTATIVAS E LIMITES
+# ==========================
+def test_5xx_temporario_tenta_de_novo_com_recuo(github):
+    github.commitar({ARQUIVO: b"{}"})
+    github.falhas += [("GET", "/repos/", 502, {}), ("GET", "/repos/", 503, {})]
+
+    assert github_client.ler_json(ARQUIVO) == ({}, github_client.sha_arquivo(ARQUIVO))
+    assert github.contar("GET", ARQUIVO) == 3
+    # Recuo exponencial com jitter: no máximo ESPERA_BASE * 2 ** tentativa
+    assert len(github.esperas) == 2
+    assert 0 <= github.esperas[0] <= github_client.ESPERA_BASE
+    assert 0 <= github.esperas[1] <= 2 * github_client.ESPERA_BASE
+
+
+def test_5xx_persistente_devolve_a_ultima_resposta(github):
+    github.falhas += [("GET", "/repos/", 500, {})] * github_client.MAX_TENTATIVAS
+
+    with pytest.raises(github_client.ErroGitHub) as erro:
+        github_client.ler_arquivo(ARQUIVO)
+    assert erro.value.status == 500
+    assert github.contar("GET", ARQUIVO) == github_client.MAX_TENTATIVAS
+
+
+def test_retry_after_e_respeitado(github):
+    github.commitar({ARQUIVO: b"{}"})
+    github.falhas.append(("GET", "/repos/", 429, {"Retry-After": "7"}))
+
+    github_client.ler_arquivo(ARQUIVO)
+    assert len(github.esperas) == 1
+    assert 7 <= github.esperas[0] <= 7 + github_client.ESPERA_BASE
+
+
+def test_limite_primario_espera_o_reinicio(github):
+    github.commitar({ARQUIVO: b"{}"})
+    reinicio = str(int(time.time()) + 10)
+    github.falhas.append(
+        ("GET", "/repos/", 403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reinicio})
+    )
+
+    github_client.ler_arquivo(ARQUIVO)
+    assert len(github.esperas) == 1
+    assert 9 <= github.esperas[0] <= 12 + github_client.ESPERA_BASE
+
+
+def test_espera_longa_demais_nao_segura_a_pagina(github):
+    github.falhas.append(("GET", "/repos/", 429, {"Retry-After": "3600"}))
+
+    with pytest.raises(github_client.ErroGitHub) as erro:
+        github_client.ler_arquivo(ARQUIVO)
+    assert erro.value.status == 429
+    assert github.esperas == []
+
+
+def test_403_de_permissao_nao_e_repetido(github):
+    github.falhas.append(("GET", "/repos/", 403, {}))
+
+    with pytest.raises(github_client.ErroGitHub):
+        github_client.ler_arquivo(ARQUIVO)
+    assert github.contar("GET", ARQUIVO) == 1
+
+
+def test_falha_de_conexao_tenta_de_novo_e_propaga(github, monkeypatch):
+    # Porta sem servidor: toda tentativa falha na conexão
+    with socket.socket() as livre:
+        livre.bind(("127.0.0.1", 0))
+        porta = livre.getsockname()[1]
+    monkeypatch.setattr(github_client, "API_URL", f"http://127.0.0.1:{porta}")
+
+    with pytest.raises(requests.ConnectionError):
+        github_client.ler_arquivo(ARQUIVO)
+    assert len(github.esperas) == github_client.MAX_TENTATIVAS - 1
+
+
+# ==========================
+# LEITURAS CONDICIONAIS E CACHE DE SHA
+# ==========================
+def test_etag_304_reaproveita_o_conteudo(github):
+    github.commitar({ARQUIVO: b'{"a": {"nome": "A"}}'})
+
+    primeira = github_client.ler_json(ARQUIVO)
+    segunda = github_client.ler_json(ARQUIVO)
+
+    assert primeira == segunda
+    condicionais = [
+        c for m, caminho, c in github.requisicoes if m == "GET" and caminho.endswith(ARQUIVO)
+    ]
+    assert "If-None-Match" not in condicionais[0]
+    assert condicionais[1]["If-None-Match"] == f'"{primeira[1]}"'
+
+
+def test_etag_muda_quando_outro_cliente_grava(github):
+    github.commitar({ARQUIVO: b'{"a": {}}'})
+    github_client.ler_json(ARQUIVO)
+
+    github.commitar({ARQUIVO: b'{"b": {}}'})
+    dados, sha = github_client.ler_json(ARQUIVO)
+
+    assert dados == {"b": {}}
+    assert sha == github_client.sha_arquivo(ARQUIVO)
+
+
+def test_sha_arquivo_usa_o_cache(github):
+    github.commitar({ARQUIVO: b"{}"})
+
+    sha = github_client.sha_arquivo(ARQUIVO)
+    assert github_client.sha_arquivo(ARQUIVO) == sha
+    assert github.contar("GET", ARQUIVO) == 1
+
+
+def test_gravacao_usa_o_sha_guardado_sem_get(github):
+    github.commitar({ARQUIVO: b"{}"})
+    github_client.ler_json(ARQUIVO)
+
+    resposta = github_client.salvar_json(ARQUIVO, {"x": 1}, "grava")
+    github_client.salvar_json(ARQUIVO, {"x": 2}, "grava de novo")
+
+    assert github.contar("GET", ARQUIVO) == 1
+    assert github_client.sha_arquivo(ARQUIVO) != resposta["content"]["sha"]
+    assert github.arquivos()[ARQUIVO] == b'{\n  "x": 2\n}'
+
+
+def test_sha_guardado_desatualizado_e_reconsultado(github):
+    github.commitar({ARQUIVO: b"{}"})
+    github_client.sha_arquivo(ARQUIVO)
+    github.commitar({ARQUIVO: b"[]"})
+
+    github_client.salvar_json(ARQUIVO, {"x": 1}, "grava")
+    assert github.arquivos()[ARQUIVO] == b'{\n  "x": 1\n}'
+
+
+def test_sha_informado_desatualizado_e_conflito(github):
+    github.commitar({ARQUIVO: b"{}"})
+    antigo = github_client.sha_arquivo(ARQUIVO)
+    github.commitar({ARQUIVO: b"[]"})
+
+    with pytest.raises(github_client.ErroGitHub) as erro:
+        github_client.salvar_json(ARQUIVO, {"x": 1}, "grava", sha=antigo)
+    assert erro.value.status == 409
+    assert github.arquivos()[ARQUIVO] == b"[]"
+
+
+def test_arquivo_apagado_por_outro_cliente_e_esquecido(github):
+    github.commitar({ARQUIVO: b'{"a": {}}'})
+    github_client.ler_json(ARQUIVO)
+
+    github.commitar({ARQUIVO: None})
+    assert github_client.ler_json(ARQUIVO) == ({}, None)
+
+    # Sem estado guardado: a gravação cria o arquivo (sem sha) e não pede 304
+    github_client.salvar_json(ARQUIVO, {"b": {}}, "recria")
+    assert github.arquivos()[ARQUIVO] == b'{\n  "b": {}\n}'
+    gets = [c for m, caminho, c in github.requisicoes if m == "GET" and caminho.endswith(ARQUIVO)]
+    assert "If-None-Match" not in gets[-1]
+
+
+def test_leitura_depois_da_gravacao_volta_a_ser_condicional(github):
+    github.commitar({ARQUIVO: b"{}"})
+    github_client.salvar_json(ARQUIVO, {"x": 1}, "grava")
+
+    # O PUT não traz ETag: a primeira leitura é completa, a segunda é 304
+    github_client.ler_json(ARQUIVO)
+    dados, _ = github_client.ler_json(ARQUIVO)
+
+    assert dados == {"x": 1}
+    condicionais = [
+        "If-None-Match" in c
+        for m, caminho, c in github.requisicoes
+        if m == "GET" and caminho.endswith(ARQUIVO)
+    ]
+    assert condicionais[-2:] == [False, True]
+
+
+def test_arquivo_acima_de_1_mb_vem_pelo_download_url(github):
+    github.limite_base64 = 10
+    conteudo = b"a;b\n" * 10
+    github.commitar({"data/2024_empenhos.csv": conteudo})
+
+    assert github_client.ler_arquivo("data/2024_empenhos.csv") == (
+        conteudo, github_client.sha_arquivo("data/2024_empenhos.csv")
+    )
+    assert github.contar("GET", "/bruto/") == 1
+    # Depois do primeiro download, o 304 evita baixar de novo
+    github_client.ler_arquivo("data/2024_empenhos.csv")
+    assert github.contar("GET", "/bruto/") == 1
+
+
+def test_commit_de_varios_arquivos_atualiza_os_shas_guardados(github):
+    github.commitar({ARQUIVO: b"{}", "data/solicitacoes.json": b"{}"})
+    github_client.ler_json(ARQUIVO)
+
+    github_client.commit_arquivos({ARQUIVO: b"[]", "data/solicitacoes.json": b"[]"}, "grava")
+    gets = github.contar("GET", "/contents/")
+
+    assert github_client.sha_arquivo(ARQUIVO) == github_client.sha_arquivo("data/solicitacoes.json")
+    assert github.contar("GET", "/contents/") == gets
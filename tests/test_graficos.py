@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from components.graficos import (
+    LIMITE_LINHAS_GRAFICO,
+    ROTULO_OUTROS,
+    TOP_N_MAXIMO,
+    dados_grafico,
+    limitar_grafico,
+    top_n_com_outros,
+)
+
+
+DF = pd.DataFrame({
+    "anoEmpenho": [2025, 2025, 2026, 2026, 2026],
+    "numRecurso": ["100", "200", "100", "300", "300"],
+    "valorEmpenhadoLiquido": [5.0, 1.0, 3.0, 2.0, 2.0],
+})
+
+
+def test_recorte_so_no_grafico_total_no_agregado_completo():
+    completo = dados_grafico(DF, ["anoEmpenho", "numRecurso"], "valorEmpenhadoLiquido", limite=None)
+    grafico = limitar_grafico(completo, ["anoEmpenho", "numRecurso"], "valorEmpenhadoLiquido", limite=2)
+
+    assert completo["valorEmpenhadoLiquido"].sum() == DF["valorEmpenhadoLiquido"].sum()
+    assert grafico.to_dict("records") == [
+        {"anoEmpenho": 2025, "numRecurso": "100", "valorEmpenhadoLiquido": 5.0},
+        {"anoEmpenho": 2026, "numRecurso": "300", "valorEmpenhadoLiquido": 4.0},
+    ]
+
+
+def test_dados_grafico_aplica_o_limite():
+    dados = dados_grafico(DF, ["anoEmpenho", "numRecurso"], "valorEmpenhadoLiquido", limite=1)
+    assert len(dados) == 1
+    assert limitar_grafico(dados, "anoEmpenho", "valorEmpenhadoLiquido", limite=None) is dados
+
+
+def test_soma_completa_antes_do_recorte_por_ano():
+    # Mais combinações ano x despesa que LIMITE_LINHAS_GRAFICO: o recorte
+    # vem depois da soma e preserva o total de cada exercício
+    grande = pd.DataFrame({
+        "anoEmpenho": np.repeat([2025, 2026], LIMITE_LINHAS_GRAFICO),
+        "Descrição da despesa": [f"D{i}" for i in range(2 * LIMITE_LINHAS_GRAFICO)],
+        "valorEmpenhadoLiquido": 1.0,
+    })
+    grao = ["anoEmpenho", "Descrição da despesa"]
+    dados = top_n_com_outros(
+        dados_grafico(grande, grao, "valorEmpenhadoLiquido", limite=None),
+        "anoEmpenho", "Descrição da despesa", "valorEmpenhadoLiquido", n=TOP_N_MAXIMO
+    )
+
+    assert len(dados) == 2 * (TOP_N_MAXIMO + 1)
+    assert dados.groupby("anoEmpenho")["valorEmpenhadoLiquido"].sum().tolist() == [
+        LIMITE_LINHAS_GRAFICO, LIMITE_LINHAS_GRAFICO
+    ]
+
+
+def test_top_n_soma_o_restante_em_outros():
+    dados = top_n_com_outros(DF, "anoEmpenho", "numRecurso", "valorEmpenhadoLiquido", n=1)
+    por_ano = {
+        ano: dict(zip(bloco["numRecurso"], bloco["valorEmpenhadoLiquido"]))
+        for ano, bloco in dados.groupby("anoEmpenho")
+    }
+
+    # Linhas não agregadas: em 2026 "100" (3.0) passa as duas de "300" (2.0)
+    assert por_ano == {
+        2025: {"100": 5.0, ROTULO_OUTROS: 1.0},
+        2026: {"100": 3.0, ROTULO_OUTROS: 4.0},
+    }
+
+
+def test_top_n_sem_outros_quando_cabe_no_n():
+    dados = top_n_com_outros(DF, "anoEmpenho", "numRecurso", "valorEmpenhadoLiquido", n=3)
+
+    assert ROTULO_OUTROS not in set(dados["numRecurso"])
+    assert len(dados) == len(DF)
+    assert dados["valorEmpenhadoLiquido"].sum() == DF["valorEmpenhadoLiquido"].sum()
+
+
+def test_top_n_limitado_a_top_n_maximo():
+    grande = pd.DataFrame({
+        "anoEmpenho": 2025,
+        "numRecurso": [str(i) for i in range(100)],
+        "valorEmpenhadoLiquido": np.arange(100, dtype=float),
+    })
+    dados = top_n_com_outros(grande, "anoEmpenho", "numRecurso", "valorEmpenhadoLiquido", n=100)
+
+    assert len(dados) == TOP_N_MAXIMO + 1
+    mantidos = dados[dados["numRecurso"] != ROTULO_OUTROS]
+    assert sorted(mantidos["valorEmpenhadoLiquido"]) == list(np.arange(70, 100, dtype=float))
+    assert dados["valorEmpenhadoLiquido"].sum() == grande["valorEmpenhadoLiquido"].sum()
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+import data_loader
+from components.filtros import chave_selecao
+from components.hierarquias import agregado_nivel
+from conftest import escrever_empenhos
+from data_loader import NAO_INFORMADO, decompor_classificacoes
+
+
+def test_natureza_e_fonte_viram_niveis_acumulados():
+    df = decompor_classificacoes(pd.DataFrame({
+        "numNaturezaDesp": ["33901400000000", "44905200000000", "339014", ""],
+        "numNaturezaEmp": ["33901404000000", "44905233000000", "", "x"],
+        "numRecurso": ["1.500.000.0000", "2.759.000.0001", "1500", None],
+    }))
+
+    assert df["natCategoria"].tolist() == ["3", "4", NAO_INFORMADO, NAO_INFORMADO]
+    assert df["natGrupo"].tolist()[:2] == ["3.3", "4.4"]
+    assert df["natModalidade"].tolist()[:2] == ["3.3.90", "4.4.90"]
+    assert df["natElemento"].tolist()[:2] == ["3.3.90.14", "4.4.90.52"]
+    assert df["natSubelemento"].tolist() == [
+        "3.3.90.14.04", "4.4.90.52.33", NAO_INFORMADO, NAO_INFORMADO
+    ]
+    assert df["fonteExercicio"].tolist() == ["1", "2", NAO_INFORMADO, NAO_INFORMADO]
+    assert df["fonteGrupo"].tolist()[:2] == ["1.5", "2.7"]
+    assert df["fonteCodigo"].tolist()[:2] == ["1.500", "2.759"]
+    assert isinstance(df["natGrupo"].dtype, pd.CategoricalDtype)
+
+
+def test_coluna_ausente_vira_nao_informado():
+    # CSVs antigos sem numNaturezaDesp nem a funcional-programática
+    df = decompor_classificacoes(pd.DataFrame({
+        "numNaturezaEmp": ["33901404000000"],
+        "numRecurso": ["1.500.000.0000"],
+    }))
+
+    assert df["natCategoria"].tolist() == [NAO_INFORMADO]
+    assert df["codFuncao"].tolist() == [NAO_INFORMADO]
+    assert df["natSubelemento"].tolist() == ["3.3.90.14.04"]
+
+
+@pytest.fixture
+def base(dados):
+    escrever_empenhos(dados, 2024, [
+        {"numNaturezaDesp": "33901400000000", "valorEmpenhadoBruto": "10,00"},
+        {"numNaturezaDesp": "33903900000000", "valorEmpenhadoBruto": "20,00",
+         "idCredor": "2", "nomeCredor": "OUTRO FORNECEDOR"},
+    ])
+    escrever_empenhos(dados, 2025, [
+        {"numNaturezaDesp": "44905200000000", "valorEmpenhadoBruto": "5,00",
+         "nomeEntidade": "CÂMARA"},
+        {"numNaturezaDesp": "33903900000000", "valorEmpenhadoBruto": "1,00"},
+    ])
+    return data_loader.versao_dataset()
+
+
+def _somas(dados, valor="valorEmpenhadoLiquido"):
+    linhas = dados[["anoEmpenho", "codigo", valor]].itertuples(index=False)
+    return {(ano, codigo): v for ano, codigo, v in linhas}
+
+
+def test_cada_nivel_soma_o_mesmo_total(base):
+    topo = agregado_nivel((), "natureza", (), base)
+    assert _somas(topo) == {("2024", "3"): 30.0, ("2025", "3"): 1.0, ("2025", "4"): 5.0}
+
+    ramo = agregado_nivel((), "natureza", ("3", "3.3", "3.3.90"), base)
+    assert _somas(ramo) == {
+        ("2024", "3.3.90.14"): 10.0,
+        ("2024", "3.3.90.39"): 20.0,
+        ("2025", "3.3.90.39"): 1.0,
+    }
+
+
+def test_selecao_de_exercicio_recorta_o_cubo_e_de_credor_usa_as_linhas(base):
+    por_ano = agregado_nivel(chave_selecao({"ano": ("2025",)}), "natureza", (), base)
+    assert _somas(por_ano) == {("2025", "3"): 1.0, ("2025", "4"): 5.0}
+
+    por_credor = agregado_nivel(chave_selecao({"credor": ("OUTRO FORNECEDOR",)}), "natureza", ("3",), base)
+    assert _somas(por_credor) == {("2024", "3.3"): 20.0}
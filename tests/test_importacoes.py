@@ -0,0 +1,58 @@
+import subprocess
+import sys
+import textwrap
+
+from conftest import RAIZ
+
+PESADOS = ("pandas", "pyarrow", "altair")
+
+# Roda cada página sem login, com o aquecimento desligado, e lista os
+# módulos pesados já importados; depois liga o aquecimento
+SCRIPT = textwrap.dedent("""
+    import json, sys
+    from pathlib import Path
+
+    import aquecimento
+    from streamlit.testing.v1 import AppTest
+
+    original = aquecimento.aquecer_em_segundo_plano
+    aquecimento.aquecer_em_segundo_plano = lambda: None
+
+    pesados = {PESADOS!r}
+    resultado = {{}}
+    for pagina in ["Inicio.py", *sorted(str(p) for p in Path("pages").glob("*.py"))]:
+        app = AppTest.from_file(pagina, default_timeout=30).run()
+        resultado[pagina] = {{
+            "erro": [e.value for e in app.exception],
+            "pesados": [m for m in pesados if m in sys.modules],
+        }}
+
+    original()
+    aquecimento._thread.join(60)
+    resultado["depois do aquecimento"] = {{
+        "erro": [],
+        "pesados": [m for m in pesados if m in sys.modules],
+    }}
+    print(json.dumps(resultado))
+""").format(PESADOS=PESADOS)
+
+
+def test_paginas_nao_importam_pandas_antes_do_login():
+    import json
+
+    saida = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        timeout=180,
+        check=True
+    ).stdout
+    resultado = json.loads(saida.strip().splitlines()[-1])
+
+    depois = resultado.pop("depois do aquecimento")
+    for pagina, estado in resultado.items():
+        assert estado["erro"] == [], pagina
+        assert estado["pesados"] == [], pagina
+    # O aquecimento é quem traz pandas/pyarrow para o processo
+    assert {"pandas", "pyarrow"} <= set(depois["pesados"])
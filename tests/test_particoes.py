@@ -0,0 +1,68 @@
+import io
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import data_loader
+from conftest import escrever_empenhos
+
+
+def test_gerar_parquet_recusa_csv_sem_colunas_obrigatorias():
+    csv = io.BytesIO("anoEmpenho;nomeCredor\n2025;CREDOR A\n".encode("utf-8"))
+
+    with pytest.raises(ValueError, match="2025_empenhos.csv: colunas ausentes") as erro:
+        data_loader.gerar_parquet(csv, "2025_empenhos.csv")
+
+    assert "valorEmpenhadoBruto" in str(erro.value)
+    assert "nomeCredor" not in str(erro.value)
+
+
+def test_parquet_carrega_igual_ao_csv(dados):
+    csv = escrever_empenhos(dados, 2025, [
+        {"nomeCredor": "CREDOR A", "valorEmpenhadoBruto": "1.234,56"},
+        {"nomeCredor": "CREDOR B ", "valorEmpenhadoAnulado": "10,00", "saldoBaixado": "5.5"},
+    ])
+    pelo_csv = data_loader.load_empenhos()
+
+    arquivo, linhas = data_loader.gerar_parquet(csv, csv.name)
+    with arquivo, open(dados / data_loader.nome_particao(csv.name), "wb") as destino:
+        shutil.copyfileobj(arquivo, destino)
+    csv.unlink()
+    data_loader._particoes.clear()
+
+    assert [arq.suffix for arq in data_loader.arquivos_empenhos()] == [".parquet"]
+    assert linhas == 2
+    pd.testing.assert_frame_equal(data_loader.load_empenhos(), pelo_csv)
+
+
+def test_parquet_tem_preferencia_sobre_csv_gz_e_csv(dados):
+    for nome in [
+        "2024_empenhos.csv",
+        "2025_empenhos.csv", "2025_empenhos.csv.gz",
+        "2026_empenhos.csv", "2026_empenhos.csv.gz", "2026_empenhos.parquet",
+    ]:
+        (dados / nome).touch()
+
+    assert [arq.name for arq in data_loader.arquivos_empenhos()] == [
+        "2024_empenhos.csv", "2025_empenhos.csv.gz", "2026_empenhos.parquet"
+    ]
+
+
+def test_particao_reaproveitada_ate_o_arquivo_mudar(dados):
+    arq = escrever_empenhos(dados, 2025, [{}])
+    primeira = data_loader.carregar_particao(arq)
+    assert data_loader.carregar_particao(arq) is primeira
+
+    # Mesmo tamanho, outra data de modificação: relê
+    estado = arq.stat()
+    os.utime(arq, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+    segunda = data_loader.carregar_particao(arq)
+    assert segunda is not primeira
+
+    # Outro tamanho: relê e só a versão atual fica guardada
+    escrever_empenhos(dados, 2025, [{}, {}])
+    terceira = data_loader.carregar_particao(arq)
+    assert len(terceira) == 2
+    assert [chave[0] for chave in data_loader._particoes] == [arq.name]
@@ -0,0 +1,43 @@
+import pytest
+
+import data_loader
+from conftest import escrever_empenhos
+
+
+def test_resumo_soma_por_exercicio_e_entidade(dados):
+    escrever_empenhos(dados, 2025, [
+        {"valorEmpenhadoBruto": "1.000,50", "valorEmpenhadoAnulado": "0,50", "saldoBaixado": "926.31",
+         "saldoPagar": "73.69"},
+        {"valorEmpenhadoBruto": "200,00", "saldoBaixado": "200", "saldoPagar": "0"},
+        {"nomeEntidade": "CÂMARA", "valorEmpenhadoBruto": "10,00", "saldoPagar": "10"},
+    ])
+
+    resumo = data_loader.resumo_visao_geral(data_loader.versao_dataset())
+
+    linhas = resumo.set_index("nomeEntidade").to_dict("index")
+    assert set(linhas) == {"PREFEITURA", "CÂMARA"}
+    prefeitura = linhas["PREFEITURA"]
+    assert prefeitura["valorEmpenhadoBruto"] == pytest.approx(1200.50)
+    assert prefeitura["valorEmpenhadoAnulado"] == pytest.approx(0.50)
+    # saldo* vem com ponto decimal: 926.31 e não 92631
+    assert prefeitura["saldoBaixado"] == pytest.approx(1126.31)
+    assert prefeitura["Restos a Pagar"] == pytest.approx(73.69)
+    assert linhas["CÂMARA"]["Restos a Pagar"] == pytest.approx(10.0)
+
+
+def test_resumo_acompanha_a_versao_dos_dados(dados):
+    escrever_empenhos(dados, 2025, [{"valorEmpenhadoBruto": "1,00"}])
+    versao = data_loader.versao_dataset()
+    assert data_loader.resumo_visao_geral(versao)["anoEmpenho"].tolist() == ["2025"]
+
+    escrever_empenhos(dados, 2026, [{"valorEmpenhadoBruto": "2,00"}])
+    nova = data_loader.versao_dataset()
+
+    assert nova != versao
+    assert data_loader.resumo_visao_geral(nova)["anoEmpenho"].tolist() == ["2025", "2026"]
+
+
+def test_resumo_sem_dados_tem_as_colunas_da_pagina(dados):
+    resumo = data_loader.resumo_visao_geral(data_loader.versao_dataset())
+    assert resumo.empty
+    assert "Restos a Pagar" in resumo.columns
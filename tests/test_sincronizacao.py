@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import github_client
+import sincronizacao
+from github_falso import sha_blob
+
+
+@pytest.fixture
+def recargas(monkeypatch):
+    """Anos que a sincronização mandaria o data_loader recarregar."""
+    pedidas = []
+    monkeypatch.setattr(sincronizacao, "recarregar_particoes", pedidas.append)
+    return pedidas
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    """``data/`` local temporária."""
+    pasta = tmp_path / "data"
+    pasta.mkdir()
+    monkeypatch.setattr(sincronizacao, "PASTA_DADOS", pasta)
+    monkeypatch.setattr(sincronizacao, "MANIFESTO", pasta / ".manifesto.json")
+    return pasta
+
+
+def test_primeira_sincronizacao_so_baixa_o_que_difere(github, pasta, recargas):
+    github.commitar({
+        "data/2024_empenhos.parquet": b"igual",
+        "data/2025_empenhos.parquet": b"novo",
+        "data/usuarios.json": b"{}",
+    })
+    # O deploy já trouxe 2024 igual; 2023 saiu do repositório
+    (pasta / "2024_empenhos.parquet").write_bytes(b"igual")
+    (pasta / "2023_empenhos.csv").write_bytes(b"velho")
+
+    alterados = sincronizacao.sincronizar()
+
+    assert alterados == ["2023_empenhos.csv", "2025_empenhos.parquet"]
+    assert recargas == [alterados]
+    assert sorted(p.name for p in pasta.iterdir()) == [
+        ".manifesto.json", "2024_empenhos.parquet", "2025_empenhos.parquet"
+    ]
+    assert (pasta / "2025_empenhos.parquet").read_bytes() == b"novo"
+    assert github.contar("GET", "/git/blobs/") == 1
+    assert json.loads((pasta / ".manifesto.json").read_text()) == {
+        "2024_empenhos.parquet": sha_blob(b"igual"),
+        "2025_empenhos.parquet": sha_blob(b"novo"),
+    }
+
+
+def test_sem_mudancas_nao_baixa_nem_recarrega(github, pasta, recargas):
+    github.commitar({"data/2025_empenhos.parquet": b"a"})
+    sincronizacao.sincronizar()
+    recargas.clear()
+
+    assert sincronizacao.sincronizar() == []
+    assert recargas == []
+    assert github.contar("GET", "/git/blobs/") == 1
+
+    github.commitar({"data/2025_empenhos.parquet": b"b"})
+    progresso = []
+    assert sincronizacao.sincronizar(progresso=lambda *args: progresso.append(args)) == [
+        "2025_empenhos.parquet"
+    ]
+    assert progresso == [("2025_empenhos.parquet", 1, 1)]
+    assert (pasta / "2025_empenhos.parquet").read_bytes() == b"b"
+
+
+def test_falha_num_download_guarda_os_que_terminaram(github, pasta, recargas, monkeypatch):
+    monkeypatch.setattr(sincronizacao, "DOWNLOADS_PARALELOS", 1)
+    github.commitar({"data/2024_empenhos.csv": b"ok", "data/2025_empenhos.csv": b"falha"})
+    github.falhas.append(("GET", f"/repos/{github.repo}/git/blobs/{sha_blob(b'falha')}", 404, {}))
+
+    with pytest.raises(github_client.ErroGitHub):
+        sincronizacao.sincronizar()
+
+    assert recargas == []
+    assert not (pasta / "2025_empenhos.csv").exists()
+    assert not list(pasta.glob("*.parcial"))
+    assert json.loads((pasta / ".manifesto.json").read_text()) == {
+        "2024_empenhos.csv": sha_blob(b"ok")
+    }
+
+    # A próxima sincronização só busca o que faltou
+    assert sincronizacao.sincronizar() == ["2025_empenhos.csv"]
+    assert github.contar("GET", f"/git/blobs/{sha_blob(b'ok')}") == 1
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from components.tabelas import posicoes_ordenadas
+
+
+def test_ausentes_ficam_no_fim_nas_duas_ordens():
+    serie = pd.Series(["b", pd.NA, "a", "c"], index=[10, 11, 12, 13], dtype="string")
+    assert posicoes_ordenadas(serie).tolist() == [2, 0, 3, 1]
+    assert posicoes_ordenadas(serie, decrescente=True).tolist() == [3, 0, 2, 1]
+
+
+def test_posicoes_sao_uma_permutacao():
+    serie = pd.Series([3.0, np.nan, 1.0, np.nan, 2.0])
+    posicoes = posicoes_ordenadas(serie)
+    assert sorted(posicoes.tolist()) == list(range(5))
+    assert serie.iloc[posicoes].tolist()[:3] == [1.0, 2.0, 3.0]
+
+
+def test_empates_mantem_a_ordem_original():
+    serie = pd.Series(["x", "y", "x", "y"], dtype="category")
+    assert posicoes_ordenadas(serie).tolist() == [0, 2, 1, 3]
+    assert posicoes_ordenadas(serie, decrescente=True).tolist() == [1, 3, 0, 2]
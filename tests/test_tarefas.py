@@ -0,0 +1,75 @@
+import pytest
+
+import tarefas
+
+
+@pytest.fixture(autouse=True)
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.setattr(tarefas, "PASTA_TAREFAS", tmp_path / ".tarefas")
+    monkeypatch.setattr(tarefas, "_lidas", {})
+    return tmp_path / ".tarefas"
+
+
+def _registro(id_tarefa, status, criada_em):
+    tarefa = {"id": id_tarefa, "status": status, "criada_em": criada_em}
+    tarefas._gravar(tarefa)
+    return tarefa
+
+
+def test_listagem_so_rele_registros_alterados(monkeypatch):
+    for i in range(5):
+        _registro(f"t{i}", tarefas.CONCLUIDA, i)
+    lidas = []
+    ler = tarefas.ler_tarefa
+
+    def contar_leitura(id_tarefa):
+        lidas.append(id_tarefa)
+        return ler(id_tarefa)
+
+    monkeypatch.setattr(tarefas, "ler_tarefa", contar_leitura)
+
+    assert [t["id"] for t in tarefas.listar_tarefas(limite=3)] == ["t4", "t3", "t2"]
+    assert len(lidas) == 5
+
+    lidas.clear()
+    tarefas.listar_tarefas()
+    assert lidas == []
+
+    tarefas._atualizar(tarefas.ler_tarefa("t1"), status=tarefas.FALHOU)
+    lidas.clear()
+    assert tarefas.listar_tarefas()[3]["status"] == tarefas.FALHOU
+    assert lidas == ["t1"]
+
+
+def test_registro_apagado_sai_da_listagem(pasta):
+    _registro("a", tarefas.CONCLUIDA, 1)
+    _registro("b", tarefas.CONCLUIDA, 2)
+    tarefas.listar_tarefas()
+
+    (pasta / "a.json").unlink()
+    assert [t["id"] for t in tarefas.listar_tarefas()] == ["b"]
+    assert set(tarefas._lidas) == {"b"}
+
+
+def test_poda_guarda_so_as_terminadas_mais_recentes(pasta, monkeypatch):
+    monkeypatch.setattr(tarefas, "MAX_TERMINADAS", 3)
+    _registro("ativa", tarefas.EXECUTANDO, 0)
+    for i in range(6):
+        _registro(f"t{i}", tarefas.CONCLUIDA if i % 2 else tarefas.FALHOU, i + 1)
+
+    tarefas._podar()
+
+    assert sorted(p.stem for p in pasta.glob("*.json")) == ["ativa", "t3", "t4", "t5"]
+
+
+def test_tarefa_terminada_poda_os_registros(github, pasta, monkeypatch):
+    monkeypatch.setattr(tarefas, "MAX_TERMINADAS", 2)
+    for i in range(3):
+        _registro(f"velha{i}", tarefas.CONCLUIDA, i)
+
+    id_tarefa = tarefas.enviar({"data/2024_empenhos.csv": b"a;b\n"}, "envia")
+    tarefas._executor.submit(lambda: None).result()
+
+    assert tarefas.ler_tarefa(id_tarefa)["status"] == tarefas.CONCLUIDA
+    assert github.arquivos() == {"data/2024_empenhos.csv": b"a;b\n"}
+    assert sorted(p.stem for p in pasta.glob("*.json")) == sorted([id_tarefa, "velha2"])